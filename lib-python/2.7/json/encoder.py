@@ -206,6 +206,15 @@ class JSONEncoder(object):
         '{"foo": ["bar", "baz"]}'
 
         """
+        if (c_encode is not None and self.ensure_ascii and
+                self.encoding == 'utf-8' and
+                (self.indent is None or isinstance(self.indent, (int, long)))
+                and type(self.item_separator) is str
+                and type(self.key_separator) is str):
+            return c_encode(o, self.default, bool(self.sort_keys),
+                            self.indent, self.item_separator,
+                            self.key_separator, bool(self.allow_nan),
+                            bool(self.check_circular), bool(self.skipkeys))
         if self.check_circular:
             markers = {}
         else:
@@ -536,3 +545,7 @@ try:
     from _pypyjson import raw_encode_basestring_ascii
 except ImportError:
     pass
+try:
+    from _pypyjson import encode as c_encode
+except ImportError:
+    c_encode = None
@@ -104,6 +104,9 @@ This module also defines an exception 'error'.
 import sys
 import sre_compile
 import sre_parse
+from _sre import cache_lookup as _sre_cache_lookup
+from _sre import cache_store as _sre_cache_store
+from _sre import cache_clear as _sre_cache_clear
 try:
     import _locale
 except ImportError:
@@ -197,6 +200,7 @@ def purge():
     "Clear the regular expression cache"
     _cache.clear()
     _cache_repl.clear()
+    _sre_cache_clear()
 
 def template(pattern, flags=0):
     "Compile a template pattern, returning a pattern object"
@@ -232,6 +236,12 @@ def _compile(*key):
     pattern, flags = key
     bypass_cache = flags & DEBUG
     if not bypass_cache:
+        # PyPy: the patterns that don't depend on the locale are cached
+        # at interp-level, and only the others in _cache (with the str
+        # and unicode subclasses, and the flags that are not ints)
+        p = _sre_cache_lookup(pattern, flags)
+        if p is not None:
+            return p
         cachekey = (type(key[0]),) + key
         try:
             p, loc = _cache[cachekey]
@@ -256,9 +266,9 @@ def _compile(*key):
             if not _locale:
                 return p
             loc = _locale.setlocale(_locale.LC_CTYPE)
-        else:
-            loc = None
-        _cache[cachekey] = p, loc
+            _cache[cachekey] = p, loc
+        elif not _sre_cache_store(pattern, flags, p):
+            _cache[cachekey] = p, None
     return p
 
 def _compile_repl(*key):
@@ -203,13 +203,38 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
                    "enable optimized ways to store lists of primitives ",
                    default=True),
 
+        BoolOption("withchunkedlist",
+                   "store big lists of objects that get items inserted or "
+                   "removed in the middle as a list of chunks",
+                   default=False,
+                   requires=[("objspace.std.withliststrategies", True)]),
+
+        BoolOption("withbytesslice",
+                   "make big slices of strings reference the string they "
+                   "come from instead of copying it",
+                   default=False),
+
+        BoolOption("withstrbuf",
+                   "make adding to a big string append to a string builder, "
+                   "so that building a string with += takes linear time",
+                   default=False),
+
+        BoolOption("withsharedkeysdict",
+                   "store small dicts with string keys as a list of values "
+                   "and a key map shared between dicts with the same keys",
+                   default=False),
+
         BoolOption("withmethodcachecounter",
                    "try to cache methods and provide a counter in __pypy__. "
-                   "for testing purposes only.",
+                   "for testing and tuning purposes only.",
                    default=False),
         IntOption("methodcachesizeexp",
                   " 2 ** methodcachesizeexp is the size of the of the method cache ",
                   default=11),
+        IntOption("inlinecachesize",
+                  "number of entries of the cache of every LOAD_ATTR and "
+                  "LOOKUP_METHOD opcode",
+                  default=4),
         BoolOption("intshortcut",
                    "special case addition and subtraction of two integers in BINARY_ADD/"
                    "/BINARY_SUBTRACT and their inplace counterparts",
@@ -257,6 +282,7 @@ def set_pypy_opt_level(config, level):
     if level == 'mem':
         config.objspace.std.suggest(withprebuiltint=True)
         config.objspace.std.suggest(withliststrategies=True)
+        config.objspace.std.suggest(withsharedkeysdict=True)
         if not IS_64_BITS:
             config.objspace.std.suggest(withsmalllong=True)
 
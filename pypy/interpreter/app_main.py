@@ -47,6 +47,8 @@ PYPY_IRC_TOPIC: if set to a non-empty value, print a random #pypy IRC
                topic at startup of interactive mode.
 PYPYLOG: If set to a non-empty value, enable logging.
 PYPY_DISABLE_JIT: if set to a non-empty value, disable JIT.
+PYPY_JIT_WARMUP_CACHE: file in which to record the loops compiled by the
+               JIT, used by later runs to start JIT-compiling them earlier.
 """
 
 try:
@@ -268,6 +270,14 @@ def set_jit_option(options, jitparam, *args):
         import pypyjit
         pypyjit.set_param(jitparam)
 
+def enable_jit_warmup_cache(filename):
+    if 'pypyjit' in sys.builtin_module_names:
+        import pypyjit
+        try:
+            pypyjit.enable_warmup_cache(filename)
+        except (OSError, IOError) as e:
+            print >> sys.stderr, "Warning: PYPY_JIT_WARMUP_CACHE: %s" % (e,)
+
 def run_faulthandler():
     if 'faulthandler' in sys.builtin_module_names:
         import faulthandler
@@ -560,6 +570,9 @@ def parse_command_line(argv):
         parse_env('PYTHONOPTIMIZE', "optimize", options)
         if getenv('PYPY_DISABLE_JIT'):
             set_jit_option(options, 'off')
+        jit_warmup_cache = getenv('PYPY_JIT_WARMUP_CACHE')
+        if jit_warmup_cache:
+            enable_jit_warmup_cache(jit_warmup_cache)
     if (options["interactive"] or
         (not options["ignore_environment"] and getenv('PYTHONINSPECT'))):
         options["inspect"] = 1
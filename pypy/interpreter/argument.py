@@ -219,11 +219,8 @@ class Arguments(object):
         elif avail > co_argcount:
             raise self.argerrcount(avail, num_kwds, signature, defaults_w, 0)
 
-        # if a **kwargs argument is needed, create the dict
+        # if a **kwargs argument is needed, the dict is created below
         w_kwds = None
-        if signature.has_kwarg():
-            w_kwds = self.space.newdict(kwargs=True)
-            scope_w[co_argcount + signature.has_vararg()] = w_kwds
 
         # handle keyword arguments
         num_remainingkwds = 0
@@ -244,17 +241,30 @@ class Arguments(object):
                     signature, blindargs, input_argcount, keywords,
                     kwds_mapping, self._jit_few_keywords)
             if num_remainingkwds:
-                if w_kwds is not None:
-                    # collect extra keyword arguments into the **kwarg
-                    _collect_keyword_args(
-                            self.space, keywords, keywords_w, w_kwds,
-                            kwds_mapping, self.keyword_names_w, self._jit_few_keywords)
+                if signature.has_kwarg():
+                    if (num_remainingkwds == num_kwds and
+                            self.keyword_names_w is None):
+                        # all the keyword arguments go to the **kwarg: it
+                        # can use our lists, which are never modified
+                        w_kwds = self.space.newkwargsdict(keywords, keywords_w)
+                    else:
+                        # collect extra keyword arguments into the **kwarg
+                        w_kwds = self.space.newdict(kwargs=True)
+                        _collect_keyword_args(
+                                self.space, keywords, keywords_w, w_kwds,
+                                kwds_mapping, self.keyword_names_w,
+                                self._jit_few_keywords)
                 else:
                     if co_argcount == 0:
                         raise self.argerrcount(avail, num_kwds, signature, defaults_w, 0)
                     raise ArgErrUnknownKwds(self.space, num_remainingkwds, keywords,
                                             kwds_mapping, self.keyword_names_w)
 
+        if signature.has_kwarg():
+            if w_kwds is None:
+                w_kwds = self.space.newdict(kwargs=True)
+            scope_w[co_argcount + signature.has_vararg()] = w_kwds
+
         # check for missing arguments and fill them from the kwds,
         # or with defaults, if available
         missing = 0
@@ -327,6 +337,8 @@ class Arguments(object):
         """Express the Argument object as a pair of wrapped w_args, w_kwds."""
         space = self.space
         w_args = space.newtuple(self.arguments_w)
+        if self.keywords and self.keyword_names_w is None:
+            return w_args, space.newkwargsdict(self.keywords, self.keywords_w)
         w_kwds = space.newdict()
         if self.keywords is not None:
             limit = len(self.keywords)
@@ -1120,6 +1120,16 @@ class ObjSpace(object):
         """
         return (None, None)
 
+    def newkwargsdict(self, keywords, keywords_w):
+        """ make a kwargs-dict with the given keys and values.  The dict may
+        use the two lists without copying them, so they must not be
+        modified afterwards.
+        """
+        w_kwds = self.newdict(kwargs=True)
+        for i in range(len(keywords)):
+            self.setitem_str(w_kwds, keywords[i], keywords_w[i])
+        return w_kwds
+
     def newlist_bytes(self, list_s):
         return self.newlist([self.newbytes(s) for s in list_s])
 
@@ -85,6 +85,9 @@ class DummySpace(object):
             return kwargsdict()
         return {}
 
+    def newkwargsdict(self, keywords, keywords_w):
+        return kwargsdict(zip(keywords, keywords_w))
+
     def newlist(self, l=[]):
         return l
 
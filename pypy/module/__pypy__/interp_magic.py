@@ -8,7 +8,7 @@ from pypy.objspace.std.dictmultiobject import W_DictMultiObject
 from pypy.objspace.std.listobject import W_ListObject
 from pypy.objspace.std.setobject import W_BaseSetObject
 from pypy.objspace.std.typeobject import MethodCache
-from pypy.objspace.std.mapdict import MapAttrCache
+from pypy.objspace.std.mapdict import MapAttrCache, InlineCacheCounters
 from rpython.rlib import rposix, rgc, rstack
 from rpython.rtyper.lltypesystem import rffi
 
@@ -41,6 +41,7 @@ def reset_method_cache_counter(space):
     cache = space.fromcache(MapAttrCache)
     cache.misses = {}
     cache.hits = {}
+    space.fromcache(InlineCacheCounters).reset()
 
 @unwrap_spec(name='text')
 def mapdict_cache_counter(space, name):
@@ -51,6 +52,19 @@ def mapdict_cache_counter(space, name):
     return space.newtuple2(space.newint(cache.hits.get(name, 0)),
                            space.newint(cache.misses.get(name, 0)))
 
+def inline_cache_counter(space):
+    """Return a tuple (hits, polymorphic_hits, misses, evictions) for the
+    caches of the LOAD_ATTR and LOOKUP_METHOD opcodes.  'hits' are found in
+    the most recently used entry of a cache, 'polymorphic_hits' in one of
+    its other entries, and 'evictions' counts the misses that had to throw
+    away an entry because the cache was full."""
+    assert space.config.objspace.std.withmethodcachecounter
+    counters = space.fromcache(InlineCacheCounters)
+    return space.newtuple([space.newint(counters.hits),
+                           space.newint(counters.polymorphic_hits),
+                           space.newint(counters.misses),
+                           space.newint(counters.evictions)])
+
 def builtinify(space, w_func):
     """To implement at app-level modules that are, in CPython,
     implemented in C: this decorator protects a function from being ever
@@ -1,5 +1,6 @@
 from rpython.rlib.rstring import StringBuilder
 from rpython.rlib import objectmodel
+from rpython.rtyper.lltypesystem import lltype, rffi
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.gateway import unwrap_spec
@@ -9,6 +10,7 @@ from pypy.module._csv.interp_csv import _build_dialect
 from pypy.module._csv.interp_csv import (QUOTE_MINIMAL, QUOTE_ALL,
                                          QUOTE_NONNUMERIC, QUOTE_NONE)
 from pypy.objspace.std.util import wrap_parsestringerror
+from pypy.module._pypyjson import simd
 
 (START_RECORD, START_FIELD, ESCAPED_CHAR, IN_FIELD,
  IN_QUOTED_FIELD, ESCAPE_IN_QUOTED_FIELD, QUOTE_IN_QUOTED_FIELD,
@@ -39,6 +41,16 @@ class W_Reader(W_Root):
             raise self.error("field larger than field limit")
         field_builder.append(c)
 
+    def add_run(self, field_builder, line, ll_chars, i, c1):
+        """Copy into the field the characters of line starting at i, up to
+        the next c1, newline or NUL character, and return its index."""
+        end = find_special(ll_chars, i, len(line), c1)
+        if end > i:
+            if field_builder.getlength() + (end - i) > field_limit.limit:
+                raise self.error("field larger than field limit")
+            field_builder.append_slice(line, i, end)
+        return end
+
     def save_field(self, field_builder):
         space = self.space
         field = field_builder.build()
@@ -80,115 +92,22 @@ class W_Reader(W_Root):
                 raise
             self.line_num += 1
             line = space.text_w(w_line)
-            for c in line:
-                if c == '\0':
-                    raise self.error("line contains NULL byte")
-
-                if state == START_RECORD:
-                    if c == '\n' or c == '\r':
-                        state = EAT_CRNL
-                        continue
-                    # normal character - handle as START_FIELD
-                    state = START_FIELD
-                    # fall-through to the next case
-
-                if state == START_FIELD:
-                    field_builder = StringBuilder(64)
-                    # expecting field
-                    if c == '\n' or c == '\r':
-                        # save empty field
-                        self.save_field(field_builder)
-                        state = EAT_CRNL
-                    elif (c == dialect.quotechar and
-                              dialect.quoting != QUOTE_NONE):
-                        # start quoted field
-                        state = IN_QUOTED_FIELD
-                    elif c == dialect.escapechar:
-                        # possible escaped character
-                        state = ESCAPED_CHAR
-                    elif c == ' ' and dialect.skipinitialspace:
-                        # ignore space at start of field
-                        pass
-                    elif c == dialect.delimiter:
-                        # save empty field
-                        self.save_field(field_builder)
-                    else:
-                        # begin new unquoted field
-                        if dialect.quoting == QUOTE_NONNUMERIC:
-                            self.numeric_field = True
-                        self.add_char(field_builder, c)
-                        state = IN_FIELD
-
-                elif state == ESCAPED_CHAR:
-                    self.add_char(field_builder, c)
-                    state = IN_FIELD
-
-                elif state == IN_FIELD:
-                    # in unquoted field
-                    if c == '\n' or c == '\r':
-                        # end of line
-                        self.save_field(field_builder)
-                        state = EAT_CRNL
-                    elif c == dialect.escapechar:
-                        # possible escaped character
-                        state = ESCAPED_CHAR
-                    elif c == dialect.delimiter:
-                        # save field - wait for new field
-                        self.save_field(field_builder)
-                        state = START_FIELD
-                    else:
-                        # normal character - save in field
-                        self.add_char(field_builder, c)
-
-                elif state == IN_QUOTED_FIELD:
-                    # in quoted field
-                    if c == dialect.escapechar:
-                        # Possible escape character
-                        state = ESCAPE_IN_QUOTED_FIELD
-                    elif (c == dialect.quotechar and
-                              dialect.quoting != QUOTE_NONE):
-                        if dialect.doublequote:
-                            # doublequote; " represented by ""
-                            state = QUOTE_IN_QUOTED_FIELD
-                        else:
-                            # end of quote part of field
-                            state = IN_FIELD
-                    else:
-                        # normal character - save in field
-                        self.add_char(field_builder, c)
-
-                elif state == ESCAPE_IN_QUOTED_FIELD:
-                    self.add_char(field_builder, c)
-                    state = IN_QUOTED_FIELD
-
-                elif state == QUOTE_IN_QUOTED_FIELD:
-                    # doublequote - seen a quote in an quoted field
-                    if (dialect.quoting != QUOTE_NONE and
-                            c == dialect.quotechar):
-                        # save "" as "
-                        self.add_char(field_builder, c)
-                        state = IN_QUOTED_FIELD
-                    elif c == dialect.delimiter:
-                        # save field - wait for new field
-                        self.save_field(field_builder)
-                        state = START_FIELD
-                    elif c == '\n' or c == '\r':
-                        # end of line
-                        self.save_field(field_builder)
-                        state = EAT_CRNL
-                    elif not dialect.strict:
-                        self.add_char(field_builder, c)
-                        state = IN_FIELD
-                    else:
-                        # illegal
-                        raise self.error("'%s' expected after '%s'" % (
-                            dialect.delimiter, dialect.quotechar))
-
-                elif state == EAT_CRNL:
-                    if not (c == '\n' or c == '\r'):
-                        raise self.error("new-line character seen in unquoted "
-                                        "field - do you need to open the file "
-                                        "in universal-newline mode?")
+            # without an escapechar, runs of plain characters in a field
+            # are found by scanning the raw buffer of the line a word at a
+            # time, and copied into the field in one go
+            fast_scan = dialect.escapechar == '\0'
+            if fast_scan:
+                ll_chars, llobj, flag = (
+                    rffi.get_nonmovingbuffer_ll_final_null(line))
+                try:
+                    state, field_builder = self._parse_line(
+                        line, ll_chars, True, state, field_builder)
+                finally:
+                    rffi.free_nonmovingbuffer_ll(ll_chars, llobj, flag)
+            else:
+                state, field_builder = self._parse_line(
+                    line, lltype.nullptr(rffi.CCHARP.TO), False,
+                    state, field_builder)
 
             if state == IN_FIELD or state == QUOTE_IN_QUOTED_FIELD:
                 self.save_field(field_builder)
@@ -213,6 +132,131 @@ class W_Reader(W_Root):
         self.fields_w = None
         return w_result
 
+    def _parse_line(self, line, ll_chars, fast_scan, state, field_builder):
+        dialect = self.dialect
+        i = 0
+        while i < len(line):
+            c = line[i]
+            i += 1
+            if c == '\0':
+                raise self.error("line contains NULL byte")
+
+            if state == START_RECORD:
+                if c == '\n' or c == '\r':
+                    state = EAT_CRNL
+                    continue
+                # normal character - handle as START_FIELD
+                state = START_FIELD
+                # fall-through to the next case
+
+            if state == START_FIELD:
+                field_builder = StringBuilder(64)
+                # expecting field
+                if c == '\n' or c == '\r':
+                    # save empty field
+                    self.save_field(field_builder)
+                    state = EAT_CRNL
+                elif (c == dialect.quotechar and
+                          dialect.quoting != QUOTE_NONE):
+                    # start quoted field
+                    state = IN_QUOTED_FIELD
+                elif c == dialect.escapechar:
+                    # possible escaped character
+                    state = ESCAPED_CHAR
+                elif c == ' ' and dialect.skipinitialspace:
+                    # ignore space at start of field
+                    pass
+                elif c == dialect.delimiter:
+                    # save empty field
+                    self.save_field(field_builder)
+                else:
+                    # begin new unquoted field
+                    if dialect.quoting == QUOTE_NONNUMERIC:
+                        self.numeric_field = True
+                    self.add_char(field_builder, c)
+                    state = IN_FIELD
+                    if fast_scan:
+                        i = self.add_run(field_builder, line, ll_chars, i,
+                                         dialect.delimiter)
+
+            elif state == ESCAPED_CHAR:
+                self.add_char(field_builder, c)
+                state = IN_FIELD
+
+            elif state == IN_FIELD:
+                # in unquoted field
+                if c == '\n' or c == '\r':
+                    # end of line
+                    self.save_field(field_builder)
+                    state = EAT_CRNL
+                elif c == dialect.escapechar:
+                    # possible escaped character
+                    state = ESCAPED_CHAR
+                elif c == dialect.delimiter:
+                    # save field - wait for new field
+                    self.save_field(field_builder)
+                    state = START_FIELD
+                else:
+                    # normal character - save in field
+                    self.add_char(field_builder, c)
+                    if fast_scan:
+                        i = self.add_run(field_builder, line, ll_chars, i,
+                                         dialect.delimiter)
+
+            elif state == IN_QUOTED_FIELD:
+                # in quoted field
+                if c == dialect.escapechar:
+                    # Possible escape character
+                    state = ESCAPE_IN_QUOTED_FIELD
+                elif (c == dialect.quotechar and
+                          dialect.quoting != QUOTE_NONE):
+                    if dialect.doublequote:
+                        # doublequote; " represented by ""
+                        state = QUOTE_IN_QUOTED_FIELD
+                    else:
+                        # end of quote part of field
+                        state = IN_FIELD
+                else:
+                    # normal character - save in field
+                    self.add_char(field_builder, c)
+                    if fast_scan:
+                        i = self.add_run(field_builder, line, ll_chars, i,
+                                         dialect.quotechar)
+
+            elif state == ESCAPE_IN_QUOTED_FIELD:
+                self.add_char(field_builder, c)
+                state = IN_QUOTED_FIELD
+
+            elif state == QUOTE_IN_QUOTED_FIELD:
+                # doublequote - seen a quote in an quoted field
+                if (dialect.quoting != QUOTE_NONE and
+                        c == dialect.quotechar):
+                    # save "" as "
+                    self.add_char(field_builder, c)
+                    state = IN_QUOTED_FIELD
+                elif c == dialect.delimiter:
+                    # save field - wait for new field
+                    self.save_field(field_builder)
+                    state = START_FIELD
+                elif c == '\n' or c == '\r':
+                    # end of line
+                    self.save_field(field_builder)
+                    state = EAT_CRNL
+                elif not dialect.strict:
+                    self.add_char(field_builder, c)
+                    state = IN_FIELD
+                else:
+                    # illegal
+                    raise self.error("'%s' expected after '%s'" % (
+                        dialect.delimiter, dialect.quotechar))
+
+            elif state == EAT_CRNL:
+                if not (c == '\n' or c == '\r'):
+                    raise self.error("new-line character seen in unquoted "
+                                    "field - do you need to open the file "
+                                    "in universal-newline mode?")
+        return state, field_builder
+
 
 def csv_reader(space, w_iterator, w_dialect=None,
                   w_delimiter        = None,
@@ -244,6 +288,38 @@ def csv_reader(space, w_iterator, w_dialect=None,
                              w_quoting, w_skipinitialspace, w_strict)
     return W_Reader(space, dialect, w_iter)
 
+def _find_special_slow(ll_chars, i, length, c1):
+    while True:
+        ch = ll_chars[i]
+        if ch == c1 or ch == '\n' or ch == '\r' or ch == '\0':
+            return i
+        i += 1
+
+MASK_NL = simd.char_repeated_word_width('\n')
+MASK_CR = simd.char_repeated_word_width('\r')
+
+def _find_special_simd(ll_chars, i, length, c1):
+    mask1 = simd.char_repeated_word_width(c1)
+    wordarray = rffi.cast(rffi.UNSIGNEDP, rffi.ptradd(ll_chars, i))
+    num_safe_reads = (length - i) // simd.WORD_SIZE
+    for j in range(num_safe_reads):
+        word = wordarray[j]
+        cond = simd.any_char_in_words_zero(
+            word ^ mask1, word ^ MASK_NL, word ^ MASK_CR, word)
+        if cond:
+            return i + j * simd.WORD_SIZE + simd.index_nonzero(cond)
+    return _find_special_slow(ll_chars, i + num_safe_reads * simd.WORD_SIZE,
+                              length, c1)
+
+def find_special(ll_chars, i, length, c1):
+    """Return the index of the first c1, newline or NUL character at or
+    after i in the buffer ll_chars, which holds a string of the given
+    length followed by a NUL character."""
+    if simd.USE_SIMD:
+        return _find_special_simd(ll_chars, i, length, c1)
+    return _find_special_slow(ll_chars, i, length, c1)
+
+
 W_Reader.typedef = TypeDef(
         '_csv.reader',
         dialect = interp_attrproperty_w('dialect', W_Reader),
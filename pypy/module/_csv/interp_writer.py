@@ -8,6 +8,9 @@ from pypy.module._csv.interp_csv import _build_dialect
 from pypy.module._csv.interp_csv import (QUOTE_MINIMAL, QUOTE_ALL,
                                          QUOTE_NONNUMERIC, QUOTE_NONE)
 
+# writerows() sends the records to the file in chunks of about this size
+WRITEROWS_CHUNK_SIZE = 64 * 1024
+
 
 class W_Writer(W_Root):
     def __init__(self, space, dialect, w_fileobj):
@@ -29,13 +32,26 @@ class W_Writer(W_Root):
         w_error = space.getattr(w_module, space.newtext('Error'))
         raise OperationError(w_error, space.newtext(msg))
 
+    def contains_special(self, field):
+        special_characters = self.special_characters
+        for c in field:
+            if c in special_characters:
+                return True
+        return False
+
     def writerow(self, w_fields):
         """Construct and write a CSV record from a sequence of fields.
         Non-string elements will be converted to string."""
+        space = self.space
+        rec = StringBuilder(80)
+        self.build_record(rec, w_fields)
+        line = rec.build()
+        return space.call_function(self.w_filewrite, space.newtext(line))
+
+    def build_record(self, rec, w_fields):
         space = self.space
         fields_w = space.listview(w_fields)
         dialect = self.dialect
-        rec = StringBuilder(80)
         #
         for field_index in range(len(fields_w)):
             w_field = fields_w[field_index]
@@ -85,6 +101,11 @@ class W_Writer(W_Root):
                 rec.append(dialect.quotechar)
 
             # Copy field data
+            if not self.contains_special(field):
+                rec.append(field)
+                if quoted:
+                    rec.append(dialect.quotechar)
+                continue
             special_characters = self.special_characters
             for c in field:
                 if c in special_characters:
@@ -114,22 +135,35 @@ class W_Writer(W_Root):
         # Add line terminator
         rec.append(dialect.lineterminator)
 
-        line = rec.build()
-        return space.call_function(self.w_filewrite, space.newtext(line))
-
     def writerows(self, w_seqseq):
         """Construct and write a series of sequences to a csv file.
         Non-string elements will be converted to string."""
+        # the records are collected in a single StringBuilder, which is
+        # written whenever it exceeds WRITEROWS_CHUNK_SIZE.  If a row
+        # cannot be converted, the complete records before it are still
+        # written before the exception propagates, like with writerow().
         space = self.space
         w_iter = space.iter(w_seqseq)
+        rec = StringBuilder(WRITEROWS_CHUNK_SIZE)
         while True:
+            length = rec.getlength()
+            if length >= WRITEROWS_CHUNK_SIZE:
+                self.write_chunk(rec.build())
+                rec = StringBuilder(WRITEROWS_CHUNK_SIZE)
+                length = 0
             try:
                 w_seq = space.next(w_iter)
+                self.build_record(rec, w_seq)
             except OperationError as e:
+                if length > 0:
+                    self.write_chunk(rec.build()[:length])
                 if e.match(space, space.w_StopIteration):
                     break
                 raise
-            self.writerow(w_seq)
+
+    def write_chunk(self, chunk):
+        space = self.space
+        space.call_function(self.w_filewrite, space.newtext(chunk))
 
 
 def csv_writer(space, w_fileobj, w_dialect=None,
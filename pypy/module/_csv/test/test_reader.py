@@ -104,3 +104,17 @@ class AppTestReader(object):
         self._read_test(['a,"'], 'Error', strict=True)
         self._read_test(['"a'], 'Error', strict=True)
         self._read_test(['^'], 'Error', escapechar='^', strict=True)
+
+    def test_read_long_fields(self):
+        # long runs of plain characters, crossing word boundaries
+        for n in range(20):
+            a = 'x' * n
+            b = 'y' * (n * 3)
+            self._read_test(['%s,%s\r\n' % (a, b)], [[a, b]])
+            self._read_test(['"%s,%s"\n' % (a, b)], [['%s,%s' % (a, b)]])
+            self._read_test(['"%s\n' % a, '%s"\n' % b], [['%s\n%s' % (a, b)]])
+            self._read_test(['%s,"%s""%s"' % (a, b, a)], [[a, b + '"' + a]])
+            self._read_test(['%s;%s' % (a, b)], [[a, b]], delimiter=';')
+            self._read_test(['%s\0%s' % (a, b)], 'Error')
+            self._read_test(['"%s\0%s"' % (a, b)], 'Error')
+            self._read_test(['z%s\rz%s' % (a, b)], 'Error')
@@ -85,3 +85,34 @@ class AppTestWriter(object):
 
     def test_writerows(self):
         self._write_test([['a'],['b','c']], 'a\r\nb,c')
+
+    def test_writerows_chunks(self):
+        import _csv
+        class DummyFile(object):
+            def __init__(self):
+                self.parts = []
+            def write(self, s):
+                self.parts.append(s)
+        rows = [['x' * 100, i, None, 'a,b'] for i in range(2000)]
+        f = DummyFile()
+        assert _csv.writer(f).writerows(rows) is None
+        expected = ''.join(['%s,%d,,"a,b"\r\n' % ('x' * 100, i)
+                            for i in range(2000)])
+        assert ''.join(f.parts) == expected
+        assert 1 < len(f.parts) < 2000
+        # the rows before an error are written
+        class BadList:
+            def __len__(self):
+                return 10
+            def __getitem__(self, i):
+                raise IOError
+        f = DummyFile()
+        writer = _csv.writer(f)
+        raises(IOError, writer.writerows, [['a'], ['b'], BadList(), ['c']])
+        assert ''.join(f.parts) == 'a\r\nb\r\n'
+        def gen():
+            yield ['a', 'b']
+            raise ValueError
+        f = DummyFile()
+        raises(ValueError, _csv.writer(f).writerows, gen())
+        assert ''.join(f.parts) == 'a,b\r\n'
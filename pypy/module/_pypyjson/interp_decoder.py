@@ -4,7 +4,9 @@ from rpython.rlib.objectmodel import specialize, always_inline
 from rpython.rlib import rfloat, runicode, jit, objectmodel, rutf8
 from rpython.rtyper.lltypesystem import lltype, rffi
 from rpython.rlib.rarithmetic import r_uint
-from pypy.interpreter.error import oefmt
+from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.interpreter.typedef import TypeDef
 from pypy.interpreter import unicodehelper
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.module._pypyjson import simd
@@ -72,12 +74,26 @@ class JSONDecoder(W_Root):
     # don't make arbitrarily huge maps
     MAX_MAP_SIZE = 100
 
+    # the caches shared by the decoders of the values of a stream are
+    # dropped when they have more entries than this, so that they don't
+    # grow with the whole stream
+    MAX_REUSED_CACHE_SIZE = 10000
 
-    def __init__(self, space, s):
+
+    def __init__(self, space, s, w_object_classes=None):
         self.space = space
         self.w_empty_string = space.newutf8("", 0)
 
+        # optionally, a dict {tuple of keys: class}: the objects with these
+        # keys are decoded as instances of the class instead of dicts.
+        # map_classes caches the ObjectShape of every map seen.
+        self.w_object_classes = w_object_classes
+        self.map_classes = {}
+
         self.s = s
+        # the size used to decide whether to cache the strings; it is bigger
+        # than len(s) for the values of a stream (see W_StreamDecoder)
+        self.input_size = len(s)
 
         # we put our string in a raw buffer so:
         # 1) we automatically get the '\0' sentinel at the end of the string,
@@ -113,6 +129,19 @@ class JSONDecoder(W_Root):
         self.scratch = [[None] * self.DEFAULT_SIZE_SCRATCH]
 
 
+    def reuse_caches(self, other):
+        """Use the string caches of the decoder of the previous value of a
+        stream.  A cache with more than MAX_REUSED_CACHE_SIZE entries is
+        not reused: this decoder starts again with an empty one."""
+        if len(other.cache_keys) <= self.MAX_REUSED_CACHE_SIZE:
+            self.cache_keys = other.cache_keys
+        if len(other.cache_values) <= self.MAX_REUSED_CACHE_SIZE:
+            self.cache_values = other.cache_values
+        self.lru_cache = other.lru_cache
+        self.lru_index = other.lru_index
+        if len(other.map_classes) <= self.MAX_REUSED_CACHE_SIZE:
+            self.map_classes = other.map_classes
+
     def close(self):
         rffi.free_nonmovingbuffer_ll(self.ll_chars, self.llobj, self.flag)
         lltype.free(self.end_ptr, flavor='raw')
@@ -332,6 +361,10 @@ class JSONDecoder(W_Root):
         i = self.skip_whitespace(i)
         if self.ll_chars[i] == '}':
             self.pos = i+1
+            if self.w_object_classes is not None:
+                w_res = self._create_object(self.startmap, [])
+                if w_res is not None:
+                    return w_res
             return self.space.newdict()
 
         if self.scratch:
@@ -368,6 +401,10 @@ class JSONDecoder(W_Root):
             if ch == '}':
                 self.pos = i
                 self.scratch.append(values_w)  # can reuse next time
+                if self.w_object_classes is not None:
+                    w_res = self._create_object(currmap, values_w)
+                    if w_res is not None:
+                        return w_res
                 if currmap.is_state_blocked():
                     dict_w = self._switch_to_dict(currmap, values_w, nextindex)
                     return self._create_dict(dict_w)
@@ -385,6 +422,52 @@ class JSONDecoder(W_Root):
             else:
                 self._raise_object_error(ch, start, i - 1)
 
+    def _create_object(self, jsonmap, values_w):
+        """Returns an instance of the class that object_classes gives for
+        the keys of jsonmap, or None."""
+        try:
+            shape = self.map_classes[jsonmap]
+        except KeyError:
+            shape = self._make_object_shape(jsonmap)
+            self.map_classes[jsonmap] = shape
+        if shape.w_class is None:
+            return None
+        return shape.instantiate(values_w)
+
+    def _create_object_from_dict(self, dict_w):
+        """Like _create_object(), for an object that was decoded into a
+        dict instead of a map: that happens for a repeated key, or when the
+        maps are blocked, which depends on the documents decoded before."""
+        space = self.space
+        keys_w = [None] * len(dict_w)
+        values_w = [None] * len(dict_w)
+        index = 0
+        for w_key, w_value in dict_w.iteritems():
+            keys_w[index] = w_key
+            values_w[index] = w_value
+            index += 1
+        w_class = space.finditem(self.w_object_classes,
+                                 space.newtuple(keys_w))
+        if w_class is None:
+            return None
+        return ObjectShape(space, w_class, keys_w).instantiate(values_w)
+
+    def _make_object_shape(self, jsonmap):
+        space = self.space
+        length = 0
+        curr = jsonmap
+        while isinstance(curr, JSONMap):
+            length += 1
+            curr = curr.prev
+        keys_w = [None] * length
+        while isinstance(jsonmap, JSONMap):
+            length -= 1
+            keys_w[length] = jsonmap.w_key
+            jsonmap = jsonmap.prev
+        w_class = space.finditem(self.w_object_classes,
+                                 space.newtuple(keys_w))
+        return ObjectShape(space, w_class, keys_w)
+
     def _create_dict_map(self, values_w, jsonmap):
         from pypy.objspace.std.jsondict import from_values_and_jsonmap
         return from_values_and_jsonmap(self.space, values_w, jsonmap)
@@ -420,6 +503,10 @@ class JSONDecoder(W_Root):
             i += 1
             if ch == '}':
                 self.pos = i
+                if self.w_object_classes is not None:
+                    w_res = self._create_object_from_dict(dict_w)
+                    if w_res is not None:
+                        return w_res
                 return self._create_dict(dict_w)
             elif ch == ',':
                 i = self.skip_whitespace(i)
@@ -569,7 +656,7 @@ class JSONDecoder(W_Root):
             contextmap.decoded_strings += 1
             if not contextmap.should_cache_strings():
                 cache = False
-        if len(self.s) < self.MIN_SIZE_FOR_STRING_CACHE:
+        if self.input_size < self.MIN_SIZE_FOR_STRING_CACHE:
             cache = False
 
         if not cache:
@@ -683,6 +770,76 @@ class JSONDecoder(W_Root):
         return self._decode_key_string(i)
 
 
+class ObjectShape(object):
+    """How to make an instance of a class given in object_classes, from the
+    values of a JSON object with the keys keys_w (w_class is None if there
+    is no class for these keys).
+
+    A subclass of tuple, like a namedtuple, is made with tuple.__new__(),
+    with the values in the order of its _fields.  Any other class is made
+    with object.__new__(), without calling __init__, and the values are
+    stored as attributes of the instance in the order of the keys, so that
+    all the instances share their mapdict map."""
+
+    def __init__(self, space, w_class, keys_w):
+        self.space = space
+        self.w_class = w_class
+        # the keys are only turned into attribute names if there is a class
+        # that is not a tuple: they may be any unicode strings otherwise
+        self.attrnames = None
+        self.tuple_order = None
+        if w_class is None:
+            return
+        if not space.isinstance_w(w_class, space.w_type):
+            raise oefmt(space.w_TypeError,
+                        "object_classes values must be classes, not %T",
+                        w_class)
+        if space.issubtype_w(w_class, space.w_tuple):
+            self.w_new = space.getattr(space.w_tuple, space.newtext('__new__'))
+            self.tuple_order = self._get_tuple_order(keys_w)
+        else:
+            self.w_new = space.getattr(space.w_object,
+                                       space.newtext('__new__'))
+            self.attrnames = [space.text_w(w_key) for w_key in keys_w]
+
+    def _get_tuple_order(self, keys_w):
+        space = self.space
+        w_fields = space.findattr(self.w_class, space.newtext('_fields'))
+        if w_fields is None:
+            return range(len(keys_w))
+        fields_w = space.fixedview(w_fields)
+        order = [0] * len(fields_w)
+        for i in range(len(fields_w)):
+            w_field = fields_w[i]
+            for j in range(len(keys_w)):
+                if space.eq_w(keys_w[j], w_field):
+                    order[i] = j
+                    break
+            else:
+                raise oefmt(space.w_TypeError,
+                            "%N has a field %R that is not a key",
+                            self.w_class, w_field)
+        if len(order) != len(keys_w):
+            raise oefmt(space.w_TypeError,
+                        "%N has %d fields, but the object has %d keys",
+                        self.w_class, len(order), len(keys_w))
+        return order
+
+    def instantiate(self, values_w):
+        space = self.space
+        if self.tuple_order is not None:
+            items_w = [values_w[i] for i in self.tuple_order]
+            return space.call_function(self.w_new, self.w_class,
+                                       space.newtuple(items_w))
+        w_obj = space.call_function(self.w_new, self.w_class)
+        for i in range(len(self.attrnames)):
+            attr = self.attrnames[i]
+            if not w_obj.setdictvalue(space, attr, values_w[i]):
+                # e.g. __slots__
+                space.setattr(w_obj, space.newtext(attr), values_w[i])
+        return w_obj
+
+
 class StringCacheEntry(object):
     """ A cache entry, bundling the encoded version of a string as it appears
     in the input string, and its wrapped decoded variant. """
@@ -1177,21 +1334,305 @@ class JSONMap(MapBase):
         return res
 
 @jit.dont_look_inside
-def loads(space, w_s):
+def loads(space, w_s, w_object_classes=None):
+    """loads(s, object_classes=None) -> value
+
+    Decode the utf8-encoded str s.  object_classes is an optional dict
+    {tuple of keys: class}: the JSON objects whose keys are exactly these,
+    in this order, are decoded as instances of the class instead of as
+    dicts (see ObjectShape)."""
     if space.isinstance_w(w_s, space.w_unicode):
         raise oefmt(space.w_TypeError,
                     "Expected utf8-encoded str, got unicode")
     s = space.bytes_w(w_s)
-    decoder = JSONDecoder(space, s)
+    decoder = JSONDecoder(space, s, _object_classes(space, w_object_classes))
     try:
-        w_res = decoder.decode_any(0)
-        i = decoder.skip_whitespace(decoder.pos)
-        if i < len(s):
-            start = i
-            end = len(s) - 1
-            raise oefmt(space.w_ValueError,
-                        "Extra data: char %d - %d", start, end)
-        return w_res
+        return _decode_all(decoder)
     finally:
         decoder.close()
 
+def _object_classes(space, w_object_classes):
+    if space.is_none(w_object_classes):
+        return None
+    if not space.isinstance_w(w_object_classes, space.w_dict):
+        raise oefmt(space.w_TypeError,
+                    "object_classes must be a dict, not %T", w_object_classes)
+    return w_object_classes
+
+def _decode_all(decoder):
+    s = decoder.s
+    w_res = decoder.decode_any(0)
+    i = decoder.skip_whitespace(decoder.pos)
+    if i < len(s):
+        start = i
+        end = len(s) - 1
+        raise oefmt(decoder.space.w_ValueError,
+                    "Extra data: char %d - %d", start, end)
+    return w_res
+
+
+# ____________________________________________________________
+# decoding a stream of values
+
+# what W_StreamDecoder expects next, with array=True
+ARRAY_START = 0       # the '['
+ARRAY_FIRST = 1       # the first item, or ']'
+ARRAY_NEXT = 2        # ',' or ']'
+ARRAY_ITEM = 3        # an item, after ','
+ARRAY_DONE = 4
+
+class W_StreamDecoder(W_Root):
+    """Iterates over the JSON values that follow each other in the chunks of
+    str read from a file or an iterator: either top-level values (separated
+    by whitespace, like newline-delimited JSON), or the items of one
+    top-level array.
+
+    The chunks are only scanned to find where each value ends: the
+    characters of a value are kept until it is complete, and then decoded
+    by a JSONDecoder.  The decoders of the successive values share their
+    string caches, up to a size limit (see JSONDecoder.reuse_caches()); the
+    maps of the decoded objects are shared anyway."""
+
+    def __init__(self, space, w_source, array, chunk_size,
+                 w_object_classes=None):
+        self.space = space
+        self.w_object_classes = w_object_classes
+        self.w_read = space.findattr(w_source, space.newtext('read'))
+        if self.w_read is None:
+            self.w_iter = space.iter(w_source)
+        else:
+            self.w_iter = None
+        self.chunk_size = chunk_size
+        self.array = array
+        self.array_state = ARRAY_START
+        self.eof = False
+        self.bytes_read = 0
+        self.prev_decoder = None
+        # the current chunk, and the position up to which it was scanned
+        self.buf = ''
+        self.pos = 0
+        # the state of the scan of the current value, if it started: the
+        # beginning of the value in 'buf', and the parts of it that were in
+        # previous chunks
+        self.in_value = False
+        self.start = 0
+        self.parts = []
+        self.depth = 0            # of nested arrays and objects
+        self.in_string = False
+        self.escape = False       # after a backslash in a string
+
+    def read_chunk(self):
+        """Get the next chunk into 'buf'; returns False at the end of the
+        input."""
+        space = self.space
+        chunk = ''
+        while not chunk:
+            if self.eof:
+                return False
+            if self.w_read is not None:
+                w_chunk = space.call_function(self.w_read,
+                                              space.newint(self.chunk_size))
+            else:
+                try:
+                    w_chunk = space.next(self.w_iter)
+                except OperationError as e:
+                    if not e.match(space, space.w_StopIteration):
+                        raise
+                    self.eof = True
+                    return False
+            if space.isinstance_w(w_chunk, space.w_unicode):
+                raise oefmt(space.w_TypeError,
+                            "Expected utf8-encoded str, got unicode")
+            chunk = space.bytes_w(w_chunk)
+            if not chunk and self.w_read is not None:
+                self.eof = True      # read() returns '' at the end
+        if self.in_value:
+            # keep the beginning of the current value
+            start = self.start
+            assert start >= 0
+            self.parts.append(self.buf[start:])
+            self.start = 0
+        self.buf = chunk
+        self.pos = 0
+        self.bytes_read += len(chunk)
+        return True
+
+    def scan_value(self):
+        """Continue the scan of the current value in 'buf'.  Returns the
+        position after its end, or -1 if it doesn't end in 'buf'."""
+        buf = self.buf
+        i = self.pos
+        depth = self.depth
+        in_string = self.in_string
+        escape = self.escape
+        end = -1
+        while i < len(buf):
+            ch = buf[i]
+            i += 1
+            if in_string:
+                if escape:
+                    escape = False
+                elif ch == '\\':
+                    escape = True
+                elif ch == '"':
+                    in_string = False
+                    if depth == 0:
+                        end = i
+                        break
+            elif depth == 0:
+                # a number, true, false, null...: it ends before a character
+                # that can't be part of it
+                if is_whitespace(ch) or ch == ',' or ch == ']' or ch == '}':
+                    end = i - 1
+                    break
+            elif ch == '"':
+                in_string = True
+            elif ch == '[' or ch == '{':
+                depth += 1
+            elif ch == ']' or ch == '}':
+                depth -= 1
+                if depth == 0:
+                    end = i
+                    break
+        self.pos = i
+        self.depth = depth
+        self.in_string = in_string
+        self.escape = escape
+        return end
+
+    def start_value(self):
+        ch = self.buf[self.pos]
+        self.in_value = True
+        self.start = self.pos
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        if ch == '[' or ch == '{':
+            self.depth = 1
+        elif ch == '"':
+            self.in_string = True
+        self.pos += 1
+
+    def end_value(self, end):
+        """Returns the text of the value that ends at 'end' in 'buf'."""
+        start = self.start
+        assert start >= 0
+        assert end >= start
+        text = self.buf[start:end]
+        if self.parts:
+            self.parts.append(text)
+            text = ''.join(self.parts)
+            self.parts = []
+        self.in_value = False
+        self.pos = end
+        if self.array:
+            self.array_state = ARRAY_NEXT
+        return text
+
+    def skip_separators(self):
+        """Skip the whitespace (and for an array, the punctuation) before the
+        next value in 'buf'.  Returns True if there are no more values."""
+        space = self.space
+        buf = self.buf
+        while self.pos < len(buf):
+            ch = buf[self.pos]
+            if is_whitespace(ch):
+                self.pos += 1
+                continue
+            if not self.array:
+                return False
+            state = self.array_state
+            if state == ARRAY_START:
+                if ch != '[':
+                    raise oefmt(space.w_ValueError,
+                                "Expected '[' at the start of the input")
+                self.array_state = ARRAY_FIRST
+            elif state == ARRAY_FIRST and ch == ']':
+                self.array_state = ARRAY_DONE
+            elif state == ARRAY_NEXT:
+                if ch == ',':
+                    self.array_state = ARRAY_ITEM
+                elif ch == ']':
+                    self.array_state = ARRAY_DONE
+                else:
+                    raise oefmt(space.w_ValueError,
+                                "Unexpected '%s' when decoding array", ch)
+            elif state == ARRAY_DONE:
+                raise oefmt(space.w_ValueError,
+                            "Extra data after the end of the array")
+            elif ch == ']':
+                raise oefmt(space.w_ValueError,
+                            "Unexpected ']' when decoding array")
+            else:
+                return False
+            self.pos += 1
+        return False
+
+    def next_text(self):
+        """Returns the text of the next value, or None at the end."""
+        while True:
+            if not self.in_value:
+                self.skip_separators()
+                if self.pos < len(self.buf):
+                    self.start_value()
+            if self.in_value:
+                end = self.scan_value()
+                if end >= 0:
+                    return self.end_value(end)
+            if not self.read_chunk():
+                break
+        # end of the input
+        if self.in_value:
+            # a number at the very end, or a truncated value: the decoder
+            # raises the right error for the latter
+            return self.end_value(len(self.buf))
+        if self.array and self.array_state != ARRAY_DONE:
+            if self.array_state == ARRAY_START:
+                raise oefmt(self.space.w_ValueError,
+                            "Expected '[' at the start of the input")
+            raise oefmt(self.space.w_ValueError, "Unterminated array")
+        return None
+
+    def decode(self, text):
+        decoder = JSONDecoder(self.space, text, self.w_object_classes)
+        decoder.input_size = self.bytes_read
+        if self.prev_decoder is not None:
+            decoder.reuse_caches(self.prev_decoder)
+        try:
+            w_res = _decode_all(decoder)
+        finally:
+            decoder.close()
+        self.prev_decoder = decoder
+        return w_res
+
+    def descr_iter(self, space):
+        return self
+
+    def descr_next(self, space):
+        text = self.next_text()
+        if text is None:
+            raise OperationError(space.w_StopIteration, space.w_None)
+        return self.decode(text)
+
+W_StreamDecoder.typedef = TypeDef("_pypyjson.StreamDecoder",
+    __iter__ = interp2app(W_StreamDecoder.descr_iter),
+    next = interp2app(W_StreamDecoder.descr_next),
+)
+W_StreamDecoder.typedef.acceptable_as_base_class = False
+
+@unwrap_spec(array=bool, chunk_size=int)
+def iterload(space, w_source, array=False, chunk_size=65536,
+             w_object_classes=None):
+    """iterload(source, array=False, chunk_size=65536, object_classes=None)
+        -> iterator
+
+    Iterate over the JSON values read from source, which is a file or an
+    iterator of utf8-encoded str.  The values must follow each other,
+    separated by whitespace (e.g. one value per line); or, if array is true,
+    source must contain a single array, and its items are returned.
+    object_classes is as for loads()."""
+    if chunk_size <= 0:
+        raise oefmt(space.w_ValueError, "chunk_size must be positive")
+    return W_StreamDecoder(space, w_source, array, chunk_size,
+                           _object_classes(space, w_object_classes))
+
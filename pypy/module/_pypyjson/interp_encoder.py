@@ -1,6 +1,12 @@
+import math
+
+from rpython.rlib.listsort import make_timsort_class
 from rpython.rlib.rstring import StringBuilder
 from rpython.rlib import rutf8
 from pypy.interpreter import unicodehelper
+from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.gateway import unwrap_spec
+from pypy.objspace.std.floatobject import float_repr
 
 
 HEX = '0123456789abcdef'
@@ -16,17 +22,21 @@ ESCAPE_BEFORE_SPACE = [ESCAPE_DICT.get(chr(_i), '\\u%04x' % _i)
                        for _i in range(32)]
 
 
+def _first_special_char(s):
+    for i in range(len(s)):
+        c = s[i]
+        if c >= ' ' and c <= '~' and c != '"' and c != '\\':
+            pass
+        else:
+            return i
+    return len(s)
+
+
 def raw_encode_basestring_ascii(space, w_string):
     if space.isinstance_w(w_string, space.w_bytes):
         s = space.bytes_w(w_string)
-        for i in range(len(s)):
-            c = s[i]
-            if c >= ' ' and c <= '~' and c != '"' and c != '\\':
-                pass
-            else:
-                first = i
-                break
-        else:
+        first = _first_special_char(s)
+        if first == len(s):
             # the input is a string with only non-special ascii chars
             return w_string
 
@@ -44,7 +54,33 @@ def raw_encode_basestring_ascii(space, w_string):
         s = space.utf8_w(w_string)
         sb = StringBuilder(len(s))
         first = 0
+    _escape_utf8(sb, s, first)
+    res = sb.build()
+    return space.newtext(res)
+
+
+def encode_string_ascii(space, sb, w_string):
+    """Append the JSON representation of w_string to sb, without the
+    quotes: the same as raw_encode_basestring_ascii()."""
+    if space.isinstance_w(w_string, space.w_bytes):
+        encode_bytes_ascii(space, sb, space.bytes_w(w_string))
+    else:
+        _escape_utf8(sb, space.utf8_w(w_string), 0)
+
 
+def encode_bytes_ascii(space, sb, s):
+    first = _first_special_char(s)
+    if first == len(s):
+        sb.append(s)
+        return
+    unicodehelper.check_utf8_or_raise(space, s)
+    sb.append_slice(s, 0, first)
+    _escape_utf8(sb, s, first)
+
+
+def _escape_utf8(sb, s, first):
+    # escape the utf-8 string s, starting from the character 'first' (all
+    # the characters before it are plain ascii)
     it = rutf8.Utf8StringIterator(s)
     for i in range(first):
         it.next()
@@ -77,5 +113,308 @@ def raw_encode_basestring_ascii(space, w_string):
                 sb.append(HEX[(s2 >> 4) & 0x0f])
                 sb.append(HEX[s2 & 0x0f])
 
-    res = sb.build()
-    return space.newtext(res)
+
+# ____________________________________________________________
+# json.dumps()
+
+BytesSort = make_timsort_class()
+
+class Item(object):
+    def __init__(self, w_key, w_value):
+        self.w_key = w_key
+        self.w_value = w_value
+
+ItemBaseSort = make_timsort_class()
+
+class ItemSort(ItemBaseSort):
+    def lt(self, a, b):
+        space = self.space
+        return space.is_true(space.lt(a.w_key, b.w_key))
+
+
+class JSONEncoder(object):
+    """Does the same as JSONEncoder.encode() in lib-python/2.7/json/encoder.py
+    with ensure_ascii=True and encoding='utf-8', but walks the builtin types
+    directly, and the unwrapped items of lists and dicts that have a str, int
+    or float strategy."""
+
+    def __init__(self, space, w_default, sort_keys, indent, item_separator,
+                 key_separator, allow_nan, check_circular, skipkeys):
+        self.space = space
+        self.w_default = w_default
+        self.sort_keys = sort_keys
+        self.indent = indent        # -1 for None
+        self.item_separator = item_separator
+        self.key_separator = key_separator
+        self.allow_nan = allow_nan
+        self.skipkeys = skipkeys
+        # the containers that are being encoded, if check_circular
+        if check_circular:
+            self.markers = {}
+        else:
+            self.markers = None
+        self.sb = StringBuilder()
+
+    def mark(self, w_obj):
+        if self.markers is not None:
+            if w_obj in self.markers:
+                raise oefmt(self.space.w_ValueError,
+                            "Circular reference detected")
+            self.markers[w_obj] = None
+
+    def unmark(self, w_obj):
+        if self.markers is not None:
+            del self.markers[w_obj]
+
+    def emit_indent(self, level):
+        """Returns the item separator and the new indentation level."""
+        if self.indent < 0:
+            return self.item_separator, level
+        level += 1
+        newline_indent = '\n' + ' ' * (self.indent * level)
+        self.sb.append(newline_indent)
+        return self.item_separator + newline_indent, level
+
+    def emit_unindent(self, level):
+        if self.indent >= 0:
+            self.sb.append('\n')
+            self.sb.append(' ' * (self.indent * (level - 1)))
+
+    def floatstr(self, x):
+        if math.isnan(x):
+            text = 'NaN'
+        elif math.isinf(x):
+            if x > 0.0:
+                text = 'Infinity'
+            else:
+                text = '-Infinity'
+        else:
+            return float_repr(x)
+        if not self.allow_nan:
+            raise oefmt(self.space.w_ValueError,
+                        "Out of range float values are not JSON compliant: "
+                        "%s", float_repr(x))
+        return text
+
+    def intstr(self, w_obj):
+        space = self.space
+        if space.is_w(space.type(w_obj), space.w_int):
+            return str(space.int_w(w_obj))
+        return space.text_w(space.str(w_obj))
+
+    def encode(self, w_obj, level):
+        space = self.space
+        sb = self.sb
+        if (space.isinstance_w(w_obj, space.w_bytes) or
+                space.isinstance_w(w_obj, space.w_unicode)):
+            sb.append('"')
+            encode_string_ascii(space, sb, w_obj)
+            sb.append('"')
+        elif space.is_w(w_obj, space.w_None):
+            sb.append('null')
+        elif space.is_w(w_obj, space.w_True):
+            sb.append('true')
+        elif space.is_w(w_obj, space.w_False):
+            sb.append('false')
+        elif (space.isinstance_w(w_obj, space.w_int) or
+                space.isinstance_w(w_obj, space.w_long)):
+            sb.append(self.intstr(w_obj))
+        elif space.isinstance_w(w_obj, space.w_float):
+            sb.append(self.floatstr(space.float_w(w_obj)))
+        elif (space.isinstance_w(w_obj, space.w_list) or
+                space.isinstance_w(w_obj, space.w_tuple)):
+            if not space.is_true(w_obj):
+                sb.append('[]')
+                return
+            self.encode_list(w_obj, level)
+        elif space.isinstance_w(w_obj, space.w_dict):
+            if not space.is_true(w_obj):
+                sb.append('{}')
+                return
+            self.encode_dict(w_obj, level)
+        else:
+            self.mark(w_obj)
+            w_res = space.call_function(self.w_default, w_obj)
+            self.encode(w_res, level)
+            self.unmark(w_obj)
+
+    def encode_list(self, w_list, level):
+        space = self.space
+        sb = self.sb
+        self.mark(w_list)
+        sb.append('[')
+        separator, level = self.emit_indent(level)
+        # lists of str, int and float don't need to be wrapped
+        intlist = space.listview_int(w_list)
+        if intlist is not None:
+            for i in range(len(intlist)):
+                if i > 0:
+                    sb.append(separator)
+                sb.append(str(intlist[i]))
+        else:
+            byteslist = space.listview_bytes(w_list)
+            if byteslist is not None:
+                for i in range(len(byteslist)):
+                    if i > 0:
+                        sb.append(separator)
+                    sb.append('"')
+                    encode_bytes_ascii(space, sb, byteslist[i])
+                    sb.append('"')
+            else:
+                floatlist = space.listview_float(w_list)
+                if floatlist is not None:
+                    for i in range(len(floatlist)):
+                        if i > 0:
+                            sb.append(separator)
+                        sb.append(self.floatstr(floatlist[i]))
+                else:
+                    items_w = space.listview(w_list)
+                    for i in range(len(items_w)):
+                        if i > 0:
+                            sb.append(separator)
+                        self.encode(items_w[i], level)
+        self.emit_unindent(level)
+        sb.append(']')
+        self.unmark(w_list)
+
+    def encode_dict(self, w_dict, level):
+        space = self.space
+        self.mark(w_dict)
+        self.sb.append('{')
+        separator, level = self.emit_indent(level)
+        keys = space.listview_bytes(w_dict)
+        if keys is not None:
+            self.encode_bytes_dict_items(w_dict, keys, separator, level)
+        elif self.sort_keys:
+            items_w = space.listview(space.call_method(w_dict, "items"))
+            items = [None] * len(items_w)
+            for i in range(len(items_w)):
+                w_key, w_value = space.fixedview(items_w[i], 2)
+                items[i] = Item(w_key, w_value)
+            sorter = ItemSort(items)
+            sorter.space = space
+            sorter.sort()
+            first = True
+            for item in items:
+                if self.encode_item(item.w_key, item.w_value, first,
+                                    separator, level):
+                    first = False
+        elif space.is_w(space.type(w_dict), space.w_dict):
+            iteritems = w_dict.iteritems()
+            first = True
+            while True:
+                w_key, w_value = iteritems.next_item()
+                if w_key is None:
+                    break
+                if self.encode_item(w_key, w_value, first, separator, level):
+                    first = False
+        else:
+            w_iter = space.call_method(w_dict, "iteritems")
+            first = True
+            while True:
+                try:
+                    w_item = space.next(w_iter)
+                except OperationError as e:
+                    if not e.match(space, space.w_StopIteration):
+                        raise
+                    break
+                w_key, w_value = space.fixedview(w_item, 2)
+                if self.encode_item(w_key, w_value, first, separator, level):
+                    first = False
+        self.emit_unindent(level)
+        self.sb.append('}')
+        self.unmark(w_dict)
+
+    def encode_bytes_dict_items(self, w_dict, keys, separator, level):
+        # the dict has a str strategy: its keys don't need to be wrapped
+        space = self.space
+        sb = self.sb
+        if self.sort_keys:
+            # like sorted(d.items()), take the values before encoding any
+            BytesSort(keys).sort()
+            values_w = [w_dict.getitem_str(key) for key in keys]
+        else:
+            values_w = None
+        length = w_dict.length()
+        for i in range(len(keys)):
+            if values_w is not None:
+                w_value = values_w[i]
+            else:
+                # like d.iteritems()
+                if w_dict.length() != length:
+                    raise oefmt(space.w_RuntimeError,
+                                "dictionary changed size during iteration")
+                w_value = w_dict.getitem_str(keys[i])
+                if w_value is None:
+                    raise oefmt(space.w_RuntimeError,
+                                "dictionary changed during iteration")
+            if i > 0:
+                sb.append(separator)
+            sb.append('"')
+            encode_bytes_ascii(space, sb, keys[i])
+            sb.append('"')
+            sb.append(self.key_separator)
+            self.encode(w_value, level)
+
+    def encode_item(self, w_key, w_value, first, separator, level):
+        """Encode a key and a value of a dict.  Returns False if the key
+        was skipped."""
+        space = self.space
+        sb = self.sb
+        key = ''
+        if (space.isinstance_w(w_key, space.w_bytes) or
+                space.isinstance_w(w_key, space.w_unicode)):
+            is_string = True
+        # JavaScript is weakly typed for these, so it makes sense to
+        # also allow them.  Many encoders seem to do something like this.
+        elif space.isinstance_w(w_key, space.w_float):
+            key = self.floatstr(space.float_w(w_key))
+            is_string = False
+        elif space.is_w(w_key, space.w_True):
+            key = 'true'
+            is_string = False
+        elif space.is_w(w_key, space.w_False):
+            key = 'false'
+            is_string = False
+        elif space.is_w(w_key, space.w_None):
+            key = 'null'
+            is_string = False
+        elif (space.isinstance_w(w_key, space.w_int) or
+                space.isinstance_w(w_key, space.w_long)):
+            key = self.intstr(w_key)
+            is_string = False
+        elif self.skipkeys:
+            return False
+        else:
+            raise oefmt(space.w_TypeError, "key %s is not a string",
+                        space.text_w(space.repr(w_key)))
+        if not first:
+            sb.append(separator)
+        sb.append('"')
+        if is_string:
+            encode_string_ascii(space, sb, w_key)
+        else:
+            encode_bytes_ascii(space, sb, key)
+        sb.append('"')
+        sb.append(self.key_separator)
+        self.encode(w_value, level)
+        return True
+
+
+@unwrap_spec(sort_keys=bool, item_separator='text', key_separator='text',
+             allow_nan=bool, check_circular=bool, skipkeys=bool)
+def encode(space, w_obj, w_default, sort_keys, w_indent, item_separator,
+           key_separator, allow_nan, check_circular, skipkeys):
+    """encode(obj, default, sort_keys, indent, item_separator, key_separator,
+       allow_nan, check_circular, skipkeys) -> str
+
+    The JSON representation of obj, with only ascii characters."""
+    if space.is_none(w_indent):
+        indent = -1
+    else:
+        indent = max(space.int_w(w_indent), 0)
+    encoder = JSONEncoder(space, w_default, sort_keys, indent,
+                          item_separator, key_separator, allow_nan,
+                          check_circular, skipkeys)
+    encoder.encode(w_obj, 0)
+    return space.newbytes(encoder.sb.build())
@@ -273,6 +273,32 @@ class TestJson(object):
         dec.close()
 
 
+    def test_stream_decoder_shares_caches(self):
+        from pypy.module._pypyjson.interp_decoder import W_StreamDecoder
+        space = self.space
+        w_source = space.newlist([space.newbytes('{"abc": 1} {"abc": 2}')])
+        stream = W_StreamDecoder(space, w_source, False, 100)
+        stream.descr_next(space)
+        cache_keys = stream.prev_decoder.cache_keys
+        assert len(cache_keys) == 1
+        stream.descr_next(space)
+        assert stream.prev_decoder.cache_keys is cache_keys
+        assert len(cache_keys) == 1
+
+    def test_stream_decoder_cache_limit(self, monkeypatch):
+        from pypy.module._pypyjson.interp_decoder import W_StreamDecoder
+        monkeypatch.setattr(JSONDecoder, 'MAX_REUSED_CACHE_SIZE', 2)
+        space = self.space
+        w_source = space.newlist([space.newbytes(
+            '{"a": 1} {"b": 2} {"c": 3} {"d": 4}')])
+        stream = W_StreamDecoder(space, w_source, False, 100)
+        sizes = []
+        for i in range(4):
+            stream.descr_next(space)
+            sizes.append(len(stream.prev_decoder.cache_keys))
+        assert sizes == [1, 2, 3, 1]
+
+
 class AppTest(object):
     spaceconfig = {"objspace.usemodules._pypyjson": True}
 
@@ -541,3 +567,222 @@ class AppTest(object):
         a = '{"abc": "4", "k": 1, "k": 1.5, "c": null, "k": 2}'
         d = _pypyjson.loads(a)
         assert d == {u"abc": u"4", u"c": None, u"k": 2}
+
+    def test_encode(self):
+        import _pypyjson
+        def default(o):
+            if isinstance(o, set):
+                return sorted(o)
+            raise TypeError(repr(o) + " is not JSON serializable")
+        def encode(o, sort_keys=False, indent=None, separators=(', ', ': '),
+                   allow_nan=True, check_circular=True, skipkeys=False):
+            return _pypyjson.encode(o, default, sort_keys, indent,
+                                    separators[0], separators[1], allow_nan,
+                                    check_circular, skipkeys)
+        assert encode(None) == 'null'
+        assert encode([True, False, 1, 2L, 1.5, "a", u"\xe9"]) == (
+            '[true, false, 1, 2, 1.5, "a", "\\u00e9"]')
+        assert encode([1, 2, 3]) == '[1, 2, 3]'
+        assert encode([1.0, 1e100]) == '[1.0, 1e+100]'
+        assert encode(["a\n", "b"]) == '["a\\n", "b"]'
+        assert encode((1, [], {}, ())) == '[1, [], {}, []]'
+        assert encode({"a": [1]}) == '{"a": [1]}'
+        assert encode({2: 2, 1.5: None, True: 0, None: 0},
+                      sort_keys=True) == (
+            '{"null": 0, "true": 0, "1.5": null, "2": 2}')
+        assert encode({"b": 1, "a": {"d": 2, "c": 3}}, sort_keys=True,
+                      separators=(',', ':')) == (
+            '{"a":{"c":3,"d":2},"b":1}')
+        assert encode({"a": [1, 2], "b": {}}, sort_keys=True, indent=2) == (
+            '{\n  "a": [\n    1, \n    2\n  ], \n  "b": {}\n}')
+        assert encode(set([2, 1])) == '[1, 2]'
+        raises(TypeError, encode, object())
+        raises(TypeError, encode, {(1,): 2})
+        assert encode({(1,): 2, "a": 1}, skipkeys=True) == '{"a": 1}'
+        assert encode(float("nan")) == 'NaN'
+        assert encode([float("-inf")]) == '[-Infinity]'
+        raises(ValueError, encode, [float("inf")], allow_nan=False)
+        raises(UnicodeDecodeError, encode, ["\xff"])
+        l = [1]
+        l.append(l)
+        exc = raises(ValueError, encode, l)
+        assert str(exc.value) == "Circular reference detected"
+        d = {}
+        d["d"] = d
+        raises(ValueError, encode, d)
+        raises(RuntimeError, encode, d, check_circular=False)
+
+    def test_encode_subclasses(self):
+        import _pypyjson
+        class MyInt(int):
+            def __str__(self):
+                return "42"
+        class MyList(list):
+            def __iter__(self):
+                yield 5
+        class MyDict(dict):
+            def iteritems(self):
+                yield "x", 1
+        def encode(o):
+            return _pypyjson.encode(o, None, False, None, ', ', ': ', True,
+                                    True, False)
+        assert encode([MyInt(1)]) == '[42]'
+        assert encode(MyList([1, 2])) == '[5]'
+        assert encode(MyDict(a=2)) == '{"x": 1}'
+
+    def test_iterload(self):
+        import _pypyjson
+        text = ('{"a": [1, "x]}\\"", {"b": null}]}\n'
+                '42\n"s t"\r\n[]  3.5\ntrue {"a": -1}')
+        expected = [{u"a": [1, u'x]}"', {u"b": None}]}, 42, u"s t", [],
+                    3.5, True, {u"a": -1}]
+        # split the input at every position
+        for i in range(len(text) + 1):
+            chunks = iter([text[:i], "", text[i:]])
+            assert list(_pypyjson.iterload(chunks)) == expected
+        # one character at a time
+        assert list(_pypyjson.iterload(iter(text))) == expected
+        assert list(_pypyjson.iterload([])) == []
+        assert list(_pypyjson.iterload(["  \n"])) == []
+
+    def test_iterload_file(self):
+        import _pypyjson
+        class File(object):
+            def __init__(self, data):
+                self.data = data
+                self.sizes = []
+            def read(self, size):
+                self.sizes.append(size)
+                result = self.data[:size]
+                self.data = self.data[size:]
+                return result
+        f = File('{"a": 1}\n' * 10)
+        it = _pypyjson.iterload(f, chunk_size=3)
+        assert iter(it) is it
+        assert it.next() == {u"a": 1}
+        assert f.sizes == [3, 3, 3]
+        assert len(list(it)) == 9
+        raises(StopIteration, it.next)
+        raises(ValueError, _pypyjson.iterload, f, chunk_size=0)
+
+    def test_iterload_array(self):
+        import _pypyjson
+        text = ' [1, "a,]", {"b": [2, 3]}, [], null , -1.5e3 ] \n'
+        expected = [1, u"a,]", {u"b": [2, 3]}, [], None, -1.5e3]
+        for i in range(len(text) + 1):
+            chunks = [text[:i], text[i:]]
+            assert list(_pypyjson.iterload(chunks, array=True)) == expected
+        assert list(_pypyjson.iterload(["[ ]"], array=True)) == []
+
+    def test_iterload_errors(self):
+        import _pypyjson
+        def load(text, array=False):
+            return list(_pypyjson.iterload([text], array=array))
+        exc = raises(ValueError, load, '{"a": 1}\n[1, 2')
+        assert str(exc.value) == "Unterminated array starting at char 1"
+        raises(ValueError, load, '1\n{"a" 1}')
+        raises(ValueError, load, 'nul')
+        raises(TypeError, load, u'1')
+        raises(ValueError, load, '', array=True)
+        raises(ValueError, load, '{}', array=True)
+        raises(ValueError, load, '[1, 2', array=True)
+        raises(ValueError, load, '[1 2]', array=True)
+        raises(ValueError, load, '[1, ]', array=True)
+        raises(ValueError, load, '[1] 2', array=True)
+        it = _pypyjson.iterload(['[1, 2', ' 3]'], array=True)
+        assert it.next() == 1
+        assert it.next() == 2
+        raises(ValueError, it.next)
+
+    def test_object_classes(self):
+        import _pypyjson
+        from collections import namedtuple
+        class Point(object):
+            def __init__(self):
+                raise AssertionError("should not be called")
+        class Slotted(object):
+            __slots__ = ['a']
+        Pair = namedtuple('Pair', ['b', 'a'])
+        classes = {('x', 'y'): Point, ('a', 'b'): Pair, ('a',): Slotted,
+                   (): Point}
+        res = _pypyjson.loads(
+            '[{"x": 1, "y": [{"a": 2, "b": 3}]}, {"y": 1, "x": 2}, '
+            '{"x": 3, "y": 4}, {"a": 5}, {}, {"x": 1, "y": 2, "z": 3}]',
+            classes)
+        p = res[0]
+        assert type(p) is Point
+        assert p.x == 1
+        assert p.y == [Pair(3, 2)]
+        assert type(p.y[0]) is Pair
+        assert res[1] == {"y": 1, "x": 2}      # different key order
+        assert (res[2].x, res[2].y) == (3, 4)
+        assert type(res[3]) is Slotted
+        assert res[3].a == 5
+        assert type(res[4]) is Point
+        assert res[5] == {"x": 1, "y": 2, "z": 3}
+        assert _pypyjson.loads('{"x": 1}', None) == {"x": 1}
+        # non-ASCII keys are fine unless they must become attribute names
+        class T(tuple):
+            pass
+        res = _pypyjson.loads('[{"\xc3\xa9": 1}, {"\xc3\xa9": 2, "a": 3}]',
+                              {(u'\xe9', u'a'): T, ('a',): Point})
+        assert res[0] == {u"\xe9": 1}
+        assert type(res[1]) is T and res[1] == (2, 3)
+        it = _pypyjson.iterload(['{"x": 1, "y": 2} {"x"', ': 3, "y": 4}'],
+                                object_classes=classes)
+        assert [(p.x, p.y) for p in it] == [(1, 2), (3, 4)]
+
+    def test_object_classes_dict_fallback(self):
+        import _pypyjson
+        class C(object):
+            pass
+        classes = {(u'blk_a', u'blk_b'): C}
+        # more than MAX_FRINGE distinct shapes in one document block the
+        # least used map, the one of {"blk_a": .., "blk_b": ..}, and then
+        # such objects are decoded as dicts
+        s = '[{"blk_a": 1, "blk_b": 2}, %s]' % ', '.join(
+            ['{"blk_k%d": %d}' % (i // 2, i) for i in range(200)])
+        res = _pypyjson.loads(s)
+        assert res[0] == {"blk_a": 1, "blk_b": 2}
+        res = _pypyjson.loads('[%s]' % ', '.join(
+            ['{"blk_a": 1, "blk_b": 2}'] * 3), classes)
+        assert [type(x) for x in res] == [C, C, C]
+        assert (res[0].blk_a, res[0].blk_b) == (1, 2)
+        # a repeated key also switches to a dict
+        res = _pypyjson.loads('{"blk_a": 1, "blk_a": 2, "blk_b": 3}', classes)
+        assert type(res) is C
+        assert (res.blk_a, res.blk_b) == (2, 3)
+
+    def test_object_classes_errors(self):
+        import _pypyjson
+        from collections import namedtuple
+        Pair = namedtuple('Pair', ['a', 'c'])
+        raises(TypeError, _pypyjson.loads, '{"a": 1}', [])
+        raises(TypeError, _pypyjson.loads, '{"a": 1}', {('a',): 5})
+        raises(TypeError, _pypyjson.loads, '{"a": 1, "b": 2}',
+               {('a', 'b'): Pair})
+        raises(TypeError, _pypyjson.loads, '{"a": 1}', {('a',): Pair})
+
+
+class AppTestDumps(object):
+    spaceconfig = {"usemodules": ["_pypyjson", "struct"]}
+
+    def test_json_dumps(self):
+        import json
+        from json import encoder
+        data = [{"id": i, "name": "user%d" % i, u"score": i * 0.5,
+                 "tags": ["a", "b\xc3\xa9"], "ok": i % 2 == 0, "x": None}
+                for i in range(20)]
+        options = [{}, {"sort_keys": True}, {"indent": 4},
+                   {"separators": (",", ":")},
+                   {"sort_keys": True, "indent": 0}]
+        for kwds in options:
+            s = json.dumps(data, **kwds)
+            c_encode = encoder.c_encode
+            encoder.c_encode = None
+            try:
+                expected = json.dumps(data, **kwds)
+            finally:
+                encoder.c_encode = c_encode
+            assert s == expected
+        assert json.loads(json.dumps(data)) == json.loads(expected)
@@ -486,10 +486,11 @@ def SRE_Pattern__new__(space, w_subtype, w_pattern, flags, w_code,
     srepat.space = space
     srepat.w_pattern = w_pattern      # the original uncompiled pattern
     srepat.flags = flags
-    # note: we assume that the app-level is caching SRE_Pattern objects,
-    # so that we don't need to do it here.  Creating new SRE_Pattern
-    # objects all the time would be bad for the JIT, which relies on the
-    # identity of the CompiledPattern() object.
+    # note: we assume that the app-level is caching SRE_Pattern objects
+    # (re._compile() uses the PatternCache below), so that we don't need
+    # to do it here.  Creating new SRE_Pattern objects all the time would
+    # be bad for the JIT, which relies on the identity of the
+    # CompiledPattern() object.
     srepat.code = rsre_core.CompiledPattern(code, flags)
     srepat.num_groups = groups
     srepat.w_groupindex = w_groupindex
@@ -520,6 +521,55 @@ W_SRE_Pattern.typedef = TypeDef(
 )
 W_SRE_Pattern.typedef.acceptable_as_base_class = False
 
+# ____________________________________________________________
+#
+# Cache of the compiled patterns, used by re._compile()
+
+class PatternCache(object):
+    """The SRE_Pattern objects for the str and unicode patterns that do not
+    depend on the locale, keyed by (kind, pattern, flags), where kind is
+    'b' for a str pattern and 'u' for a unicode pattern (in utf8)."""
+    MAXCACHE = 1000     # like re._MAXCACHE
+
+    def __init__(self, space):
+        self.patterns_w = {}
+
+def _cache_key(space, w_pattern, w_flags):
+    # returns a key whose kind is '' if the pattern cannot be cached
+    if space.is_w(space.type(w_flags), space.w_int):
+        flags = space.int_w(w_flags)
+        w_type = space.type(w_pattern)
+        if space.is_w(w_type, space.w_bytes):
+            return ('b', space.bytes_w(w_pattern), flags)
+        if space.is_w(w_type, space.w_unicode):
+            return ('u', space.utf8_w(w_pattern), flags)
+    return ('', '', 0)
+
+def w_cache_lookup(space, w_pattern, w_flags):
+    """Return the pattern object that cache_store() recorded for exactly
+    this str or unicode pattern and these flags, or None."""
+    key = _cache_key(space, w_pattern, w_flags)
+    if key[0]:
+        w_srepat = space.fromcache(PatternCache).patterns_w.get(key, None)
+        if w_srepat is not None:
+            return w_srepat
+    return space.w_None
+
+def w_cache_store(space, w_pattern, w_flags, w_srepat):
+    """Record the pattern object for this str or unicode pattern and these
+    flags.  Returns False if they cannot be cached here."""
+    key = _cache_key(space, w_pattern, w_flags)
+    if not key[0]:
+        return space.w_False
+    patterns_w = space.fromcache(PatternCache).patterns_w
+    if len(patterns_w) >= PatternCache.MAXCACHE:
+        patterns_w.clear()
+    patterns_w[key] = w_srepat
+    return space.w_True
+
+def w_cache_clear(space):
+    space.fromcache(PatternCache).patterns_w.clear()
+
 # ____________________________________________________________
 #
 # SRE_Match class
@@ -12,4 +12,7 @@ class Module(MixedModule):
         'compile':        'interp_sre.W_SRE_Pattern',
         'getlower':       'interp_sre.w_getlower',
         'getcodesize':    'interp_sre.w_getcodesize',
+        'cache_lookup':   'interp_sre.w_cache_lookup',
+        'cache_store':    'interp_sre.w_cache_store',
+        'cache_clear':    'interp_sre.w_cache_clear',
     }
@@ -63,6 +63,34 @@ class AppTestSrePy:
         import _sre
         assert _sre.getcodesize() == _sre.CODESIZE
 
+    def test_pattern_cache(self):
+        import re, _sre
+        re.purge()
+        p = re.compile("a+b", re.I)
+        assert _sre.cache_lookup("a+b", re.I) is p
+        assert _sre.cache_lookup("a+b", 0) is None
+        assert _sre.cache_lookup(u"a+b", re.I) is None
+        assert re.compile("a+b", re.I) is p
+        assert re.match("a+b", "aab") is not None
+        assert re.compile("a+b") is _sre.cache_lookup("a+b", 0)
+        u = re.compile(u"\xe9+", re.U)
+        assert u is not re.compile("\xe9+", re.U)
+        assert _sre.cache_lookup(u"\xe9+", re.U) is u
+        assert re.compile(u"\xe9+", re.U) is u
+        class S(str):
+            pass
+        assert _sre.cache_lookup(S("a+b"), re.I) is None
+        assert _sre.cache_lookup(p, 0) is None
+        assert not _sre.cache_store(S("a+b"), re.I, p)
+        # the keys that cannot be cached at interp-level go to re._cache
+        q = re.compile(S("a+b"), re.I)
+        assert q is not p and re.compile(S("a+b"), re.I) is q
+        q = re.compile("a+b", long(re.I))
+        assert re.compile("a+b", long(re.I)) is q
+        re.purge()
+        assert _sre.cache_lookup("a+b", re.I) is None
+        assert re.compile("a+b", re.I) is not p
+
 
 class AppTestSrePattern:
     def setup_class(cls):
@@ -1088,6 +1116,17 @@ class AppTestOptimizations:
         assert re.search(".+ab", "wowowowawoabwowo")
         assert None == re.search(".+ab", "wowowaowowo")
 
+    def test_required_literal(self):
+        import re
+        assert re.search(r"\w+@example\.com", "mail joe@example.com").span() \
+            == (5, 20)
+        assert None == re.search(r"\w+@example\.com", "joe@example.org")
+        assert re.search(r"\d\d-x", "1-x 12-y 34-x").span() == (9, 13)
+        assert re.findall(r"\d\d-x", "1-x 12-x 34-x") == ["12-x", "34-x"]
+        assert re.search(u"..\xe9", u"\u1234\xe9 ab\xe9").span() == (3, 6)
+        assert re.search(u"..\u1234", "ab\xe9") is None
+        assert re.search(u".\u1234", u"a\u1234").span() == (0, 2)
+
 
 class AppTestUnicodeExtra:
     def test_string_attribute(self):
@@ -12,9 +12,11 @@ class AppTestGcHooks(object):
         space = cls.space
         gchooks = space.fromcache(LowLevelGcHooks)
 
-        @unwrap_spec(ObjSpace, int, r_uint, int)
-        def fire_gc_minor(space, duration, total_memory_used, pinned_objects):
-            gchooks.fire_gc_minor(duration, total_memory_used, pinned_objects)
+        @unwrap_spec(ObjSpace, int, r_uint, int, int)
+        def fire_gc_minor(space, duration, total_memory_used, pinned_objects,
+                          nursery_size=0):
+            gchooks.fire_gc_minor(duration, total_memory_used, pinned_objects,
+                                  nursery_size)
 
         @unwrap_spec(ObjSpace, int, int, int)
         def fire_gc_collect_step(space, duration, oldstate, newstate):
@@ -26,8 +28,8 @@ class AppTestGcHooks(object):
 
         @unwrap_spec(ObjSpace)
         def fire_many(space):
-            gchooks.fire_gc_minor(5.0, 0, 0)
-            gchooks.fire_gc_minor(7.0, 0, 0)
+            gchooks.fire_gc_minor(5.0, 0, 0, 0)
+            gchooks.fire_gc_minor(7.0, 0, 0, 0)
             gchooks.fire_gc_collect_step(5.0, 0, 0)
             gchooks.fire_gc_collect_step(15.0, 0, 0)
             gchooks.fire_gc_collect_step(22.0, 0, 0)
@@ -51,20 +53,21 @@ class AppTestGcHooks(object):
             lst.append((stats.count,
                         stats.duration,
                         stats.total_memory_used,
-                        stats.pinned_objects))
+                        stats.pinned_objects,
+                        stats.nursery_size))
         gc.hooks.on_gc_minor = on_gc_minor
-        self.fire_gc_minor(10, 20, 30)
-        self.fire_gc_minor(40, 50, 60)
+        self.fire_gc_minor(10, 20, 30, 4096)
+        self.fire_gc_minor(40, 50, 60, 8192)
         assert lst == [
-            (1, 10, 20, 30),
-            (1, 40, 50, 60),
+            (1, 10, 20, 30, 4096),
+            (1, 40, 50, 60, 8192),
             ]
         #
         gc.hooks.on_gc_minor = None
         self.fire_gc_minor(70, 80, 90)  # won't fire because the hooks is disabled
         assert lst == [
-            (1, 10, 20, 30),
-            (1, 40, 50, 60),
+            (1, 10, 20, 30, 4096),
+            (1, 40, 50, 60, 8192),
             ]
 
     def test_on_gc_collect_step(self):
@@ -2,9 +2,15 @@
 from rpython.rlib import jit_hooks
 from rpython.rlib.jit import JitHookInterface, Counters
 
+from rpython.rtyper.annlowlevel import cast_base_ptr_to_instance
+from rpython.rtyper.lltypesystem import lltype
+from rpython.rtyper.rclass import OBJECT
+
 from pypy.interpreter.error import OperationError
+from pypy.interpreter.pycode import PyCode
 from pypy.module.pypyjit.interp_resop import (Cache, wrap_greenkey,
     WrappedOp, W_JitLoopInfo, wrap_oplist)
+from pypy.module.pypyjit.interp_warmup import WarmupCache
 
 class PyPyJitIface(JitHookInterface):
     def are_hooks_enabled(self):
@@ -12,7 +18,8 @@ class PyPyJitIface(JitHookInterface):
         cache = space.fromcache(Cache)
         return (cache.w_compile_hook is not None or
                 cache.w_abort_hook is not None or
-                cache.w_trace_too_long_hook is not None)
+                cache.w_trace_too_long_hook is not None or
+                space.fromcache(WarmupCache).filename is not None)
 
 
     def on_abort(self, reason, jitdriver, greenkey, greenkey_repr, logops, operations):
@@ -54,6 +61,7 @@ class PyPyJitIface(JitHookInterface):
                 cache.in_recursion = False
 
     def after_compile(self, debug_info):
+        self._record_warmup(debug_info)
         self._compile_hook(debug_info, is_bridge=False)
 
     def after_compile_bridge(self, debug_info):
@@ -65,6 +73,22 @@ class PyPyJitIface(JitHookInterface):
     def before_compile_bridge(self, debug_info):
         pass
 
+    def _record_warmup(self, debug_info):
+        warmup = self.space.fromcache(WarmupCache)
+        if warmup.filename is None:
+            return
+        greenkey = debug_info.greenkey
+        if greenkey is None or debug_info.get_jitdriver().name != 'pypyjit':
+            return
+        next_instr = greenkey[0].getint()
+        is_being_profiled = greenkey[1].getint()
+        if is_being_profiled:
+            return
+        ll_code = lltype.cast_opaque_ptr(lltype.Ptr(OBJECT),
+                                         greenkey[2].getref_base())
+        pycode = cast_base_ptr_to_instance(PyCode, ll_code)
+        warmup.record_loop(pycode, next_instr)
+
     def _compile_hook(self, debug_info, is_bridge):
         space = self.space
         cache = space.fromcache(Cache)
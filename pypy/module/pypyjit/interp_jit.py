@@ -265,6 +265,17 @@ def releaseall(space):
     """
     jit_hooks.stats_memmgr_release_all(None)
 
+@dont_look_inside
+def freeze_compiled_loops(space):
+    """ Keep all current machine code objects alive forever, instead of
+    releasing them when they have not been used for a while.  Meant for
+    pre-fork servers: call it in the master process after warming up, and
+    the forked workers will keep using the inherited machine code without
+    recompiling it and without writing to the memory it uses, which stays
+    shared copy-on-write with the master.
+    """
+    jit_hooks.stats_memmgr_freeze_all(None)
+
 # class Cache(object):
 #     in_recursion = False
 
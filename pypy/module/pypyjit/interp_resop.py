@@ -383,6 +383,8 @@ def get_stats_snapshot(space):
     for i, counter_name in enumerate(Counters.counter_names):
         v = jit_hooks.stats_get_counter_value(None, i)
         space.setitem_str(w_counters, counter_name, space.newint(v))
+    v = jit_hooks.stats_jitcounter_collisions(None)
+    space.setitem_str(w_counters, 'JITCOUNTER_COLLISIONS', space.newint(v))
     w_counter_times = space.newdict()
     tr_time = jit_hooks.stats_get_times_value(None, Counters.TRACING)
     space.setitem_str(w_counter_times, 'TRACING', space.newfloat(tr_time))
@@ -0,0 +1,172 @@
+"""
+Persistent JIT warm-up hints.
+
+When enabled with pypyjit.enable_warmup_cache(filename) (or with the
+PYPY_JIT_WARMUP_CACHE environment variable), we record the greenkey of
+every loop compiled by the JIT, and write the list to 'filename' when
+the process exits.  A later process that enables the same file gets a
+head start: as soon as a code object matching a recorded entry is
+created, the JIT counters of its recorded loop headers are bumped close
+to the threshold, so that these loops are traced after a few iterations
+instead of 'threshold' ones.
+
+Code objects are identified by their filename, name, first line number
+and an md5 of their bytecode, so entries for code that changed in the
+meantime are ignored.  The file contains one line per loop:
+
+    <md5 of co_code> <next_instr> <co_firstlineno> <co_name> <co_filename>
+
+The md5 can also be '-', which matches any bytecode.  This is what
+pypy/tool/jitlog2warmup.py writes, as it builds the file from a PYPYLOG
+of a previous run, which does not contain the bytecode.
+"""
+
+import errno
+import os
+
+from rpython.rlib import jit, jit_hooks, rmd5
+from rpython.rlib.objectmodel import we_are_translated
+from rpython.rlib.rarithmetic import r_uint
+from rpython.rlib.rstring import split
+from rpython.rtyper.annlowlevel import cast_instance_to_gcref
+from pypy.interpreter.error import wrap_oserror
+from pypy.interpreter.gateway import unwrap_spec
+from pypy.interpreter.pycode import CodeHookCache
+
+
+HEADER = "# pypyjit warm-up cache v1\n"
+ANY_DIGEST = "-"
+
+
+def code_location(pycode):
+    return '%d %s %s' % (pycode.co_firstlineno, pycode.co_name,
+                         pycode.co_filename)
+
+def code_digest(pycode):
+    return rmd5.RMD5(pycode.co_code).hexdigest()
+
+
+class WarmupCache(object):
+    def __init__(self, space):
+        self.space = space
+        self.filename = None
+        # code_location() -> list of (code_digest(), next_instr)
+        self.hints = {}
+        # lines to write in the file, in the format given above
+        self.lines = {}
+        self.num_seeded = 0
+
+    def enable(self, filename):
+        self.filename = filename
+        self.hints = {}
+        self.lines = {}
+        try:
+            data = _read_file(filename)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+            data = ''
+        if data.startswith(HEADER):
+            for line in split(data, '\n')[1:]:
+                self._parse_line(line)
+        self.space.fromcache(CodeHookCache)._jit_warmup = self
+
+    def disable(self):
+        self.filename = None
+        self.space.fromcache(CodeHookCache)._jit_warmup = None
+
+    def _parse_line(self, line):
+        parts = split(line, ' ', 2)
+        if len(parts) != 3:
+            return
+        digest, pos, location = parts
+        try:
+            next_instr = int(pos)
+        except ValueError:
+            return
+        if next_instr < 0 or not location:
+            return
+        if len(digest) != 32 and digest != ANY_DIGEST:
+            return
+        self.lines[line] = None
+        if location not in self.hints:
+            self.hints[location] = []
+        self.hints[location].append((digest, next_instr))
+
+    def record_loop(self, pycode, next_instr):
+        line = '%s %d %s' % (code_digest(pycode), next_instr,
+                             code_location(pycode))
+        if '\n' not in line:
+            self.lines[line] = None
+
+    @jit.dont_look_inside
+    def new_code(self, pycode):
+        """Called for every new code object."""
+        hints = self.hints.get(code_location(pycode), None)
+        if hints is None:
+            return
+        digest = code_digest(pycode)
+        for expected, next_instr in hints:
+            if ((expected == digest or expected == ANY_DIGEST) and
+                    next_instr < len(pycode.co_code)):
+                self.num_seeded += 1
+                if we_are_translated():
+                    ll_pycode = cast_instance_to_gcref(pycode)
+                    jit_hooks.trace_next_iteration(
+                        'pypyjit', r_uint(next_instr), 0, ll_pycode)
+
+    def save(self):
+        if self.filename is None:
+            return
+        data = HEADER + ''.join([line + '\n' for line in self.lines])
+        tmpname = '%s.%d.tmp' % (self.filename, os.getpid())
+        fd = os.open(tmpname, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0666)
+        try:
+            while data:
+                count = os.write(fd, data)
+                data = data[count:]
+        finally:
+            os.close(fd)
+        os.rename(tmpname, self.filename)
+
+
+def _read_file(filename):
+    fd = os.open(filename, os.O_RDONLY, 0)
+    try:
+        chunks = []
+        while True:
+            data = os.read(fd, 65536)
+            if not data:
+                break
+            chunks.append(data)
+    finally:
+        os.close(fd)
+    return ''.join(chunks)
+
+
+@unwrap_spec(filename='fsencode_or_none')
+def enable_warmup_cache(space, filename):
+    """enable_warmup_cache(filename)
+
+    Record the loops compiled by the JIT into 'filename' when the process
+    exits, and use the loops recorded there by previous runs to start
+    tracing early in code objects created from now on.  Pass None to
+    disable.
+    """
+    cache = space.fromcache(WarmupCache)
+    if filename is None:
+        cache.disable()
+        return
+    try:
+        cache.enable(filename)
+    except OSError as e:
+        raise wrap_oserror(space, e, filename)
+
+def save_warmup_cache(space):
+    """Write the warm-up cache file now, instead of waiting for the
+    process to exit.  Useful for processes that end with os._exit()."""
+    cache = space.fromcache(WarmupCache)
+    try:
+        cache.save()
+    except OSError as e:
+        raise wrap_oserror(space, e, cache.filename)
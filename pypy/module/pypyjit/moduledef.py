@@ -14,6 +14,9 @@ class Module(MixedModule):
         'trace_next_iteration': 'interp_jit.trace_next_iteration',
         'trace_next_iteration_hash': 'interp_jit.trace_next_iteration_hash',
         'releaseall': 'interp_jit.releaseall',
+        'freeze_compiled_loops': 'interp_jit.freeze_compiled_loops',
+        'enable_warmup_cache': 'interp_warmup.enable_warmup_cache',
+        'save_warmup_cache': 'interp_warmup.save_warmup_cache',
         'set_compile_hook': 'interp_resop.set_compile_hook',
         'set_abort_hook': 'interp_resop.set_abort_hook',
         'set_trace_too_long_hook': 'interp_resop.set_trace_too_long_hook',
@@ -43,3 +46,11 @@ class Module(MixedModule):
         w_obj = space.wrap(PARAMETERS)
         space.setattr(self, space.newtext('defaults'), w_obj)
         pypy_hooks.space = space
+
+    def shutdown(self, space):
+        from pypy.module.pypyjit.interp_warmup import WarmupCache
+        try:
+            space.fromcache(WarmupCache).save()
+        except OSError:
+            pass    # too late to report anything
+        MixedModule.shutdown(self, space)
@@ -123,7 +123,8 @@ class AppTestJitHook(object):
         cls.w_on_optimize = space.wrap(interp2app(interp_on_optimize))
         cls.orig_oplist = oplist
         cls.orig_oplist_no_descrs = oplist_no_descrs
-        cls.w_sorted_keys = space.wrap(sorted(Counters.counter_names))
+        cls.w_sorted_keys = space.wrap(sorted(Counters.counter_names +
+                                              ['JITCOUNTER_COLLISIONS']))
 
     def setup_method(self, meth):
         self.__class__.oplist = self.orig_oplist[:]
@@ -0,0 +1,117 @@
+from rpython.jit.metainterp.history import ConstInt, ConstPtr, JitCellToken
+from rpython.rlib.jit import JitDebugInfo
+from rpython.rtyper.annlowlevel import cast_instance_to_base_ptr
+from rpython.rtyper.lltypesystem import lltype, llmemory
+from rpython.tool.udir import udir
+from pypy.module.pypyjit.hooks import pypy_hooks
+from pypy.module.pypyjit.interp_warmup import (WarmupCache, HEADER,
+    code_digest)
+from pypy.module.pypyjit.test.test_jit_hook import MockJitDriverSD
+
+
+class TestWarmupCache(object):
+    spaceconfig = dict(usemodules=('pypyjit',))
+
+    def make_code(self, space, name):
+        w_f = space.appexec([space.newtext(name)], """(name):
+            d = {}
+            exec '''def %s(n):
+                while n > 0:
+                    n -= 1
+            ''' % (name,) in d
+            return d[name]
+        """)
+        return w_f.code
+
+    def compile_loop(self, space, pycode, next_instr):
+        pypy_hooks.space = space
+        ll_code = cast_instance_to_base_ptr(pycode)
+        code_gcref = lltype.cast_opaque_ptr(llmemory.GCREF, ll_code)
+        greenkey = [ConstInt(next_instr), ConstInt(0), ConstPtr(code_gcref)]
+        debug_info = JitDebugInfo(MockJitDriverSD, None, JitCellToken(), [],
+                                  'loop', greenkey)
+        assert pypy_hooks.are_hooks_enabled()
+        pypy_hooks._record_warmup(debug_info)
+
+    def test_record_and_seed(self, space):
+        filename = str(udir.join('test_warmup_record_and_seed'))
+        cache = space.fromcache(WarmupCache)
+        cache.enable(filename)
+        try:
+            pycode = self.make_code(space, 'f')
+            assert cache.num_seeded == 0
+            self.compile_loop(space, pycode, 3)
+            cache.save()
+            with open(filename) as f:
+                content = f.read()
+            assert content.startswith(HEADER)
+            assert content.splitlines()[1] == '%s 3 %s' % (
+                code_digest(pycode), '1 f <string>')
+            #
+            cache.enable(filename)
+            self.make_code(space, 'f')
+            assert cache.num_seeded == 1
+            self.make_code(space, 'g')
+            assert cache.num_seeded == 1
+        finally:
+            cache.disable()
+        assert cache.filename is None
+
+    def test_changed_code_is_ignored(self, space):
+        filename = str(udir.join('test_warmup_changed_code'))
+        pycode = self.make_code(space, 'f')
+        with open(filename, 'w') as f:
+            f.write(HEADER)
+            f.write('%s 3 1 f <string>\n' % ('0' * 32,))
+            f.write('garbage\n')
+        cache = space.fromcache(WarmupCache)
+        cache.enable(filename)
+        try:
+            seeded = cache.num_seeded
+            self.make_code(space, 'f')
+            assert cache.num_seeded == seeded
+            cache.save()
+            with open(filename) as f:
+                lines = f.read().splitlines()
+            assert lines == [HEADER.strip(), '%s 3 1 f <string>' % ('0' * 32,)]
+        finally:
+            cache.disable()
+
+    def test_any_digest(self, space):
+        filename = str(udir.join('test_warmup_any_digest'))
+        with open(filename, 'w') as f:
+            f.write(HEADER)
+            f.write('- 3 1 f <string>\n')
+        cache = space.fromcache(WarmupCache)
+        cache.enable(filename)
+        try:
+            seeded = cache.num_seeded
+            self.make_code(space, 'f')
+            assert cache.num_seeded == seeded + 1
+            self.make_code(space, 'g')
+            assert cache.num_seeded == seeded + 1
+        finally:
+            cache.disable()
+
+
+class AppTestWarmupCache(object):
+    spaceconfig = dict(usemodules=('pypyjit',))
+
+    def setup_class(cls):
+        cls.w_filename = cls.space.newtext(
+            str(udir.join('test_warmup_app')))
+
+    def test_enable_disable(self):
+        import pypyjit, os
+        pypyjit.enable_warmup_cache(self.filename)
+        try:
+            pypyjit.save_warmup_cache()
+            assert os.path.exists(self.filename)
+        finally:
+            pypyjit.enable_warmup_cache(None)
+
+    def test_enable_error(self):
+        import pypyjit, os
+        os.mkdir(self.filename + '.dir')
+        raises(OSError, pypyjit.enable_warmup_cache, self.filename + '.dir')
+        pypyjit.enable_warmup_cache(None)
@@ -0,0 +1,45 @@
+import py
+from pypy.module.pypyjit.test_pypy_c.test_00_model import BaseTestPyPyC
+
+
+class TestWarmupCache(BaseTestPyPyC):
+
+    def test_warmup_cache_starts_tracing_early(self, tmpdir):
+        # Measures the time-to-first-loop, in loop iterations, with and
+        # without a warm-up cache file written by a previous run.
+        pkg = tmpdir.join('warmupmod').ensure(dir=True)
+        pkg.join('__init__.py').write(str(py.code.Source("""
+            def loop(n):
+                i = 0
+                total = 0
+                while i < n:
+                    total += i * 2
+                    i += 1
+                return total
+        """)))
+        def main(path, cachefile, n):
+            import sys, pypyjit
+            # must be enabled before the code objects are created
+            pypyjit.enable_warmup_cache(cachefile)
+            sys.path.append(path)
+            compiled_at = []
+            def hook(info):
+                if info.greenkey and info.greenkey[0].co_name == 'loop':
+                    compiled_at.append(info.greenkey[1])
+            import warmupmod
+            pypyjit.set_compile_hook(hook)
+            iterations = 0
+            while not compiled_at and iterations < n:
+                warmupmod.loop(1)
+                iterations += 1
+            pypyjit.set_compile_hook(None)
+            return iterations
+        #
+        cachefile = str(tmpdir.join('warmup.cache'))
+        log = self.run(main, [str(tmpdir), cachefile, 10000])
+        cold = log.result
+        assert tmpdir.join('warmup.cache').check()
+        log = self.run(main, [str(tmpdir), cachefile, 10000])
+        warm = log.result
+        print 'function calls before the first compiled loop:', cold, warm
+        assert warm * 4 < cold
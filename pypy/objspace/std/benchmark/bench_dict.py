@@ -45,8 +45,60 @@ def bench_simple_dict(SIZE = 10000):
     count_operation("Existing key access", lambda : rand_keys(lookup_keys))
     return test_d
 
+def bench_int_dict(SIZE = 100000):
+    keys = range(0, SIZE * 7, 7)
+    random.shuffle(keys)
+    lookup_keys = random.sample(keys, SIZE)
+    missing_keys = [key + 1 for key in lookup_keys]
+
+    def insert():
+        d = {}
+        for key in keys:
+            d[key] = key
+        return d
+    test_d = count_operation("Int insert (%d)" % SIZE, insert)
+
+    def count():
+        d = {}
+        for key in lookup_keys:
+            d[key] = d.get(key, 0) + 1
+        return d
+    count_operation("Int counting (%d)" % SIZE, count)
+
+    def lookup(keys):
+        total = 0
+        for key in keys:
+            if key in test_d:
+                total += test_d[key]
+        return total
+    count_operation("Int existing key access (%d)" % SIZE,
+                    lambda : lookup(lookup_keys))
+    count_operation("Int missing key access (%d)" % SIZE,
+                    lambda : lookup(missing_keys))
+    count_operation("Int float key access (%d)" % SIZE,
+                    lambda : lookup([float(key) for key in lookup_keys]))
+
+    def iterate():
+        total = 0
+        for key in test_d:
+            total += key
+        for key, value in test_d.iteritems():
+            total += key - value
+        for value in test_d.itervalues():
+            total += value
+        return total
+    count_operation("Int iteration (%d)" % SIZE, iterate)
+    count_operation("Int fromkeys (%d)" % SIZE,
+                    lambda : dict.fromkeys(keys, 0))
+    return test_d
+
 if __name__ == '__main__':
+    import sys, __pypy__
+    # sizes of the int dicts, e.g. "bench_dict.py 1000 10000000"
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 100000, 1000000]
+    for size in sizes:
+        int_d = bench_int_dict(size)
+    print __pypy__.internal_repr(int_d)
     test_d = bench_simple_dict()
-    import __pypy__
     print __pypy__.internal_repr(test_d)
     print __pypy__.internal_repr(test_d.iterkeys())
@@ -0,0 +1,67 @@
+
+""" build many small dicts with the same keys, like the rows returned by a
+database driver, and report the time and the memory it takes.
+
+Compare a pypy translated with and without --withsharedkeysdict.
+"""
+
+import gc, time
+
+COLUMNS = ['id', 'name', 'email', 'created', 'score', 'active']
+
+def count_operation(name, function):
+    print name
+    t0 = time.time()
+    retval = function()
+    tk = time.time()
+    print name, " takes: %f" % (tk - t0)
+    return retval
+
+def memory_used():
+    gc.collect()
+    try:
+        return gc.get_stats()._s.total_gc_memory
+    except AttributeError:
+        return 0      # not on PyPy
+
+def make_rows(num):
+    return [(i, 'user%d' % i, 'user%d@example.com' % i, 1234567890 + i,
+             i * 0.5, bool(i & 1)) for i in xrange(num)]
+
+def bench_zip_rows(rows):
+    cols = COLUMNS
+    return [dict(zip(cols, row)) for row in rows]
+
+def bench_literal_rows(rows):
+    return [{'id': a, 'name': b, 'email': c, 'created': d, 'score': e,
+             'active': f} for (a, b, c, d, e, f) in rows]
+
+def bench_access(dicts):
+    total = 0.0
+    for d in dicts:
+        total += d['score']
+        if d['active']:
+            total += d['id']
+    return total
+
+def bench_shared_keys(SIZE=1000000):
+    rows = make_rows(SIZE)
+    for name, func in [("dict(zip(cols, row))", bench_zip_rows),
+                       ("dict literals", bench_literal_rows)]:
+        before = memory_used()
+        dicts = count_operation("Creation with " + name, lambda: func(rows))
+        after = memory_used()
+        print "Memory for %d dicts: %.1f MB" % (
+            SIZE, (after - before) / (1024.0 * 1024.0))
+        count_operation("Key access", lambda: bench_access(dicts))
+        dicts = None
+    return func(rows[:1])[0]
+
+if __name__ == '__main__':
+    d = bench_shared_keys()
+    try:
+        import __pypy__
+    except ImportError:
+        pass
+    else:
+        print __pypy__.internal_repr(d)
@@ -1,5 +1,7 @@
 """The builtin str implementation"""
 
+import py
+
 from rpython.rlib import jit, rutf8
 from rpython.rlib.objectmodel import (
     compute_hash, compute_unique_id, import_from_mixin)
@@ -77,6 +79,9 @@ class W_AbstractBytesObject(W_Root):
     def descr_ge(self, space, w_other):
         """x.__ge__(y) <==> x>=y"""
 
+    def descr_getbuffer(self, space, w_flags):
+        ""
+
     def descr_getitem(self, space, w_index):
         """x.__getitem__(y) <==> x[y]"""
 
@@ -428,6 +433,12 @@ class W_AbstractBytesObject(W_Root):
         Return a copy of the string S converted to uppercase.
         """
 
+    def descr_formatter_parser(self, space):
+        ""
+
+    def descr_formatter_field_name_split(self, space):
+        ""
+
     @unwrap_spec(width=int)
     def descr_zfill(self, space, width):
         """S.zfill(width) -> string
@@ -499,10 +510,18 @@ class W_BytesObject(W_AbstractBytesObject):
 
     _val = str_w
 
+    def _sliced(self, space, s, start, stop, orig_obj):
+        assert start >= 0
+        assert stop >= 0
+        if space.config.objspace.std.withbytesslice:
+            from pypy.objspace.std.bytessliceobject import newslice
+            return newslice(s, start, stop)
+        return W_BytesObject(s[start:stop])
+
     @staticmethod
     def _use_rstr_ops(space, w_other):
         from pypy.objspace.std.unicodeobject import W_UnicodeObject
-        return (isinstance(w_other, W_BytesObject) or
+        return (isinstance(w_other, W_AbstractBytesObject) or
                 isinstance(w_other, W_UnicodeObject))
 
     @staticmethod
@@ -615,34 +634,40 @@ class W_BytesObject(W_AbstractBytesObject):
         return mod_format(space, w_values, self, do_unicode=False)
 
     def descr_eq(self, space, w_other):
-        if not isinstance(w_other, W_BytesObject):
+        other = _compared_value(space, w_other)
+        if other is None:
             return space.w_NotImplemented
-        return space.newbool(self._value == w_other._value)
+        return space.newbool(self._value == other)
 
     def descr_ne(self, space, w_other):
-        if not isinstance(w_other, W_BytesObject):
+        other = _compared_value(space, w_other)
+        if other is None:
             return space.w_NotImplemented
-        return space.newbool(self._value != w_other._value)
+        return space.newbool(self._value != other)
 
     def descr_lt(self, space, w_other):
-        if not isinstance(w_other, W_BytesObject):
+        other = _compared_value(space, w_other)
+        if other is None:
             return space.w_NotImplemented
-        return space.newbool(self._value < w_other._value)
+        return space.newbool(self._value < other)
 
     def descr_le(self, space, w_other):
-        if not isinstance(w_other, W_BytesObject):
+        other = _compared_value(space, w_other)
+        if other is None:
             return space.w_NotImplemented
-        return space.newbool(self._value <= w_other._value)
+        return space.newbool(self._value <= other)
 
     def descr_gt(self, space, w_other):
-        if not isinstance(w_other, W_BytesObject):
+        other = _compared_value(space, w_other)
+        if other is None:
             return space.w_NotImplemented
-        return space.newbool(self._value > w_other._value)
+        return space.newbool(self._value > other)
 
     def descr_ge(self, space, w_other):
-        if not isinstance(w_other, W_BytesObject):
+        other = _compared_value(space, w_other)
+        if other is None:
             return space.w_NotImplemented
-        return space.newbool(self._value >= w_other._value)
+        return space.newbool(self._value >= other)
 
     # auto-conversion fun
 
@@ -657,6 +682,10 @@ class W_BytesObject(W_AbstractBytesObject):
             from .bytearrayobject import W_BytearrayObject, _make_data
             self_as_bytearray = W_BytearrayObject(_make_data(self._value))
             return space.add(self_as_bytearray, w_other)
+        if (space.config.objspace.std.withstrbuf and
+                isinstance(w_other, W_AbstractBytesObject)):
+            from pypy.objspace.std.strbufobject import concat
+            return concat(self._value, space.bytes_w(w_other))
         return self._StringMethods_descr_add(space, w_other)
 
     _StringMethods__startswith = _startswith
@@ -848,6 +877,14 @@ class W_BytesObject(W_AbstractBytesObject):
         return tformat.formatter_field_name_split()
 
 
+def _compared_value(space, w_other):
+    # the string that a str compares with, or None if w_other is not a str
+    if isinstance(w_other, W_BytesObject):
+        return w_other._value
+    if isinstance(w_other, W_AbstractBytesObject):    # a W_BytesSliceObject
+        return space.bytes_w(w_other)
+    return None
+
 def _create_list_from_bytes(value):
     # need this helper function to allow the jit to look inside and inline
     # listview_bytes
@@ -923,21 +960,48 @@ W_BytesObject.typedef = TypeDef(
     translate = interpindirect2app(W_AbstractBytesObject.descr_translate),
     upper = interpindirect2app(W_AbstractBytesObject.descr_upper),
     zfill = interpindirect2app(W_AbstractBytesObject.descr_zfill),
-    __buffer__ = interp2app(W_BytesObject.descr_getbuffer),
+    __buffer__ = interpindirect2app(W_AbstractBytesObject.descr_getbuffer),
 
-    format = interpindirect2app(W_BytesObject.descr_format),
-    __format__ = interpindirect2app(W_BytesObject.descr__format__),
-    __mod__ = interpindirect2app(W_BytesObject.descr_mod),
-    __rmod__ = interpindirect2app(W_BytesObject.descr_rmod),
+    format = interpindirect2app(W_AbstractBytesObject.descr_format),
+    __format__ = interpindirect2app(W_AbstractBytesObject.descr__format__),
+    __mod__ = interpindirect2app(W_AbstractBytesObject.descr_mod),
+    __rmod__ = interpindirect2app(W_AbstractBytesObject.descr_rmod),
     __getnewargs__ = interpindirect2app(
         W_AbstractBytesObject.descr_getnewargs),
-    _formatter_parser = interp2app(W_BytesObject.descr_formatter_parser),
-    _formatter_field_name_split =
-        interp2app(W_BytesObject.descr_formatter_field_name_split),
+    _formatter_parser = interpindirect2app(
+        W_AbstractBytesObject.descr_formatter_parser),
+    _formatter_field_name_split = interpindirect2app(
+        W_AbstractBytesObject.descr_formatter_field_name_split),
 )
 W_BytesObject.typedef.flag_sequence_bug_compat = True
 
 
+def delegate_to_forced(cls):
+    """NOT_RPYTHON: for the other implementations of str, which have a
+    force() method returning an equal W_BytesObject.  Add to 'cls' all the
+    descr_*() methods that it does not define, as calls to the same method
+    of self.force()."""
+    import inspect
+    for name, func in W_AbstractBytesObject.__dict__.items():
+        if not name.startswith('descr_') or name in cls.__dict__:
+            continue
+        args, varargs, varkw, defaults = inspect.getargspec(func)
+        assert varargs is None and varkw is None
+        args = args[1:]
+        params = args[:]
+        if defaults:
+            firstdefault = len(args) - len(defaults)
+            for i in range(len(defaults)):
+                params[firstdefault + i] += '=%r' % (defaults[i],)
+        source = py.code.Source("""
+            def %s(self, %s):
+                return self.force().%s(%s)
+        """ % (name, ', '.join(params), name, ', '.join(args)))
+        d = {}
+        exec source.compile() in d
+        setattr(cls, name, d[name])
+
+
 @jit.elidable
 def string_escape_encode(s, quote):
     buf = StringBuilder(len(s) + 2)
@@ -0,0 +1,236 @@
+"""str objects that are slices of a bigger string, made without copying.
+
+Protocol parsers tend to repeatedly slice big buffers (``buf = buf[n:]``,
+``frame = buf[4:4 + size]``, ...), which copies the characters every time.
+With the withbytesslice option, a big enough slice of a str is a
+W_BytesSliceObject that only references the string it comes from.  The
+operations that are common on such slices (len, indexing, slicing, find,
+startswith, buffers...) work on the source string directly; all the others
+make a copy of the characters once ("force" the slice) and then forget the
+source string.
+
+A slice keeps the whole source string alive.  To bound the memory that this
+can waste, slices only reference their source if they are at least
+SLICE_MIN_LENGTH characters long and at least 1/SLICE_MAX_WASTE of the source
+string; smaller slices are copied as usual.
+"""
+
+from rpython.rlib.buffer import StringBuffer, SubBuffer
+from rpython.rlib.rstring import endswith, startswith
+
+from pypy.interpreter.buffer import SimpleView
+from pypy.interpreter.error import oefmt
+from pypy.objspace.std.bytesobject import (
+    W_AbstractBytesObject, W_BytesObject, delegate_to_forced)
+from pypy.objspace.std.sliceobject import (W_SliceObject, unwrap_start_stop,
+    normalize_simple_slice)
+
+
+# slices shorter than this are always copied
+SLICE_MIN_LENGTH = 4096
+# a slice references its source string only if that string is at most
+# SLICE_MAX_WASTE times longer than the slice
+SLICE_MAX_WASTE = 4
+
+
+def newslice(source, start, stop):
+    length = stop - start
+    if length < SLICE_MIN_LENGTH or length * SLICE_MAX_WASTE < len(source):
+        assert start >= 0
+        assert stop >= 0
+        return W_BytesObject(source[start:stop])
+    return W_BytesSliceObject(source, start, stop)
+
+
+class W_BytesSliceObject(W_AbstractBytesObject):
+    _immutable_fields_ = ['start', 'stop']
+
+    def __init__(self, source, start, stop):
+        assert 0 <= start <= stop <= len(source)
+        self.source = source
+        self.start = start
+        self.stop = stop
+        self.w_forced = None
+
+    def __repr__(self):
+        """representation for debugging purposes"""
+        if self.w_forced is not None:
+            return "%s(forced to %r)" % (self.__class__.__name__,
+                                         self.w_forced)
+        return "%s(<string of length %d>[%d:%d])" % (
+            self.__class__.__name__, len(self.source), self.start, self.stop)
+
+    def force(self):
+        """Return a W_BytesObject with the same characters.  The source
+        string is no longer referenced afterwards."""
+        w_forced = self.w_forced
+        if w_forced is None:
+            start = self.start
+            stop = self.stop
+            assert start >= 0
+            assert stop >= 0
+            w_forced = W_BytesObject(self.source[start:stop])
+            self.w_forced = w_forced
+            self.source = None
+        return w_forced
+
+    def _source(self):
+        # returns the string containing our characters, and their offset
+        w_forced = self.w_forced
+        if w_forced is not None:
+            return w_forced._value, 0
+        return self.source, self.start
+
+    def _len(self):
+        return self.stop - self.start
+
+    def _sliced(self, space, start, stop):
+        s, offset = self._source()
+        return newslice(s, offset + start, offset + stop)
+
+    def unwrap(self, space):
+        return self.force()._value
+
+    def str_w(self, space):
+        return self.force()._value
+
+    def utf8_w(self, space):
+        return self.force()._value
+
+    charbuf_w = str_w
+
+    def buffer_w(self, space, flags):
+        space.check_buf_flags(flags, True)
+        return SimpleView(self.readbuf_w(space))
+
+    def readbuf_w(self, space):
+        s, offset = self._source()
+        return SubBuffer(StringBuffer(s), offset, self._len())
+
+    def writebuf_w(self, space):
+        raise oefmt(space.w_TypeError,
+                    "Cannot use string as modifiable buffer")
+
+    def listview_bytes(self):
+        return self.force().listview_bytes()
+
+    def ord(self, space):
+        return self.force().ord(space)
+
+    def descr_str(self, space):
+        return self
+
+    def descr_len(self, space):
+        return space.newint(self._len())
+
+    def descr_getitem(self, space, w_index):
+        length = self._len()
+        if isinstance(w_index, W_SliceObject):
+            start, stop, step, sl = w_index.indices4(space, length)
+            if sl == 0:
+                return W_BytesObject.EMPTY
+            elif step == 1:
+                return self._sliced(space, start, stop)
+            return self.force().descr_getitem(space, w_index)
+
+        index = space.getindex_w(w_index, space.w_IndexError, "string index")
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise oefmt(space.w_IndexError, "string index out of range")
+        s, offset = self._source()
+        return W_BytesObject(s[offset + index])
+
+    def descr_getslice(self, space, w_start, w_stop):
+        start, stop = normalize_simple_slice(space, self._len(), w_start,
+                                             w_stop)
+        if start == stop:
+            return W_BytesObject.EMPTY
+        return self._sliced(space, start, stop)
+
+    # searching for a str works on the source string; anything else
+    # (unicode, buffers, tuples of prefixes...) is done by W_BytesObject
+
+    def _find(self, space, w_sub, w_start, w_end, reverse):
+        length = self._len()
+        start, end = unwrap_start_stop(space, length, w_start, w_end)
+        if end > length:
+            end = length
+        sub = space.bytes_w(w_sub)
+        s, offset = self._source()
+        start += offset
+        end += offset
+        assert start >= 0
+        assert end >= 0
+        if reverse:
+            res = s.rfind(sub, start, end)
+        else:
+            res = s.find(sub, start, end)
+        if res >= 0:
+            res -= offset
+        return res
+
+    def descr_find(self, space, w_sub, w_start=None, w_end=None):
+        if not isinstance(w_sub, W_AbstractBytesObject):
+            return self.force().descr_find(space, w_sub, w_start, w_end)
+        return space.newint(self._find(space, w_sub, w_start, w_end, False))
+
+    def descr_rfind(self, space, w_sub, w_start=None, w_end=None):
+        if not isinstance(w_sub, W_AbstractBytesObject):
+            return self.force().descr_rfind(space, w_sub, w_start, w_end)
+        return space.newint(self._find(space, w_sub, w_start, w_end, True))
+
+    def descr_index(self, space, w_sub, w_start=None, w_end=None):
+        if not isinstance(w_sub, W_AbstractBytesObject):
+            return self.force().descr_index(space, w_sub, w_start, w_end)
+        res = self._find(space, w_sub, w_start, w_end, False)
+        if res < 0:
+            raise oefmt(space.w_ValueError,
+                        "substring not found in string.index")
+        return space.newint(res)
+
+    def descr_rindex(self, space, w_sub, w_start=None, w_end=None):
+        if not isinstance(w_sub, W_AbstractBytesObject):
+            return self.force().descr_rindex(space, w_sub, w_start, w_end)
+        res = self._find(space, w_sub, w_start, w_end, True)
+        if res < 0:
+            raise oefmt(space.w_ValueError,
+                        "substring not found in string.rindex")
+        return space.newint(res)
+
+    def descr_contains(self, space, w_sub):
+        if not isinstance(w_sub, W_AbstractBytesObject):
+            return self.force().descr_contains(space, w_sub)
+        return space.newbool(self._find(space, w_sub, None, None, False) >= 0)
+
+    def descr_startswith(self, space, w_prefix, w_start=None, w_end=None):
+        if not isinstance(w_prefix, W_AbstractBytesObject):
+            return self.force().descr_startswith(space, w_prefix, w_start,
+                                                 w_end)
+        length = self._len()
+        start, end = unwrap_start_stop(space, length, w_start, w_end)
+        if start > length:
+            return space.w_False
+        if end > length:
+            end = length
+        s, offset = self._source()
+        return space.newbool(startswith(s, space.bytes_w(w_prefix),
+                                        offset + start, offset + end))
+
+    def descr_endswith(self, space, w_suffix, w_start=None, w_end=None):
+        if not isinstance(w_suffix, W_AbstractBytesObject):
+            return self.force().descr_endswith(space, w_suffix, w_start,
+                                               w_end)
+        length = self._len()
+        start, end = unwrap_start_stop(space, length, w_start, w_end)
+        if start > length:
+            return space.w_False
+        if end > length:
+            end = length
+        s, offset = self._source()
+        return space.newbool(endswith(s, space.bytes_w(w_suffix),
+                                      offset + start, offset + end))
+
+
+delegate_to_forced(W_BytesSliceObject)
+W_BytesSliceObject.typedef = W_BytesObject.typedef
@@ -3,6 +3,7 @@
 from rpython.rlib import jit, rerased, objectmodel, rutf8
 from rpython.rlib.debug import mark_dict_non_null
 from rpython.rlib.objectmodel import newlist_hint, r_dict, specialize
+from rpython.rlib.rarithmetic import ovfcheck_float_to_int
 from rpython.tool.sourcetools import func_renamer, func_with_new_name
 
 from pypy.interpreter.baseobjspace import W_Root
@@ -17,6 +18,11 @@ from pypy.objspace.std.util import negate
 
 UNROLL_CUTOFF = 5
 
+# results of IntDictStrategy._equal_int_key()
+KEY_INT = 0
+KEY_NEVER = 1
+KEY_UNKNOWN = 2
+
 
 def _never_equal_to_string(space, w_lookup_type):
     """Handles the case of a non string key lookup.
@@ -125,9 +131,15 @@ class W_DictMultiObject(W_Root):
                                                                   w_type)
 
             byteslist = space.listview_bytes(w_keys)
+            intlist = None
+            if byteslist is None:
+                intlist = space.listview_int(w_keys)
             if byteslist is not None:
                 for key in byteslist:
                     w_dict.setitem_str(key, w_fill)
+            elif intlist:
+                strategy = space.fromcache(IntDictStrategy)
+                strategy.fill_from_keys(w_dict, intlist, w_fill)
             else:
                 for w_key in space.listview(w_keys):
                     w_dict.setitem(w_key, w_fill)
@@ -727,7 +739,11 @@ class EmptyDictStrategy(DictStrategy):
             self.switch_to_object_strategy(w_dict)
 
     def switch_to_bytes_strategy(self, w_dict):
-        strategy = self.space.fromcache(BytesDictStrategy)
+        if self.space.config.objspace.std.withsharedkeysdict:
+            from pypy.objspace.std.sharedkeysdict import get_empty_strategy
+            strategy = get_empty_strategy(self.space)
+        else:
+            strategy = self.space.fromcache(BytesDictStrategy)
         storage = strategy.get_empty_storage()
         w_dict.set_strategy(strategy)
         w_dict.dstorage = storage
@@ -1379,6 +1395,109 @@ class IntDictStrategy(AbstractTypedStrategy, DictStrategy):
                 space.is_w(w_lookup_type, space.w_unicode)
                 )
 
+    def _equal_int_key(self, w_key):
+        """For a key that is not an int: returns (KEY_INT, i) if it is equal
+        to the int i, (KEY_NEVER, 0) if it is not equal to any int, and
+        (KEY_UNKNOWN, 0) if we can't tell without calling __eq__."""
+        space = self.space
+        w_type = space.type(w_key)
+        if space.is_w(w_type, space.w_bool):
+            return KEY_INT, space.int_w(w_key)
+        if space.is_w(w_type, space.w_long):
+            try:
+                return KEY_INT, space.int_w(w_key)
+            except OperationError as e:
+                if not e.match(space, space.w_OverflowError):
+                    raise
+                return KEY_NEVER, 0
+        if space.is_w(w_type, space.w_float):
+            x = space.float_w(w_key)
+            try:
+                key = ovfcheck_float_to_int(x)
+            except OverflowError:
+                return KEY_NEVER, 0
+            if float(key) != x:
+                return KEY_NEVER, 0
+            return KEY_INT, key
+        return KEY_UNKNOWN, 0
+
+    # Looking up 1.0, True or 1L finds the key 1, without switching to the
+    # ObjectDictStrategy, which would box all the keys.  Storing them only
+    # stays in this strategy if the int key is already there, because the
+    # dict must keep the key object that was stored first.
+
+    def getitem(self, w_dict, w_key):
+        space = self.space
+        d = self.unerase(w_dict.dstorage)
+        if self.is_correct_type(w_key):
+            return d.get(self.unwrap(w_key), None)
+        kind, key = self._equal_int_key(w_key)
+        if kind == KEY_INT:
+            return d.get(key, None)
+        elif kind == KEY_NEVER or self._never_equal_to(space.type(w_key)):
+            return None
+        else:
+            self.switch_to_object_strategy(w_dict)
+            return w_dict.getitem(w_key)
+
+    def setitem(self, w_dict, w_key, w_value):
+        d = self.unerase(w_dict.dstorage)
+        if self.is_correct_type(w_key):
+            d[self.unwrap(w_key)] = w_value
+            return
+        kind, key = self._equal_int_key(w_key)
+        if kind == KEY_INT and key in d:
+            d[key] = w_value
+        else:
+            self.switch_to_object_strategy(w_dict)
+            w_dict.setitem(w_key, w_value)
+
+    def setdefault(self, w_dict, w_key, w_default):
+        d = self.unerase(w_dict.dstorage)
+        if self.is_correct_type(w_key):
+            return d.setdefault(self.unwrap(w_key), w_default)
+        kind, key = self._equal_int_key(w_key)
+        if kind == KEY_INT:
+            w_value = d.get(key, None)
+            if w_value is not None:
+                return w_value
+        self.switch_to_object_strategy(w_dict)
+        return w_dict.setdefault(w_key, w_default)
+
+    def delitem(self, w_dict, w_key):
+        d = self.unerase(w_dict.dstorage)
+        if self.is_correct_type(w_key):
+            del d[self.unwrap(w_key)]
+            return
+        kind, key = self._equal_int_key(w_key)
+        if kind == KEY_INT:
+            del d[key]
+        elif kind == KEY_NEVER:
+            raise KeyError
+        else:
+            self.switch_to_object_strategy(w_dict)
+            w_dict.delitem(w_key)
+
+    def pop(self, w_dict, w_key, w_default):
+        space = self.space
+        d = self.unerase(w_dict.dstorage)
+        if self.is_correct_type(w_key):
+            key = self.unwrap(w_key)
+        else:
+            kind, key = self._equal_int_key(w_key)
+            if kind == KEY_UNKNOWN and not self._never_equal_to(
+                    space.type(w_key)):
+                self.switch_to_object_strategy(w_dict)
+                return w_dict.get_strategy().pop(w_dict, w_key, w_default)
+            if kind != KEY_INT:
+                if w_default is not None:
+                    return w_default
+                raise KeyError
+        if w_default is None:
+            return d.pop(key)
+        else:
+            return d.pop(key, w_default)
+
     def listview_int(self, w_dict):
         return self.unerase(w_dict.dstorage).keys()
 
@@ -1388,6 +1507,16 @@ class IntDictStrategy(AbstractTypedStrategy, DictStrategy):
     def w_keys(self, w_dict):
         return self.space.newlist_int(self.listview_int(w_dict))
 
+    def fill_from_keys(self, w_dict, keys, w_fill):
+        """Make the empty w_dict map all the ints in keys to w_fill."""
+        storage = self.get_empty_storage()
+        d = self.unerase(storage)
+        objectmodel.prepare_dict_update(d, len(keys))
+        for key in keys:
+            d[key] = w_fill
+        w_dict.set_strategy(self)
+        w_dict.dstorage = storage
+
 create_iterator_classes(IntDictStrategy)
 
 
@@ -183,6 +183,124 @@ class KwargsDictStrategy(DictStrategy):
     wrapkey = _wrapkey
 
 
+class KwargsViewDictStrategy(DictStrategy):
+    """A **kwargs dict that uses the lists of keyword names and values of
+    the Arguments object it comes from, without copying them.  Calls that
+    pass **kwargs on can use the same lists again, see view_as_kwargs().
+    The lists are not resizable and may be shared, so the dict switches to
+    the KwargsDictStrategy, with copies of the lists, when it is modified.
+    """
+    erase, unerase = rerased.new_erasing_pair("kwargsview")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def wrap(self, key):
+        return _wrapkey(self.space, key)
+
+    def unwrap(self, wrapped):
+        return self.space.text_w(wrapped)
+
+    def get_empty_storage(self):
+        return self.erase(([], []))
+
+    def is_correct_type(self, w_obj):
+        space = self.space
+        return space.is_w(space.type(w_obj), space.w_text)
+
+    def _never_equal_to(self, w_lookup_type):
+        return False
+
+    def switch_to_kwargs_strategy(self, w_dict):
+        strategy = self.space.fromcache(KwargsDictStrategy)
+        keys, values_w = self.unerase(w_dict.dstorage)
+        w_dict.set_strategy(strategy)
+        w_dict.dstorage = strategy.erase((keys[:], values_w[:]))
+
+    def setitem(self, w_dict, w_key, w_value):
+        self.switch_to_kwargs_strategy(w_dict)
+        w_dict.setitem(w_key, w_value)
+
+    def setitem_str(self, w_dict, key, w_value):
+        self.switch_to_kwargs_strategy(w_dict)
+        w_dict.setitem_str(key, w_value)
+
+    def setdefault(self, w_dict, w_key, w_default):
+        if self.is_correct_type(w_key):
+            w_result = self.getitem_str(w_dict, self.unwrap(w_key))
+            if w_result is not None:
+                return w_result
+        self.switch_to_kwargs_strategy(w_dict)
+        return w_dict.setdefault(w_key, w_default)
+
+    def delitem(self, w_dict, w_key):
+        self.switch_to_kwargs_strategy(w_dict)
+        w_dict.delitem(w_key)
+
+    def popitem(self, w_dict):
+        self.switch_to_kwargs_strategy(w_dict)
+        return w_dict.popitem()
+
+    def clear(self, w_dict):
+        strategy = self.space.fromcache(KwargsDictStrategy)
+        w_dict.set_strategy(strategy)
+        w_dict.dstorage = strategy.get_empty_storage()
+
+    def length(self, w_dict):
+        return len(self.unerase(w_dict.dstorage)[0])
+
+    @jit.look_inside_iff(lambda self, w_dict, key:
+            jit.isconstant(self.length(w_dict)) and jit.isconstant(key))
+    def getitem_str(self, w_dict, key):
+        keys, values_w = self.unerase(w_dict.dstorage)
+        for i in range(len(keys)):
+            if keys[i] == key:
+                return values_w[i]
+        return None
+
+    def getitem(self, w_dict, w_key):
+        if self.is_correct_type(w_key):
+            return self.getitem_str(w_dict, self.unwrap(w_key))
+        self.switch_to_kwargs_strategy(w_dict)
+        return w_dict.getitem(w_key)
+
+    def w_keys(self, w_dict):
+        keys = self.unerase(w_dict.dstorage)[0]
+        return self.space.newlist_text(keys[:])
+
+    def values(self, w_dict):
+        return self.unerase(w_dict.dstorage)[1][:]
+
+    def items(self, w_dict):
+        space = self.space
+        keys, values_w = self.unerase(w_dict.dstorage)
+        return [space.newtuple2(self.wrap(keys[i]), values_w[i])
+                for i in range(len(keys))]
+
+    def switch_to_object_strategy(self, w_dict):
+        self.switch_to_kwargs_strategy(w_dict)
+        w_dict.get_strategy().switch_to_object_strategy(w_dict)
+
+    def view_as_kwargs(self, w_dict):
+        # no copy needed, the lists are never modified
+        return self.unerase(w_dict.dstorage)
+
+    def getiterkeys(self, w_dict):
+        return iter(self.unerase(w_dict.dstorage)[0])
+
+    def getitervalues(self, w_dict):
+        return iter(self.unerase(w_dict.dstorage)[1])
+
+    def getiteritems_with_hash(self, w_dict):
+        keys, values_w = self.unerase(w_dict.dstorage)
+        # copies, because ZipItemsWithHash is also used with resizable lists
+        return ZipItemsWithHash(keys[:], values_w[:])
+
+    def copy(self, w_dict):
+        return W_DictObject(self.space, self, w_dict.dstorage)
+
+    wrapkey = _wrapkey
+
+
 class ZipItemsWithHash(object):
     def __init__(self, list1, list2):
         assert len(list1) == len(list2)
@@ -202,3 +320,4 @@ class ZipItemsWithHash(object):
         return (key, self.list2[i], objectmodel.compute_hash(key))
 
 create_iterator_classes(KwargsDictStrategy)
+create_iterator_classes(KwargsViewDictStrategy)
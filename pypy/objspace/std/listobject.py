@@ -1856,10 +1856,341 @@ class ObjectListStrategy(ListStrategy):
     def getitems(self, w_list):
         return self.unerase(w_list.lstorage)
 
+    def insert(self, w_list, index, w_item):
+        l = self.unerase(w_list.lstorage)
+        if (self.space.config.objspace.std.withchunkedlist and
+                len(l) - index >= CHUNKED_LIST_THRESHOLD):
+            self.space.fromcache(ChunkedListStrategy).switch_from_object(
+                w_list)
+            w_list.insert(index, w_item)
+            return
+        l.insert(index, w_item)
+
+    def pop(self, w_list, index):
+        l = self.unerase(w_list.lstorage)
+        if index < 0:
+            raise IndexError
+        if (self.space.config.objspace.std.withchunkedlist and
+                len(l) - index >= CHUNKED_LIST_THRESHOLD):
+            self.space.fromcache(ChunkedListStrategy).switch_from_object(
+                w_list)
+            return w_list.pop(index)
+        try:
+            w_item = l.pop(index)
+        except IndexError:
+            raise
+        return w_item
+
     # no sort() method here: W_ListObject.descr_sort() handles this
     # case explicitly
 
 
+# lists of objects that are at least that long switch to the
+# ChunkedListStrategy when an insert() or a pop() has to move at least that
+# many items.  The switch costs about as much as moving the items once.
+CHUNKED_LIST_THRESHOLD = 8192
+# maximum number of items in a chunk.  Chunks that get bigger are split in
+# two, chunks that get smaller than a quarter of that are merged with a
+# neighbour.
+CHUNK_SIZE = 512
+
+
+class ChunkedStorage(object):
+    """The items of a list, stored as a list of chunks.  A Fenwick tree over
+    the lengths of the chunks finds the chunk that contains a given index in
+    O(log n) steps, so inserting or removing an item only has to move the
+    items of one chunk.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.rebuild()
+
+    @staticmethod
+    def from_list(list_w):
+        chunks = []
+        for start in range(0, len(list_w), CHUNK_SIZE):
+            chunks.append(list_w[start:start + CHUNK_SIZE])
+        return ChunkedStorage(chunks)
+
+    def copy(self):
+        return ChunkedStorage([chunk[:] for chunk in self.chunks])
+
+    def rebuild(self):
+        # node k (1-based) of the tree is the sum of the lengths of the
+        # chunks k - lowbit(k) to k - 1
+        chunks = self.chunks
+        n = len(chunks)
+        tree = [0] * n
+        length = 0
+        for k in range(1, n + 1):
+            size = len(chunks[k - 1])
+            length += size
+            tree[k - 1] += size
+            parent = k + (k & -k)
+            if parent <= n:
+                tree[parent - 1] += tree[k - 1]
+        self.tree = tree
+        self.length = length
+
+    def _add(self, chunkindex, delta):
+        tree = self.tree
+        k = chunkindex + 1
+        while k <= len(tree):
+            tree[k - 1] += delta
+            k += k & -k
+
+    def _append_node(self, size):
+        tree = self.tree
+        k = len(tree) + 1
+        j = k - 1
+        while j > k - (k & -k):
+            size += tree[j - 1]
+            j -= j & -j
+        tree.append(size)
+
+    def locate(self, index):
+        """Return (chunkindex, offset) of the item at 'index', which must be
+        between 0 and self.length - 1."""
+        tree = self.tree
+        n = len(tree)
+        step = 1
+        while step * 2 <= n:
+            step *= 2
+        pos = 0
+        while step > 0:
+            k = pos + step
+            if k <= n and tree[k - 1] <= index:
+                pos = k
+                index -= tree[k - 1]
+            step >>= 1
+        return pos, index
+
+    def getitem(self, index):
+        chunkindex, offset = self.locate(index)
+        return self.chunks[chunkindex][offset]
+
+    def setitem(self, index, w_item):
+        chunkindex, offset = self.locate(index)
+        self.chunks[chunkindex][offset] = w_item
+
+    def append(self, w_item):
+        chunks = self.chunks
+        last = len(chunks) - 1
+        if last >= 0 and len(chunks[last]) < CHUNK_SIZE:
+            chunks[last].append(w_item)
+            self._add(last, 1)
+        else:
+            chunks.append([w_item])
+            self._append_node(1)
+        self.length += 1
+
+    def insert(self, index, w_item):
+        if index == self.length:
+            self.append(w_item)
+            return
+        chunkindex, offset = self.locate(index)
+        assert chunkindex >= 0
+        assert offset >= 0
+        chunk = self.chunks[chunkindex]
+        chunk.insert(offset, w_item)
+        self.length += 1
+        if len(chunk) > CHUNK_SIZE:
+            half = len(chunk) // 2
+            self.chunks.insert(chunkindex + 1, chunk[half:])
+            del chunk[half:]
+            self.rebuild()
+        else:
+            self._add(chunkindex, 1)
+
+    def pop(self, index):
+        chunkindex, offset = self.locate(index)
+        assert chunkindex >= 0
+        assert offset >= 0
+        chunk = self.chunks[chunkindex]
+        w_item = chunk.pop(offset)
+        self.length -= 1
+        if len(chunk) < CHUNK_SIZE // 4 and len(self.chunks) > 1:
+            self._merge(chunkindex)
+        else:
+            self._add(chunkindex, -1)
+        return w_item
+
+    def pop_end(self):
+        chunks = self.chunks
+        last = len(chunks) - 1
+        chunk = chunks[last]
+        w_item = chunk.pop()
+        self.length -= 1
+        if len(chunk) == 0:
+            # the last node of the tree does not contribute to any other
+            # node, so it can just be dropped
+            chunks.pop()
+            self.tree.pop()
+        else:
+            self._add(last, -1)
+        return w_item
+
+    def _merge(self, chunkindex):
+        # merge a chunk that got too small with its neighbour, splitting
+        # the result again if it is too big
+        chunks = self.chunks
+        if chunkindex == len(chunks) - 1:
+            chunkindex -= 1
+        merged = chunks[chunkindex] + chunks[chunkindex + 1]
+        if len(merged) > CHUNK_SIZE:
+            half = len(merged) // 2
+            chunks[chunkindex] = merged[:half]
+            chunks[chunkindex + 1] = merged[half:]
+        else:
+            chunks[chunkindex] = merged
+            del chunks[chunkindex + 1]
+        self.rebuild()
+
+
+class ChunkedListStrategy(ListStrategy):
+    """ChunkedListStrategy is used for big lists of objects that get items
+    inserted or removed far from their end, e.g. when they are used as a
+    queue.  The storage is a ChunkedStorage: insert() and pop() cost
+    O(log n) plus the size of a chunk instead of O(n), and indexing stays
+    O(log n).  Operations that work on all the items at once switch the list
+    back to the ObjectListStrategy.
+    """
+
+    erase, unerase = rerased.new_erasing_pair("chunked")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def switch_from_object(self, w_list):
+        list_w = w_list.getitems()
+        w_list.strategy = self
+        self.init_from_list_w(w_list, list_w)
+
+    def switch_to_object_strategy(self, w_list):
+        list_w = self.getitems_copy(w_list)
+        strategy = self.space.fromcache(ObjectListStrategy)
+        w_list.strategy = strategy
+        w_list.lstorage = strategy.erase(list_w)
+        return list_w
+
+    def init_from_list_w(self, w_list, list_w):
+        w_list.lstorage = self.erase(ChunkedStorage.from_list(list_w))
+
+    def clone(self, w_list):
+        storage = self.erase(self.unerase(w_list.lstorage).copy())
+        return W_ListObject.from_storage_and_strategy(
+                self.space, storage, self)
+
+    def copy_into(self, w_list, w_other):
+        w_other.strategy = self
+        w_other.lstorage = self.getstorage_copy(w_list)
+
+    def getstorage_copy(self, w_list):
+        return self.erase(self.unerase(w_list.lstorage).copy())
+
+    def _resize_hint(self, w_list, hint):
+        assert hint >= 0
+
+    def length(self, w_list):
+        return self.unerase(w_list.lstorage).length
+
+    def getitem(self, w_list, index):
+        storage = self.unerase(w_list.lstorage)
+        if index < 0:
+            index += storage.length
+        if not 0 <= index < storage.length:
+            raise IndexError
+        return storage.getitem(index)
+
+    def getitems(self, w_list):
+        return self.switch_to_object_strategy(w_list)
+
+    def getitems_copy(self, w_list):
+        storage = self.unerase(w_list.lstorage)
+        items_w = [None] * storage.length
+        i = 0
+        for chunk in storage.chunks:
+            for w_item in chunk:
+                items_w[i] = w_item
+                i += 1
+        return items_w
+    getitems_fixedsize = func_with_new_name(getitems_copy,
+                                            "getitems_fixedsize")
+    getitems_unroll = func_with_new_name(getitems_copy, "getitems_unroll")
+
+    def getslice(self, w_list, start, stop, step, length):
+        storage = self.unerase(w_list.lstorage)
+        subitems_w = [None] * length
+        for i in range(length):
+            subitems_w[i] = storage.getitem(start)
+            start += step
+        return W_ListObject(self.space, subitems_w)
+
+    def append(self, w_list, w_item):
+        self.unerase(w_list.lstorage).append(w_item)
+
+    def insert(self, w_list, index, w_item):
+        self.unerase(w_list.lstorage).insert(index, w_item)
+
+    def _extend_from_list(self, w_list, w_other):
+        # w_other can be w_list itself
+        storage = self.unerase(w_list.lstorage)
+        for i in range(w_other.length()):
+            storage.append(w_other.getitem(i))
+
+    def setitem(self, w_list, index, w_item):
+        storage = self.unerase(w_list.lstorage)
+        if index < 0:
+            index += storage.length
+        if not 0 <= index < storage.length:
+            raise IndexError
+        storage.setitem(index, w_item)
+
+    def pop_end(self, w_list):
+        return self.unerase(w_list.lstorage).pop_end()
+
+    def pop(self, w_list, index):
+        storage = self.unerase(w_list.lstorage)
+        if not 0 <= index < storage.length:
+            raise IndexError
+        w_item = storage.pop(index)
+        if storage.length < CHUNKED_LIST_THRESHOLD // 4:
+            self.switch_to_object_strategy(w_list)
+        return w_item
+
+    def deleteslice(self, w_list, start, step, slicelength):
+        if slicelength > CHUNK_SIZE:
+            self.switch_to_object_strategy(w_list)
+            w_list.deleteslice(start, step, slicelength)
+            return
+        storage = self.unerase(w_list.lstorage)
+        # delete from the highest index downwards, so that the indexes of
+        # the remaining items do not change
+        if step > 0:
+            start += step * (slicelength - 1)
+            step = -step
+        for i in range(slicelength):
+            storage.pop(start)
+            start += step
+
+    def setslice(self, w_list, start, step, slicelength, w_other):
+        self.switch_to_object_strategy(w_list)
+        w_list.setslice(start, step, slicelength, w_other)
+
+    def inplace_mul(self, w_list, times):
+        self.switch_to_object_strategy(w_list)
+        w_list.inplace_mul(times)
+
+    def reverse(self, w_list):
+        self.switch_to_object_strategy(w_list)
+        w_list.reverse()
+
+    def sort(self, w_list, reverse):
+        # W_ListObject.descr_sort() sorts lists of objects itself
+        self.switch_to_object_strategy(w_list)
+        w_list.descr_sort(self.space, None, None, reverse)
+
+
 class IntegerListStrategy(ListStrategy):
     import_from_mixin(AbstractUnwrappedStrategy)
 
@@ -1200,6 +1200,7 @@ class MapDictIteratorItems(BaseItemIterator):
 class CacheEntry(object):
     version_tag = None
     w_method = None # for callmethod
+    next = None # the next entry of the same polymorphic cache
     success_counter = 0
     failure_counter = 0
 
@@ -1226,18 +1227,95 @@ INVALID_CACHE_ENTRY = CacheEntry()
 INVALID_CACHE_ENTRY.map_wref = weakref.ref(_invalid_cache_entry_map)
                                  # different from any real map ^^^
 
+class InlineCacheCounters(object):
+    """Global counters for the caches of LOAD_ATTR and LOOKUP_METHOD, only
+    updated with withmethodcachecounter."""
+
+    def __init__(self, space):
+        self.reset()
+
+    def reset(self):
+        self.hits = 0               # found in the first entry of a cache
+        self.polymorphic_hits = 0   # found in one of the other entries
+        self.misses = 0             # an entry was filled
+        self.evictions = 0          # the filled entry was the oldest one
+                                    # of a full cache
+
 def init_mapdict_cache(pycode):
     num_entries = len(pycode.co_names_w)
     pycode._mapdict_caches = [INVALID_CACHE_ENTRY] * num_entries
 
+# Every LOAD_ATTR or LOOKUP_METHOD site has a cache of up to
+# 'inlinecachesize' entries, chained by their 'next' attribute and ordered
+# from the most recently used to the least recently used one.  Only the
+# first entry is checked inline; the others are searched on the slow path.
+
+def _move_to_front(pycode, nameindex, prev, entry):
+    if prev is not None:
+        prev.next = entry.next
+        entry.next = pycode._mapdict_caches[nameindex]
+        pycode._mapdict_caches[nameindex] = entry
+
+def _find_in_cache(pycode, nameindex, map, is_method):
+    # search the entries after the first one for an entry that is valid for
+    # 'map' and moves it to the front (unless side effects are not ok, like
+    # in _fill_cache())
+    prev = pycode._mapdict_caches[nameindex]
+    entry = prev.next
+    while entry is not None:
+        if ((entry.w_method is not None) == is_method and
+                entry.is_valid_for_map(map)):
+            space = pycode.space
+            if not space._side_effects_ok():
+                return entry
+            _move_to_front(pycode, nameindex, prev, entry)
+            if space.config.objspace.std.withmethodcachecounter:
+                space.fromcache(InlineCacheCounters).polymorphic_hits += 1
+            return entry
+        prev = entry
+        entry = entry.next
+    return None
+
+def _get_entry_to_fill(pycode, nameindex, map, is_method):
+    # returns the entry to store the result of a lookup on 'map' into, at
+    # the front of the cache: an entry for the same map and kind of lookup
+    # or for a map that died, otherwise a new entry, or the least recently
+    # used one if the cache is full
+    space = pycode.space
+    head = pycode._mapdict_caches[nameindex]
+    if head is INVALID_CACHE_ENTRY:
+        entry = CacheEntry()
+        pycode._mapdict_caches[nameindex] = entry
+        return entry
+    prev = None
+    entry = head
+    size = 1
+    while True:
+        mymap = entry.map_wref()
+        if mymap is None or (mymap is map and
+                             (entry.w_method is not None) == is_method):
+            break
+        if entry.next is None:
+            if size < space.config.objspace.std.inlinecachesize:
+                entry = CacheEntry()
+                entry.next = head
+                pycode._mapdict_caches[nameindex] = entry
+                return entry
+            if space.config.objspace.std.withmethodcachecounter:
+                space.fromcache(InlineCacheCounters).evictions += 1
+            break
+        prev = entry
+        entry = entry.next
+        size += 1
+    _move_to_front(pycode, nameindex, prev, entry)
+    return entry
+
 @jit.dont_look_inside
 def _fill_cache(pycode, nameindex, map, version_tag, attr, w_method=None):
-    if not pycode.space._side_effects_ok():
+    space = pycode.space
+    if not space._side_effects_ok():
         return
-    entry = pycode._mapdict_caches[nameindex]
-    if entry is INVALID_CACHE_ENTRY:
-        entry = CacheEntry()
-        pycode._mapdict_caches[nameindex] = entry
+    entry = _get_entry_to_fill(pycode, nameindex, map, w_method is not None)
     entry.map_wref = weakref.ref(map)
     if attr:
         entry.attr_wref = weakref.ref(attr)
@@ -1245,8 +1323,9 @@ def _fill_cache(pycode, nameindex, map, version_tag, attr, w_method=None):
         entry.attr_wref = None
     entry.version_tag = version_tag
     entry.w_method = w_method
-    if pycode.space.config.objspace.std.withmethodcachecounter:
+    if space.config.objspace.std.withmethodcachecounter:
         entry.failure_counter += 1
+        space.fromcache(InlineCacheCounters).misses += 1
 
 def LOAD_ATTR_caching(pycode, w_obj, nameindex):
     # this whole mess is to make the interpreter quite a bit faster; it's not
@@ -1257,12 +1336,19 @@ def LOAD_ATTR_caching(pycode, w_obj, nameindex):
         # everything matches, it's incredibly fast
         attr = entry.attr_wref()
         if attr is not None:
+            if pycode.space.config.objspace.std.withmethodcachecounter:
+                pycode.space.fromcache(InlineCacheCounters).hits += 1
             return attr._direct_read(w_obj)
     return LOAD_ATTR_slowpath(pycode, w_obj, nameindex, map)
 LOAD_ATTR_caching._always_inline_ = True
 
 def LOAD_ATTR_slowpath(pycode, w_obj, nameindex, map):
     space = pycode.space
+    entry = _find_in_cache(pycode, nameindex, map, False)
+    if entry is not None:
+        attr = entry.attr_wref()
+        if attr is not None:
+            return attr._direct_read(w_obj)
     w_name = pycode.co_names_w[nameindex]
     if map is not None:
         w_type = map.terminator.w_cls
@@ -1316,10 +1402,21 @@ def LOOKUP_METHOD_mapdict(f, nameindex, w_obj):
     if entry.is_valid_for_obj(w_obj):
         w_method = entry.w_method
         if w_method is not None:
+            if pycode.space.config.objspace.std.withmethodcachecounter:
+                pycode.space.fromcache(InlineCacheCounters).hits += 1
             f.pushvalue(w_method)
             f.pushvalue(w_obj)
             return True
+    return LOOKUP_METHOD_mapdict_slowpath(f, pycode, nameindex, w_obj)
+
+def LOOKUP_METHOD_mapdict_slowpath(f, pycode, nameindex, w_obj):
+    entry = _find_in_cache(pycode, nameindex, w_obj._get_mapdict_map(), True)
+    if entry is not None:
+        f.pushvalue(entry.w_method)
+        f.pushvalue(w_obj)
+        return True
     return False
+LOOKUP_METHOD_mapdict_slowpath._dont_inline_ = True
 
 def LOOKUP_METHOD_mapdict_fill_cache_method(space, pycode, name, nameindex,
                                             w_obj, w_type, w_method):
@@ -1338,7 +1435,3 @@ def LOOKUP_METHOD_mapdict_fill_cache_method(space, pycode, name, nameindex,
     if map is None or isinstance(map.terminator, DevolvedDictTerminator):
         return
     _fill_cache(pycode, nameindex, map, version_tag, None, w_method)
-
-# XXX fix me: if a function contains a loop with both LOAD_ATTR and
-# XXX LOOKUP_METHOD on the same attribute name, it keeps trashing and
-# XXX rebuilding the cache
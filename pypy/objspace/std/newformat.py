@@ -6,7 +6,7 @@ import string
 
 from pypy.interpreter.error import OperationError, oefmt
 from rpython.rlib import rstring, rlocale, rfloat, jit, rutf8
-from rpython.rlib.objectmodel import specialize
+from rpython.rlib.objectmodel import compute_hash, specialize
 from rpython.rlib.rfloat import formatd
 from rpython.rlib.rarithmetic import r_uint, intmask
 from pypy.interpreter.signature import Signature
@@ -43,6 +43,48 @@ ANS_MANUAL = 3
 
 format_signature = Signature([], 'args', 'kwargs')
 
+# number of format strings whose parsed form is remembered; a power of two
+TEMPLATE_CACHE_SIZE = 256
+
+
+class TemplateChunk(object):
+    """A piece of a parsed format string: literal text, followed by a
+    replacement field if field_start is not -1."""
+    _immutable_ = True
+
+    def __init__(self, literal_start, literal_end, field_start=-1,
+                 field_end=-1, recursive=False):
+        self.literal_start = literal_start
+        self.literal_end = literal_end
+        self.field_start = field_start
+        self.field_end = field_end
+        self.recursive = recursive
+
+
+class TemplateCache(object):
+    """The parsed form of the format strings used last.  A format string
+    evicts the one that has the same slot, like the method cache.  The
+    parsed form only depends on the characters, so str and unicode format
+    strings share the cache (unicode ones are stored as utf-8)."""
+
+    def __init__(self, space):
+        self.templates = [None] * TEMPLATE_CACHE_SIZE
+        self.chunks = [None] * TEMPLATE_CACHE_SIZE
+
+    def _index(self, template):
+        return compute_hash(template) & (TEMPLATE_CACHE_SIZE - 1)
+
+    def lookup(self, template):
+        index = self._index(template)
+        if self.templates[index] == template:
+            return self.chunks[index]
+        return None
+
+    def store(self, template, chunks):
+        index = self._index(template)
+        self.templates[index] = template
+        self.chunks[index] = chunks
+
 
 def make_template_formatting_class(for_unicode):
     class TemplateFormatter(object):
@@ -57,6 +99,7 @@ def make_template_formatting_class(for_unicode):
                 return self.space.newbytes(s)
 
         parser_list_w = None
+        chunks = None     # the TemplateChunks found, when parsing for the cache
 
         def __init__(self, space, template):
             self.space = space
@@ -76,7 +119,34 @@ def make_template_formatting_class(for_unicode):
                 self.args, self.kwargs = args.unpack()
             self.auto_numbering = 0
             self.auto_numbering_state = ANS_INIT
-            return self._build_string(0, len(self.template), 2)
+            if jit.isconstant(self.template):
+                # the JIT unrolls the parsing of constant format strings
+                return self._build_string(0, len(self.template), 2)
+            return self._build_cached()
+
+        def _build_cached(self):
+            cache = self.space.fromcache(TemplateCache)
+            chunks = cache.lookup(self.template)
+            if chunks is None:
+                # parse the format string, and remember the chunks only if
+                # it works
+                self.chunks = []
+                result = self._build_string(0, len(self.template), 2)
+                cache.store(self.template, self.chunks[:])
+                self.chunks = None
+                return result
+            s = self.template
+            out = rstring.StringBuilder()
+            for chunk in chunks:
+                out.append_slice(s, chunk.literal_start, chunk.literal_end)
+                field_start = chunk.field_start
+                if field_start != -1:
+                    field_end = chunk.field_end
+                    assert field_start >= 0
+                    assert field_end >= 0
+                    out.append(self._render_field(field_start, field_end,
+                                                  chunk.recursive, 1))
+            return out.build()
 
         def _build_string(self, start, end, level):
             space = self.space
@@ -111,7 +181,11 @@ def make_template_formatting_class(for_unicode):
                             markup_follows = False
                     # Attach literal data, ending with { or }
                     out.append_slice(s, last_literal, i - 1)
+                    literal_end = i - 1
                     if not markup_follows:
+                        if self.chunks is not None and level == 1:
+                            self.chunks.append(
+                                TemplateChunk(last_literal, literal_end))
                         if self.parser_list_w is not None:
                             end_literal = i - 1
                             assert end_literal > last_literal
@@ -138,12 +212,18 @@ def make_template_formatting_class(for_unicode):
                         i += 1
                     if nested:
                         raise oefmt(space.w_ValueError, "Unmatched '{'")
+                    if self.chunks is not None and level == 1:
+                        self.chunks.append(TemplateChunk(
+                            last_literal, literal_end, field_start, i,
+                            recursive))
                     rendered = self._render_field(field_start, i, recursive, level)
                     out.append(rendered)
                     i += 1
                     last_literal = i
 
             out.append_slice(s, last_literal, end)
+            if self.chunks is not None and level == 1:
+                self.chunks.append(TemplateChunk(last_literal, end))
             return out.build()
 
         # This is only ever called if we're already unrolling _do_build_string
@@ -335,6 +335,12 @@ class StdObjSpace(ObjSpace):
                 self, module=module, instance=instance,
                 strdict=strdict, kwargs=kwargs)
 
+    def newkwargsdict(self, keywords, keywords_w):
+        from pypy.objspace.std.kwargsdict import KwargsViewDictStrategy
+        strategy = self.fromcache(KwargsViewDictStrategy)
+        storage = strategy.erase((keywords, keywords_w))
+        return W_DictObject(self, strategy, storage)
+
     def newset(self, iterable_w=None):
         if iterable_w is None:
             return W_SetObject(self, None)
@@ -562,8 +568,9 @@ class StdObjSpace(ObjSpace):
     def listview_float(self, w_obj):
         if type(w_obj) is W_ListObject:
             return w_obj.getitems_float()
-        # dict and set don't have FloatStrategy, so we can just ignore them
-        # for now
+        # dict doesn't have a FloatStrategy, so we can just ignore it for now
+        if type(w_obj) is W_SetObject or type(w_obj) is W_FrozensetObject:
+            return w_obj.listview_float()
         if isinstance(w_obj, W_ListObject) and self._uses_list_iter(w_obj):
             return w_obj.getitems_float()
         return None
@@ -1,9 +1,12 @@
+import math
+
 from pypy.interpreter import gateway
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.signature import Signature
 from pypy.interpreter.typedef import TypeDef
 from pypy.objspace.std.bytesobject import W_BytesObject
+from pypy.objspace.std.floatobject import W_FloatObject
 from pypy.objspace.std.intobject import W_IntObject
 from pypy.objspace.std.unicodeobject import W_UnicodeObject
 from pypy.objspace.std.util import IDTAG_SPECIAL, IDTAG_SHIFT
@@ -11,12 +14,18 @@ from pypy.objspace.std.util import IDTAG_SPECIAL, IDTAG_SHIFT
 from rpython.rlib.objectmodel import r_dict
 from rpython.rlib.objectmodel import iterkeys_with_hash, contains_with_hash
 from rpython.rlib.objectmodel import setitem_with_hash, delitem_with_hash
-from rpython.rlib.rarithmetic import intmask, r_uint
+from rpython.rlib.rarithmetic import intmask, r_uint, LONG_BIT
 from rpython.rlib import rerased, jit, rutf8
 
 
 UNROLL_CUTOFF = 5
 
+# sets of at least that many ints, built from a list, are stored as a bitmap
+# if their values are dense enough
+BITMAP_MIN_ITEMS = 32
+# a bitmap of that many words is never considered too sparse
+BITMAP_MIN_WORDS = 4
+
 
 class W_BaseSetObject(W_Root):
     typedef = None
@@ -94,6 +103,10 @@ class W_BaseSetObject(W_Root):
         """ If this is an int set return its contents as a list of uwnrapped ints. Otherwise return None. """
         return self.strategy.listview_int(self)
 
+    def listview_float(self):
+        """ If this is a float set return its contents as a list of unwrapped floats. Otherwise return None. """
+        return self.strategy.listview_float(self)
+
     def get_storage_copy(self):
         """ Returns a copy of the storage. Needed when we want to clone all elements from one set and
         put them into another. """
@@ -105,39 +118,48 @@ class W_BaseSetObject(W_Root):
 
     def difference(self, w_other):
         """ Returns a set with all items that are in this set, but not in w_other. W_other must be a set."""
-        return self.strategy.difference(self, w_other)
+        w_set, w_other = _unify_int_strategies(self, w_other)
+        return w_set.strategy.difference(w_set, w_other)
 
     def difference_update(self, w_other):
         """ As difference but overwrites the sets content with the result. W_other must be a set."""
-        self.strategy.difference_update(self, w_other)
+        w_set, w_other = _unify_int_strategies(self, w_other, inplace=True)
+        w_set.strategy.difference_update(w_set, w_other)
 
     def symmetric_difference(self, w_other):
         """ Returns a set with all items that are either in this set or in w_other, but not in both. W_other must be a set. """
-        return self.strategy.symmetric_difference(self, w_other)
+        w_set, w_other = _unify_int_strategies(self, w_other)
+        return w_set.strategy.symmetric_difference(w_set, w_other)
 
     def symmetric_difference_update(self, w_other):
         """ As symmetric_difference but overwrites the content of the set with the result. W_other must be a set."""
-        self.strategy.symmetric_difference_update(self, w_other)
+        w_set, w_other = _unify_int_strategies(self, w_other, inplace=True)
+        w_set.strategy.symmetric_difference_update(w_set, w_other)
 
     def intersect(self, w_other):
         """ Returns a set with all items that exists in both sets, this set and in w_other. W_other must be a set. """
-        return self.strategy.intersect(self, w_other)
+        w_set, w_other = _unify_int_strategies(self, w_other)
+        return w_set.strategy.intersect(w_set, w_other)
 
     def intersect_update(self, w_other):
         """ Keeps only those elements found in both sets, removing all other elements. W_other must be a set."""
-        self.strategy.intersect_update(self, w_other)
+        w_set, w_other = _unify_int_strategies(self, w_other, inplace=True)
+        w_set.strategy.intersect_update(w_set, w_other)
 
     def issubset(self, w_other):
         """ Checks wether this set is a subset of w_other. W_other must be a set. """
-        return self.strategy.issubset(self, w_other)
+        w_set, w_other = _unify_int_strategies(self, w_other)
+        return w_set.strategy.issubset(w_set, w_other)
 
     def isdisjoint(self, w_other):
         """ Checks wether this set and the w_other are completly different, i.e. have no equal elements. W_other must be a set."""
-        return self.strategy.isdisjoint(self, w_other)
+        w_set, w_other = _unify_int_strategies(self, w_other)
+        return w_set.strategy.isdisjoint(w_set, w_other)
 
     def update(self, w_other):
         """ Appends all elements from the given set to this set. W_other must be a set."""
-        self.strategy.update(self, w_other)
+        w_set, w_other = _unify_int_strategies(self, w_other, inplace=True)
+        w_set.strategy.update(w_set, w_other)
 
     def has_key(self, w_key):
         """ Checks wether this set contains the given wrapped key."""
@@ -145,7 +167,8 @@ class W_BaseSetObject(W_Root):
 
     def equals(self, w_other):
         """ Checks wether this set and the given set are equal, i.e. contain the same elements. W_other must be a set."""
-        return self.strategy.equals(self, w_other)
+        w_set, w_other = _unify_int_strategies(self, w_other)
+        return w_set.strategy.equals(w_set, w_other)
 
     def iter(self):
         """ Returns an iterator of the elements from this set. """
@@ -730,6 +753,9 @@ class SetStrategy(object):
     def listview_int(self, w_set):
         return None
 
+    def listview_float(self, w_set):
+        return None
+
     #def erase(self, storage):
     #    raise NotImplementedError
 
@@ -827,6 +853,8 @@ class EmptySetStrategy(SetStrategy):
     def add(self, w_set, w_key):
         if type(w_key) is W_IntObject:
             strategy = self.space.fromcache(IntegerSetStrategy)
+        elif type(w_key) is W_FloatObject and not math.isnan(w_key.floatval):
+            strategy = self.space.fromcache(FloatSetStrategy)
         elif type(w_key) is W_BytesObject:
             strategy = self.space.fromcache(BytesSetStrategy)
         elif type(w_key) is W_UnicodeObject and w_key.is_ascii():
@@ -1278,6 +1306,10 @@ class BytesSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     def may_contain_equal_elements(self, strategy):
         if strategy is self.space.fromcache(IntegerSetStrategy):
             return False
+        elif strategy is self.space.fromcache(IntegerBitmapSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(FloatSetStrategy):
+            return False
         elif strategy is self.space.fromcache(EmptySetStrategy):
             return False
         elif strategy is self.space.fromcache(IdentitySetStrategy):
@@ -1317,6 +1349,10 @@ class AsciiSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     def may_contain_equal_elements(self, strategy):
         if strategy is self.space.fromcache(IntegerSetStrategy):
             return False
+        elif strategy is self.space.fromcache(IntegerBitmapSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(FloatSetStrategy):
+            return False
         elif strategy is self.space.fromcache(EmptySetStrategy):
             return False
         elif strategy is self.space.fromcache(IdentitySetStrategy):
@@ -1374,6 +1410,426 @@ class IntegerSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
         return IntegerIteratorImplementation(self.space, self, w_set)
 
 
+class FloatSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
+    erase, unerase = rerased.new_erasing_pair("float")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    intersect_jmp = jit.JitDriver(greens = [], reds = 'auto',
+                                  name='set(float).intersect')
+
+    def get_empty_storage(self):
+        return self.erase({})
+
+    def get_empty_dict(self):
+        return {}
+
+    def listview_float(self, w_set):
+        return self.unerase(w_set.sstorage).keys()
+
+    def is_correct_type(self, w_key):
+        # NaNs are only equal to themselves by identity, which we cannot
+        # preserve once they are unboxed
+        return type(w_key) is W_FloatObject and not math.isnan(w_key.floatval)
+
+    def may_contain_equal_elements(self, strategy):
+        if strategy is self.space.fromcache(BytesSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(AsciiSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(EmptySetStrategy):
+            return False
+        elif strategy is self.space.fromcache(IdentitySetStrategy):
+            return False
+        return True
+
+    def unwrap(self, w_item):
+        return self.space.float_w(w_item)
+
+    def wrap(self, item):
+        return self.space.newfloat(item)
+
+    def iter(self, w_set):
+        return FloatIteratorImplementation(self.space, self, w_set)
+
+
+if LONG_BIT == 64:
+    WORD_SHIFT = 6
+else:
+    WORD_SHIFT = 5
+WORD_MASK = LONG_BIT - 1
+
+
+class IntBitmap(object):
+    """Storage of IntegerBitmapSetStrategy: bit 'i' of 'words[k]' is set
+    if the integer '(base + k) * LONG_BIT + i' is in the set.  All the
+    computations are done on word numbers, which cannot overflow."""
+
+    def __init__(self, base, words, count):
+        self.base = base
+        self.words = words
+        self.count = count
+
+    def copy(self):
+        return IntBitmap(self.base, self.words[:], self.count)
+
+    def contains(self, value):
+        k = (value >> WORD_SHIFT) - self.base
+        if 0 <= k < len(self.words):
+            bit = r_uint(1) << (value & WORD_MASK)
+            return (self.words[k] & bit) != 0
+        return False
+
+    def word(self, wordnum):
+        # the word number 'wordnum', or 0 if it is out of the bitmap
+        k = wordnum - self.base
+        if 0 <= k < len(self.words):
+            return self.words[k]
+        return r_uint(0)
+
+    def end(self):
+        return self.base + len(self.words)
+
+    def tolist(self):
+        result = [0] * self.count
+        i = 0
+        for k in range(len(self.words)):
+            bits = self.words[k]
+            value = (self.base + k) * LONG_BIT
+            while bits != 0:
+                if bits & 1:
+                    result[i] = value
+                    i += 1
+                bits >>= 1
+                value += 1
+        assert i == self.count
+        return result
+
+
+def _bitmap_fits(nwords, count):
+    # not too sparse: on average at least one item per word, which is
+    # already much smaller than the entries of a dict
+    return nwords <= BITMAP_MIN_WORDS or nwords <= count
+
+def _popcount(bits):
+    count = 0
+    while bits != 0:
+        bits &= bits - 1
+        count += 1
+    return count
+
+def _bitmap_from_list(items):
+    """Returns an IntBitmap with the given ints, or None if there are too
+    few of them or if they are too sparse."""
+    if len(items) < BITMAP_MIN_ITEMS:
+        return None
+    lo = hi = items[0] >> WORD_SHIFT
+    for value in items:
+        wordnum = value >> WORD_SHIFT
+        if wordnum < lo:
+            lo = wordnum
+        elif wordnum > hi:
+            hi = wordnum
+    if not _bitmap_fits(hi - lo + 1, len(items)):
+        return None
+    words = [r_uint(0)] * (hi - lo + 1)
+    count = 0
+    for value in items:
+        k = (value >> WORD_SHIFT) - lo
+        bit = r_uint(1) << (value & WORD_MASK)
+        if not words[k] & bit:
+            words[k] |= bit
+            count += 1
+    if not _bitmap_fits(len(words), count):
+        return None     # there were many duplicates
+    return IntBitmap(lo, words, count)
+
+
+class IntegerBitmapSetStrategy(SetStrategy):
+    """Sets of ints whose values are dense, stored as a bitmap.  The set
+    algebra between two such sets works a word at a time.  As soon as the
+    values become too sparse, the set switches to IntegerSetStrategy."""
+
+    erase, unerase = rerased.new_erasing_pair("intbitmap")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def get_empty_storage(self):
+        return self.erase(IntBitmap(0, [], 0))
+
+    def get_storage_from_bitmap(self, bitmap):
+        return self.erase(bitmap)
+
+    def is_correct_type(self, w_key):
+        return type(w_key) is W_IntObject
+
+    def may_contain_equal_elements(self, strategy):
+        return strategy is not self.space.fromcache(EmptySetStrategy)
+
+    def listview_int(self, w_set):
+        return self.unerase(w_set.sstorage).tolist()
+
+    def switch_to_integer_strategy(self, w_set):
+        strategy = self.space.fromcache(IntegerSetStrategy)
+        items = self.unerase(w_set.sstorage).tolist()
+        w_set.strategy = strategy
+        w_set.sstorage = strategy.get_storage_from_unwrapped_list(items)
+
+    def integer_strategy_copy(self, w_set):
+        strategy = self.space.fromcache(IntegerSetStrategy)
+        items = self.unerase(w_set.sstorage).tolist()
+        return w_set.from_storage_and_strategy(
+            strategy.get_storage_from_unwrapped_list(items), strategy)
+
+    def _item_removed(self, w_set, bitmap):
+        bitmap.count -= 1
+        if bitmap.count == 0:
+            w_set.switch_to_empty_strategy()
+        elif not _bitmap_fits(len(bitmap.words), bitmap.count):
+            self.switch_to_integer_strategy(w_set)
+
+    def _set_result(self, w_set, base, words, count):
+        # store the result of a set operation into w_set, trimming the
+        # bitmap, or using another strategy if it is empty or too sparse
+        space = self.space
+        if count == 0:
+            w_set.switch_to_empty_strategy()
+            return
+        start = 0
+        while words[start] == 0:
+            start += 1
+        stop = len(words)
+        while words[stop - 1] == 0:
+            stop -= 1
+        if start > 0 or stop < len(words):
+            assert stop >= 0
+            words = words[start:stop]
+            base += start
+        bitmap = IntBitmap(base, words, count)
+        if _bitmap_fits(len(words), count):
+            w_set.strategy = self
+            w_set.sstorage = self.erase(bitmap)
+        else:
+            strategy = space.fromcache(IntegerSetStrategy)
+            w_set.strategy = strategy
+            w_set.sstorage = strategy.get_storage_from_unwrapped_list(
+                bitmap.tolist())
+
+    def _new_result(self, w_set, base, words, count):
+        strategy = self.space.fromcache(EmptySetStrategy)
+        w_result = w_set.from_storage_and_strategy(
+            strategy.get_empty_storage(), strategy)
+        self._set_result(w_result, base, words, count)
+        return w_result
+
+    def length(self, w_set):
+        return self.unerase(w_set.sstorage).count
+
+    def clear(self, w_set):
+        w_set.switch_to_empty_strategy()
+
+    def copy_real(self, w_set):
+        return w_set.from_storage_and_strategy(self.get_storage_copy(w_set),
+                                               self)
+
+    def get_storage_copy(self, w_set):
+        return self.erase(self.unerase(w_set.sstorage).copy())
+
+    def getdict_w(self, w_set):
+        result = newset(self.space)
+        for value in self.unerase(w_set.sstorage).tolist():
+            result[self.space.newint(value)] = None
+        return result
+
+    def getkeys(self, w_set):
+        space = self.space
+        return [space.newint(value)
+                for value in self.unerase(w_set.sstorage).tolist()]
+
+    def add(self, w_set, w_key):
+        if not self.is_correct_type(w_key):
+            w_set.switch_to_object_strategy(self.space)
+            w_set.add(w_key)
+            return
+        value = self.space.int_w(w_key)
+        bitmap = self.unerase(w_set.sstorage)
+        wordnum = value >> WORD_SHIFT
+        if bitmap.count == 0:
+            bitmap.base = wordnum
+            bitmap.words = [r_uint(0)]
+        elif not (bitmap.base <= wordnum < bitmap.end()):
+            lo = min(bitmap.base, wordnum)
+            hi = max(bitmap.end(), wordnum + 1)
+            if not _bitmap_fits(hi - lo, bitmap.count + 1):
+                self.switch_to_integer_strategy(w_set)
+                w_set.add(w_key)
+                return
+            words = [r_uint(0)] * (hi - lo)
+            for k in range(len(bitmap.words)):
+                words[bitmap.base - lo + k] = bitmap.words[k]
+            bitmap.base = lo
+            bitmap.words = words
+        k = wordnum - bitmap.base
+        bit = r_uint(1) << (value & WORD_MASK)
+        if not bitmap.words[k] & bit:
+            bitmap.words[k] |= bit
+            bitmap.count += 1
+
+    def remove(self, w_set, w_item):
+        if not self.is_correct_type(w_item):
+            w_set.switch_to_object_strategy(self.space)
+            return w_set.remove(w_item)
+        value = self.space.int_w(w_item)
+        bitmap = self.unerase(w_set.sstorage)
+        if not bitmap.contains(value):
+            return False
+        k = (value >> WORD_SHIFT) - bitmap.base
+        bitmap.words[k] &= ~(r_uint(1) << (value & WORD_MASK))
+        self._item_removed(w_set, bitmap)
+        return True
+
+    def has_key(self, w_set, w_key):
+        if not self.is_correct_type(w_key):
+            w_set.switch_to_object_strategy(self.space)
+            return w_set.has_key(w_key)
+        value = self.space.int_w(w_key)
+        return self.unerase(w_set.sstorage).contains(value)
+
+    def popitem(self, w_set):
+        bitmap = self.unerase(w_set.sstorage)
+        k = len(bitmap.words) - 1
+        while k >= 0 and bitmap.words[k] == 0:
+            k -= 1
+        if k < 0:
+            raise oefmt(self.space.w_KeyError, "pop from an empty set")
+        bits = bitmap.words[k]
+        i = LONG_BIT - 1
+        while not (bits >> i) & 1:
+            i -= 1
+        bitmap.words[k] = bits & ~(r_uint(1) << i)
+        self._item_removed(w_set, bitmap)
+        return self.space.newint((bitmap.base + k) * LONG_BIT + i)
+
+    def iter(self, w_set):
+        return IntegerBitmapIteratorImplementation(self.space, self, w_set)
+
+    # the binary operations below are only called with another bitmap set
+    # or with an empty set, see _unify_int_strategies()
+
+    def _other_bitmap(self, w_other):
+        if w_other.strategy is self:
+            return self.unerase(w_other.sstorage)
+        assert w_other.strategy is self.space.fromcache(EmptySetStrategy)
+        return IntBitmap(0, [], 0)
+
+    def _union_range(self, b1, b2):
+        if not b2.words:
+            return b1.base, b1.end()
+        if not b1.words:
+            return b2.base, b2.end()
+        return min(b1.base, b2.base), max(b1.end(), b2.end())
+
+    def _union(self, b1, b2):
+        lo, hi = self._union_range(b1, b2)
+        words = [r_uint(0)] * (hi - lo)
+        count = 0
+        for k in range(hi - lo):
+            bits = b1.word(lo + k) | b2.word(lo + k)
+            words[k] = bits
+            count += _popcount(bits)
+        return lo, words, count
+
+    def _intersection(self, b1, b2):
+        lo = max(b1.base, b2.base)
+        hi = min(b1.end(), b2.end())
+        if lo >= hi:
+            return lo, [], 0
+        words = [r_uint(0)] * (hi - lo)
+        count = 0
+        for k in range(hi - lo):
+            bits = b1.word(lo + k) & b2.word(lo + k)
+            words[k] = bits
+            count += _popcount(bits)
+        return lo, words, count
+
+    def _difference(self, b1, b2):
+        words = [r_uint(0)] * len(b1.words)
+        count = 0
+        for k in range(len(b1.words)):
+            bits = b1.words[k] & ~b2.word(b1.base + k)
+            words[k] = bits
+            count += _popcount(bits)
+        return b1.base, words, count
+
+    def _symmetric_difference(self, b1, b2):
+        lo, hi = self._union_range(b1, b2)
+        words = [r_uint(0)] * (hi - lo)
+        count = 0
+        for k in range(hi - lo):
+            bits = b1.word(lo + k) ^ b2.word(lo + k)
+            words[k] = bits
+            count += _popcount(bits)
+        return lo, words, count
+
+    def difference(self, w_set, w_other):
+        base, words, count = self._difference(
+            self.unerase(w_set.sstorage), self._other_bitmap(w_other))
+        return self._new_result(w_set, base, words, count)
+
+    def difference_update(self, w_set, w_other):
+        base, words, count = self._difference(
+            self.unerase(w_set.sstorage), self._other_bitmap(w_other))
+        self._set_result(w_set, base, words, count)
+
+    def symmetric_difference(self, w_set, w_other):
+        base, words, count = self._symmetric_difference(
+            self.unerase(w_set.sstorage), self._other_bitmap(w_other))
+        return self._new_result(w_set, base, words, count)
+
+    def symmetric_difference_update(self, w_set, w_other):
+        base, words, count = self._symmetric_difference(
+            self.unerase(w_set.sstorage), self._other_bitmap(w_other))
+        self._set_result(w_set, base, words, count)
+
+    def intersect(self, w_set, w_other):
+        base, words, count = self._intersection(
+            self.unerase(w_set.sstorage), self._other_bitmap(w_other))
+        return self._new_result(w_set, base, words, count)
+
+    def intersect_update(self, w_set, w_other):
+        base, words, count = self._intersection(
+            self.unerase(w_set.sstorage), self._other_bitmap(w_other))
+        self._set_result(w_set, base, words, count)
+
+    def update(self, w_set, w_other):
+        base, words, count = self._union(
+            self.unerase(w_set.sstorage), self._other_bitmap(w_other))
+        self._set_result(w_set, base, words, count)
+
+    def issubset(self, w_set, w_other):
+        b1 = self.unerase(w_set.sstorage)
+        b2 = self._other_bitmap(w_other)
+        if b1.count > b2.count:
+            return False
+        for k in range(len(b1.words)):
+            if b1.words[k] & ~b2.word(b1.base + k):
+                return False
+        return True
+
+    def isdisjoint(self, w_set, w_other):
+        b1 = self.unerase(w_set.sstorage)
+        b2 = self._other_bitmap(w_other)
+        for k in range(len(b1.words)):
+            if b1.words[k] & b2.word(b1.base + k):
+                return False
+        return True
+
+    def equals(self, w_set, w_other):
+        if w_set.length() != w_other.length():
+            return False
+        return self.issubset(w_set, w_other)
+
+
 class ObjectSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     erase, unerase = rerased.new_erasing_pair("object")
     erase = staticmethod(erase)
@@ -1445,6 +1901,10 @@ class IdentitySetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
             return False
         if strategy is self.space.fromcache(IntegerSetStrategy):
             return False
+        if strategy is self.space.fromcache(IntegerBitmapSetStrategy):
+            return False
+        if strategy is self.space.fromcache(FloatSetStrategy):
+            return False
         if strategy is self.space.fromcache(BytesSetStrategy):
             return False
         if strategy is self.space.fromcache(AsciiSetStrategy):
@@ -1550,6 +2010,45 @@ class IntegerIteratorImplementation(IteratorImplementation):
         else:
             return None
 
+class FloatIteratorImplementation(IteratorImplementation):
+    def __init__(self, space, strategy, w_set):
+        IteratorImplementation.__init__(self, space, strategy, w_set)
+        d = strategy.unerase(w_set.sstorage)
+        self.iterator = d.iterkeys()
+
+    def next_entry(self):
+        for key in self.iterator:
+            return self.space.newfloat(key)
+        else:
+            return None
+
+class IntegerBitmapIteratorImplementation(IteratorImplementation):
+    def __init__(self, space, strategy, w_set):
+        IteratorImplementation.__init__(self, space, strategy, w_set)
+        self.bitmap = strategy.unerase(w_set.sstorage)
+        self.wordindex = -1
+        self.bitindex = 0
+        self.bits = r_uint(0)
+
+    def next_entry(self):
+        bitmap = self.bitmap
+        bits = self.bits
+        bitindex = self.bitindex
+        while bits == 0:
+            self.wordindex += 1
+            if self.wordindex >= len(bitmap.words):
+                self.bits = r_uint(0)
+                return None
+            bits = bitmap.words[self.wordindex]
+            bitindex = 0
+        while not bits & 1:
+            bits >>= 1
+            bitindex += 1
+        self.bits = bits >> 1
+        self.bitindex = bitindex + 1
+        value = (bitmap.base + self.wordindex) * LONG_BIT + bitindex
+        return self.space.newint(value)
+
 class IdentityIteratorImplementation(IteratorImplementation):
     def __init__(self, space, strategy, w_set):
         IteratorImplementation.__init__(self, space, strategy, w_set)
@@ -1609,6 +2108,27 @@ setiter_typedef = W_SetIterObject.typedef
 def newset(space):
     return r_dict(space.eq_w, space.hash_w, force_non_null=True)
 
+def _unify_int_strategies(w_set, w_other, inplace=False):
+    # the operations of IntegerBitmapSetStrategy only work between two
+    # bitmaps, or a bitmap and an empty set: when combined with any other
+    # strategy, a bitmap operand is replaced with a temporary copy using
+    # a regular IntegerSetStrategy.  Only the set that is updated anyway
+    # (with inplace=True) is switched itself.
+    if w_set.strategy is not w_other.strategy:
+        space = w_set.space
+        emptystrategy = space.fromcache(EmptySetStrategy)
+        if w_set.strategy is emptystrategy or w_other.strategy is emptystrategy:
+            return w_set, w_other
+        bitmapstrategy = space.fromcache(IntegerBitmapSetStrategy)
+        if w_set.strategy is bitmapstrategy:
+            if inplace:
+                bitmapstrategy.switch_to_integer_strategy(w_set)
+            else:
+                w_set = bitmapstrategy.integer_strategy_copy(w_set)
+        if w_other.strategy is bitmapstrategy:
+            w_other = bitmapstrategy.integer_strategy_copy(w_other)
+    return w_set, w_other
+
 def set_strategy_and_setdata(space, w_set, w_iterable):
     if w_iterable is None :
         w_set.strategy = strategy = space.fromcache(EmptySetStrategy)
@@ -1636,11 +2156,24 @@ def set_strategy_and_setdata(space, w_set, w_iterable):
 
     intlist = space.listview_int(w_iterable)
     if intlist is not None:
+        bitmap = _bitmap_from_list(intlist)
+        if bitmap is not None:
+            strategy = space.fromcache(IntegerBitmapSetStrategy)
+            w_set.strategy = strategy
+            w_set.sstorage = strategy.get_storage_from_bitmap(bitmap)
+            return
         strategy = space.fromcache(IntegerSetStrategy)
         w_set.strategy = strategy
         w_set.sstorage = strategy.get_storage_from_unwrapped_list(intlist)
         return
 
+    floatlist = space.listview_float(w_iterable)
+    if floatlist is not None and not _contains_nan(floatlist):
+        strategy = space.fromcache(FloatSetStrategy)
+        w_set.strategy = strategy
+        w_set.sstorage = strategy.get_storage_from_unwrapped_list(floatlist)
+        return
+
     length_hint = space.length_hint(w_iterable, 0)
 
     if jit.isconstant(length_hint) and length_hint:
@@ -1651,6 +2184,14 @@ def set_strategy_and_setdata(space, w_set, w_iterable):
     _update_from_iterable(space, w_set, w_iterable)
 
 
+@jit.look_inside_iff(lambda items:
+        jit.loop_unrolling_heuristic(items, len(items), UNROLL_CUTOFF))
+def _contains_nan(items):
+    for item in items:
+        if math.isnan(item):
+            return True
+    return False
+
 @jit.unroll_safe
 def _pick_correct_strategy_unroll(space, w_set, w_iterable):
 
@@ -1664,6 +2205,16 @@ def _pick_correct_strategy_unroll(space, w_set, w_iterable):
         w_set.sstorage = w_set.strategy.get_storage_from_list(iterable_w)
         return
 
+    # check for floats
+    floatstrategy = space.fromcache(FloatSetStrategy)
+    for w_item in iterable_w:
+        if not floatstrategy.is_correct_type(w_item):
+            break
+    else:
+        w_set.strategy = floatstrategy
+        w_set.sstorage = floatstrategy.get_storage_from_list(iterable_w)
+        return
+
     # check for strings
     for w_item in iterable_w:
         if type(w_item) is not W_BytesObject:
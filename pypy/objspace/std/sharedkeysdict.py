@@ -0,0 +1,261 @@
+"""dict implementation for small dicts with string keys that share their keys.
+
+Programs often build huge numbers of small dicts that all have the same keys
+in the same order (rows coming out of database drivers, dict(zip(cols, row)),
+records loaded from CSV files...).  Like the maps of mapdict.py, a KeyMap
+describes the keys of such a dict once; the dicts then only store a list of
+values.  Dicts that are built by inserting the same keys in the same order end
+up sharing the same KeyMap.  Anything that does not fit this scheme (non-string
+keys, too many keys, deleting a key that is not the last one) makes the dict
+devolve to a BytesDictStrategy or ObjectDictStrategy.
+"""
+
+from rpython.rlib import jit, rerased
+
+from pypy.objspace.std.dictmultiobject import (
+    BytesDictStrategy, DictStrategy, ObjectDictStrategy,
+    _never_equal_to_string, create_iterator_classes, W_DictObject)
+from pypy.objspace.std.kwargsdict import ZipItemsWithHash
+
+
+# dicts with more keys than this are stored in a BytesDictStrategy
+MAX_KEYS = 32
+# limit the number of different keys that can follow a given KeyMap
+MAX_TRANSITIONS = 32
+# limit the total number of KeyMaps, so that dicts with random keys cannot
+# make the cache grow forever
+MAX_MAPS = 10000
+
+
+class SharedKeysCache(object):
+    def __init__(self, space):
+        self.space = space
+        self.num_maps = 0
+        self.root = KeyMap(self, [], None)
+
+
+class KeyMap(object):
+    _immutable_fields_ = ['cache', 'keys', 'index', 'parent', 'strategy']
+
+    def __init__(self, cache, keys, parent):
+        self.cache = cache
+        self.keys = keys
+        self.index = {}
+        for i in range(len(keys)):
+            self.index[keys[i]] = i
+        self.parent = parent
+        self.transitions = None
+        self.strategy = SharedKeysDictStrategy(cache.space, self)
+        cache.num_maps += 1
+
+    def length(self):
+        return len(self.keys)
+
+    @jit.elidable
+    def get_index(self, key):
+        return self.index.get(key, -1)
+
+    @jit.elidable
+    def get_child(self, key):
+        # returns the KeyMap with 'key' appended, creating it if necessary,
+        # or None if one of the limits is reached.  The limits only ever get
+        # hit harder, so the result is stable for a given (self, key).
+        transitions = self.transitions
+        if transitions is None:
+            transitions = self.transitions = {}
+        child = transitions.get(key, None)
+        if child is None:
+            if (len(self.keys) >= MAX_KEYS or
+                    len(transitions) >= MAX_TRANSITIONS or
+                    self.cache.num_maps >= MAX_MAPS):
+                return None
+            child = KeyMap(self.cache, self.keys + [key], self)
+            transitions[key] = child
+        return child
+
+    def __repr__(self):
+        return "<KeyMap %r>" % (self.keys,)
+
+
+def get_empty_strategy(space):
+    return space.fromcache(SharedKeysCache).root.strategy
+
+
+class SharedKeysDictStrategy(DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("sharedkeysdict")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    _immutable_fields_ = ['keymap']
+
+    def __init__(self, space, keymap):
+        DictStrategy.__init__(self, space)
+        self.keymap = keymap
+
+    def wrap(self, key):
+        return self.space.newbytes(key)
+
+    def unwrap(self, wrapped):
+        return self.space.bytes_w(wrapped)
+
+    def get_empty_storage(self):
+        assert self.keymap.length() == 0
+        return self.erase([])
+
+    def is_correct_type(self, w_obj):
+        space = self.space
+        return space.is_w(space.type(w_obj), space.w_bytes)
+
+    def _never_equal_to(self, w_lookup_type):
+        return _never_equal_to_string(self.space, w_lookup_type)
+
+    def length(self, w_dict):
+        return self.keymap.length()
+
+    def getitem_str(self, w_dict, key):
+        values_w = self.unerase(w_dict.dstorage)
+        if jit.isconstant(key):
+            jit.promote(self)
+        index = self.keymap.get_index(key)
+        if index == -1:
+            return None
+        return values_w[index]
+
+    def getitem(self, w_dict, w_key):
+        space = self.space
+        # -- This is called extremely often.  Hack for performance --
+        if type(w_key) is space.StringObjectCls:
+            return self.getitem_str(w_dict, w_key.unwrap(space))
+        # -- End of performance hack --
+        if self.is_correct_type(w_key):
+            return self.getitem_str(w_dict, self.unwrap(w_key))
+        elif self._never_equal_to(space.type(w_key)):
+            return None
+        else:
+            self.switch_to_object_strategy(w_dict)
+            return w_dict.getitem(w_key)
+
+    def setitem(self, w_dict, w_key, w_value):
+        if self.is_correct_type(w_key):
+            self.setitem_str(w_dict, self.unwrap(w_key), w_value)
+        else:
+            self.switch_to_object_strategy(w_dict)
+            w_dict.setitem(w_key, w_value)
+
+    def setitem_str(self, w_dict, key, w_value):
+        assert key is not None
+        values_w = self.unerase(w_dict.dstorage)
+        if jit.isconstant(key):
+            jit.promote(self)
+        index = self.keymap.get_index(key)
+        if index != -1:
+            values_w[index] = w_value
+            return
+        child = self.keymap.get_child(key)
+        if child is None:
+            self.switch_to_bytes_strategy(w_dict)
+            w_dict.setitem_str(key, w_value)
+            return
+        values_w.append(w_value)
+        w_dict.set_strategy(child.strategy)
+
+    def setdefault(self, w_dict, w_key, w_default):
+        if self.is_correct_type(w_key):
+            key = self.unwrap(w_key)
+            w_result = self.getitem_str(w_dict, key)
+            if w_result is not None:
+                return w_result
+            self.setitem_str(w_dict, key, w_default)
+            return w_default
+        else:
+            self.switch_to_object_strategy(w_dict)
+            return w_dict.setdefault(w_key, w_default)
+
+    def delitem(self, w_dict, w_key):
+        if self.is_correct_type(w_key):
+            key = self.unwrap(w_key)
+            index = self.keymap.get_index(key)
+            if index == -1:
+                raise KeyError
+            if index == self.keymap.length() - 1:
+                # removing the last key: go back to the parent map
+                self.unerase(w_dict.dstorage).pop()
+                w_dict.set_strategy(self.keymap.parent.strategy)
+                return
+            self.switch_to_bytes_strategy(w_dict)
+        elif self._never_equal_to(self.space.type(w_key)):
+            raise KeyError
+        else:
+            self.switch_to_object_strategy(w_dict)
+        w_dict.delitem(w_key)
+
+    def popitem(self, w_dict):
+        keymap = self.keymap
+        if keymap.length() == 0:
+            raise KeyError
+        w_value = self.unerase(w_dict.dstorage).pop()
+        w_dict.set_strategy(keymap.parent.strategy)
+        return self.wrap(keymap.keys[keymap.length() - 1]), w_value
+
+    def clear(self, w_dict):
+        strategy = self.keymap.cache.root.strategy
+        w_dict.set_strategy(strategy)
+        w_dict.dstorage = strategy.get_empty_storage()
+
+    def w_keys(self, w_dict):
+        return self.space.newlist_bytes(self.keymap.keys[:])
+
+    def values(self, w_dict):
+        return self.unerase(w_dict.dstorage)[:] # to make non-resizable
+
+    def items(self, w_dict):
+        space = self.space
+        keys = self.keymap.keys
+        values_w = self.unerase(w_dict.dstorage)
+        return [space.newtuple2(self.wrap(keys[i]), values_w[i])
+                for i in range(len(keys))]
+
+    def listview_bytes(self, w_dict):
+        return self.keymap.keys[:]
+
+    def view_as_kwargs(self, w_dict):
+        return self.keymap.keys[:], self.unerase(w_dict.dstorage)[:]
+
+    def copy(self, w_dict):
+        values_w = self.unerase(w_dict.dstorage)
+        return W_DictObject(self.space, self, self.erase(values_w[:]))
+
+    def switch_to_object_strategy(self, w_dict):
+        strategy = self.space.fromcache(ObjectDictStrategy)
+        keys = self.keymap.keys
+        values_w = self.unerase(w_dict.dstorage)
+        d_new = strategy.unerase(strategy.get_empty_storage())
+        for i in range(len(keys)):
+            d_new[self.wrap(keys[i])] = values_w[i]
+        w_dict.set_strategy(strategy)
+        w_dict.dstorage = strategy.erase(d_new)
+
+    def switch_to_bytes_strategy(self, w_dict):
+        strategy = self.space.fromcache(BytesDictStrategy)
+        keys = self.keymap.keys
+        values_w = self.unerase(w_dict.dstorage)
+        storage = strategy.get_empty_storage()
+        d_new = strategy.unerase(storage)
+        for i in range(len(keys)):
+            d_new[keys[i]] = values_w[i]
+        w_dict.set_strategy(strategy)
+        w_dict.dstorage = storage
+
+    def getiterkeys(self, w_dict):
+        return iter(self.keymap.keys)
+
+    def getitervalues(self, w_dict):
+        return iter(self.unerase(w_dict.dstorage))
+
+    def getiteritems_with_hash(self, w_dict):
+        return ZipItemsWithHash(self.keymap.keys, self.unerase(w_dict.dstorage))
+
+    def wrapkey(space, key):
+        return space.newbytes(key)
+
+create_iterator_classes(SharedKeysDictStrategy)
@@ -1,7 +1,9 @@
 from pypy.interpreter.error import oefmt
-from pypy.objspace.std.tupleobject import W_AbstractTupleObject
+from pypy.objspace.std.tupleobject import (
+    W_AbstractTupleObject, _unroll_condition_cmp)
 from pypy.objspace.std.util import negate
 from rpython.rlib import jit
+from rpython.rlib.debug import make_sure_not_resized
 from rpython.rlib.objectmodel import specialize
 from rpython.rlib.rarithmetic import intmask
 from rpython.rlib.unroll import unrolling_iterable
@@ -144,20 +146,169 @@ def make_specialised_class(typetuple):
     _specialisations.append(cls)
     return cls
 
+
+def make_unboxed_array_class(typ):
+    """Tuples of any length (>= 3) whose items are all exactly ints or all
+    exactly floats.  The items are stored unboxed in a fixed-size list, and
+    hashing and comparison between two such tuples work on the unboxed
+    values directly.
+    """
+    if typ == int:
+        def wrap(space, x):
+            return space.newint(x)
+        def unwrap_if_exact(space, w_obj):
+            from pypy.objspace.std.intobject import W_IntObject
+            if type(w_obj) is W_IntObject:
+                return True, space.int_w(w_obj)
+            return False, 0
+        def hash_value(space, x):
+            from pypy.objspace.std.intobject import _hash_int
+            return _hash_int(x)
+        def same_value(x, y):
+            return x == y
+    elif typ == float:
+        def wrap(space, x):
+            return space.newfloat(x)
+        def unwrap_if_exact(space, w_obj):
+            from pypy.objspace.std.floatobject import W_FloatObject
+            if type(w_obj) is W_FloatObject:
+                return True, space.float_w(w_obj)
+            return False, 0.0
+        def hash_value(space, x):
+            from pypy.objspace.std.floatobject import _hash_float
+            return _hash_float(space, x)
+        def same_value(x, y):
+            # NaNs with the same bit pattern are equal here, like in the
+            # specialised 2-tuples
+            return x == y or float2longlong(x) == float2longlong(y)
+    else:
+        assert 0
+
+    class cls(W_AbstractTupleObject):
+        _immutable_fields_ = ['items[*]']
+
+        def __init__(self, space, items):
+            make_sure_not_resized(items)
+            self.space = space
+            self.items = items
+
+        def length(self):
+            return len(self.items)
+
+        @jit.look_inside_iff(lambda self: self._unroll_condition())
+        def tolist(self):
+            items = self.items
+            list_w = [None] * len(items)
+            for i in range(len(items)):
+                list_w[i] = wrap(self.space, items[i])
+            return list_w
+
+        def getitems_copy(self):
+            return self.tolist()[:]  # returns a resizable list
+
+        @jit.look_inside_iff(lambda self, space: self._unroll_condition())
+        def descr_hash(self, space):
+            mult = 1000003
+            x = 0x345678
+            z = len(self.items)
+            for value in self.items:
+                y = hash_value(space, value)
+                x = (x ^ y) * mult
+                z -= 1
+                mult += 82520 + z + z
+            x += 97531
+            return space.newint(intmask(x))
+
+        def descr_eq(self, space, w_other):
+            if not isinstance(w_other, W_AbstractTupleObject):
+                return space.w_NotImplemented
+            if not isinstance(w_other, cls):
+                return self._descr_eq_generic(space, w_other)
+            return space.newbool(self._eq_unboxed(space, w_other))
+
+        @jit.look_inside_iff(_unroll_condition_cmp)
+        def _eq_unboxed(self, space, w_other):
+            items1 = self.items
+            items2 = w_other.items
+            if len(items1) != len(items2):
+                return False
+            for i in range(len(items1)):
+                if not same_value(items1[i], items2[i]):
+                    return False
+            return True
+
+        @jit.look_inside_iff(_unroll_condition_cmp)
+        def _descr_eq_generic(self, space, w_other):
+            items = self.items
+            if len(items) != w_other.length():
+                return space.w_False
+            for i in range(len(items)):
+                if not space.eq_w(wrap(space, items[i]),
+                                  w_other.getitem(space, i)):
+                    return space.w_False
+            return space.w_True
+
+        descr_ne = negate(descr_eq)
+
+        def getitem(self, space, index):
+            try:
+                return wrap(space, self.items[index])
+            except IndexError:
+                raise oefmt(space.w_IndexError, "tuple index out of range")
+
+        def _unroll_condition(self):
+            return jit.loop_unrolling_heuristic(
+                    self.items, len(self.items), UNROLL_CUTOFF)
+
+    cls.__name__ = 'W_SpecialisedTupleObject_%sarray' % (typ.__name__,)
+    cls.unwrap_if_exact = staticmethod(unwrap_if_exact)
+    _specialisations.append(cls)
+    return cls
+
 # ---------- current specialized versions ----------
 
 _specialisations = []
 Cls_ii = make_specialised_class((int, int))
 Cls_oo = make_specialised_class((object, object))
 Cls_ff = make_specialised_class((float, float))
+Cls_intarray = make_unboxed_array_class(int)
+Cls_floatarray = make_unboxed_array_class(float)
 
 def makespecialisedtuple(space, list_w):
     if len(list_w) == 2:
         w_arg1, w_arg2 = list_w
         return makespecialisedtuple2(space, w_arg1, w_arg2)
+    elif len(list_w) >= 3:
+        return _make_unboxed_array_tuple(space, list_w)
     else:
         raise NotSpecialised
 
+@specialize.arg(1)
+def _unbox_all(space, Cls, list_w, first):
+    items = [first] * len(list_w)
+    for i in range(1, len(list_w)):
+        exact, value = Cls.unwrap_if_exact(space, list_w[i])
+        if not exact:
+            return None
+        items[i] = value
+    return items
+
+@jit.look_inside_iff(lambda space, list_w: jit.loop_unrolling_heuristic(
+        list_w, len(list_w), UNROLL_CUTOFF))
+def _make_unboxed_array_tuple(space, list_w):
+    exact, intvalue = Cls_intarray.unwrap_if_exact(space, list_w[0])
+    if exact:
+        intitems = _unbox_all(space, Cls_intarray, list_w, intvalue)
+        if intitems is not None:
+            return Cls_intarray(space, intitems)
+        raise NotSpecialised
+    exact, floatvalue = Cls_floatarray.unwrap_if_exact(space, list_w[0])
+    if exact:
+        floatitems = _unbox_all(space, Cls_floatarray, list_w, floatvalue)
+        if floatitems is not None:
+            return Cls_floatarray(space, floatitems)
+    raise NotSpecialised
+
 def makespecialisedtuple2(space, w_arg1, w_arg2):
     from pypy.objspace.std.intobject import W_IntObject
     from pypy.objspace.std.floatobject import W_FloatObject
@@ -0,0 +1,112 @@
+"""str objects made by concatenation, whose characters are only joined when
+they are needed.
+
+``s += t`` copies the characters of s, so building a string piece by piece
+in a loop takes quadratic time.  With the withstrbuf option, adding a str to
+a str of at least STRBUF_MIN_LENGTH characters gives a W_StringBufferObject,
+which keeps the characters in a StringBuilder.  Adding to such an object
+appends to the same builder, unless something was already appended to it by
+another addition; so each step of the loop only copies the new piece.  The
+first operation that is not an addition joins the characters ("forces" the
+object).
+"""
+
+from rpython.rlib.buffer import StringBuffer
+from rpython.rlib.rstring import StringBuilder
+
+from pypy.interpreter.buffer import SimpleView
+from pypy.interpreter.error import oefmt
+from pypy.objspace.std.bytesobject import (
+    W_AbstractBytesObject, W_BytesObject, delegate_to_forced)
+
+
+# adding to a shorter str just makes a new W_BytesObject
+STRBUF_MIN_LENGTH = 1024
+
+
+def concat(s, other):
+    if len(s) < STRBUF_MIN_LENGTH:
+        return W_BytesObject(s + other)
+    builder = StringBuilder(len(s) + len(other))
+    builder.append(s)
+    builder.append(other)
+    return W_StringBufferObject(builder)
+
+
+class W_StringBufferObject(W_AbstractBytesObject):
+    w_str = None
+
+    def __init__(self, builder):
+        self.builder = builder      # StringBuilder, or None once forced
+        self.length = builder.getlength()
+
+    def __repr__(self):
+        """representation for debugging purposes"""
+        if self.w_str is not None:
+            return "%s(forced to %r)" % (self.__class__.__name__, self.w_str)
+        return "%s(<%d characters>)" % (self.__class__.__name__, self.length)
+
+    def force(self):
+        """Return a W_BytesObject with the same characters."""
+        w_str = self.w_str
+        if w_str is None:
+            s = self.builder.build()
+            length = self.length
+            if length < len(s):
+                # the builder was appended to by another addition
+                assert length >= 0
+                s = s[:length]
+                self.builder = None
+            w_str = W_BytesObject(s)
+            self.w_str = w_str
+        return w_str
+
+    def unwrap(self, space):
+        return self.force()._value
+
+    def str_w(self, space):
+        return self.force()._value
+
+    def utf8_w(self, space):
+        return self.force()._value
+
+    charbuf_w = str_w
+
+    def buffer_w(self, space, flags):
+        space.check_buf_flags(flags, True)
+        return SimpleView(StringBuffer(self.force()._value))
+
+    def readbuf_w(self, space):
+        return StringBuffer(self.force()._value)
+
+    def writebuf_w(self, space):
+        raise oefmt(space.w_TypeError,
+                    "Cannot use string as modifiable buffer")
+
+    def listview_bytes(self):
+        return self.force().listview_bytes()
+
+    def ord(self, space):
+        return self.force().ord(space)
+
+    def descr_str(self, space):
+        return self
+
+    def descr_len(self, space):
+        return space.newint(self.length)
+
+    def descr_add(self, space, w_other):
+        if not isinstance(w_other, W_AbstractBytesObject):
+            return self.force().descr_add(space, w_other)
+        other = space.bytes_w(w_other)
+        builder = self.builder
+        if builder is None or builder.getlength() != self.length:
+            s = self.force()._value
+            builder = StringBuilder(len(s) + len(other))
+            builder.append(s)
+        builder.append(other)
+        return W_StringBufferObject(builder)
+
+
+delegate_to_forced(W_StringBufferObject)
+W_StringBufferObject.typedef = W_BytesObject.typedef
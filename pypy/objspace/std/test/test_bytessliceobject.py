@@ -0,0 +1,113 @@
+import py
+
+from pypy.objspace.std.bytesobject import W_BytesObject
+from pypy.objspace.std.bytessliceobject import (
+    SLICE_MAX_WASTE, SLICE_MIN_LENGTH, W_BytesSliceObject, newslice)
+
+
+def test_newslice():
+    s = "x" * (SLICE_MIN_LENGTH * 2)
+    w_slice = newslice(s, 1, SLICE_MIN_LENGTH + 1)
+    assert isinstance(w_slice, W_BytesSliceObject)
+    assert w_slice.source is s
+    assert isinstance(newslice(s, 1, SLICE_MIN_LENGTH), W_BytesObject)
+    big = "y" * (SLICE_MIN_LENGTH * SLICE_MAX_WASTE + 1)
+    assert isinstance(newslice(big, 0, SLICE_MIN_LENGTH), W_BytesObject)
+
+def test_force():
+    s = "abcd" * SLICE_MIN_LENGTH
+    w_slice = W_BytesSliceObject(s, 4, 4 + SLICE_MIN_LENGTH)
+    w_forced = w_slice.force()
+    assert w_forced._value == s[4:4 + SLICE_MIN_LENGTH]
+    assert w_slice.source is None
+    assert w_slice.force() is w_forced
+    assert w_slice._source() == (w_forced._value, 0)
+
+
+class AppTestBytesSlice(object):
+    spaceconfig = {"objspace.std.withbytesslice": True}
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("__repr__ doesn't work on appdirect")
+
+    def w_is_slice(self, s):
+        import __pypy__
+        return __pypy__.internal_repr(s).startswith("W_BytesSliceObject(<")
+
+    def test_slice(self):
+        s = "".join([chr(i % 256) for i in range(10000)])
+        t = s[100:9000]
+        assert self.is_slice(t)
+        assert type(t) is str
+        assert len(t) == 8900
+        assert t[0] == chr(100)
+        assert t[-1] == s[8999]
+        raises(IndexError, "t[8900]")
+        assert t[1:3] == s[101:103]
+        assert not self.is_slice(t[1:3])
+        u = t[10:]
+        assert self.is_slice(u)
+        assert u == s[110:9000]
+        assert t[::2] == s[100:9000:2]
+        assert str(t) is t
+        assert not self.is_slice(s[:10])
+
+    def test_memory_bound(self):
+        s = "x" * 100000
+        assert not self.is_slice(s[:20000])
+        assert self.is_slice(s[:30000])
+
+    def test_find(self):
+        s = "abc" * 5000 + "needle" + "def" * 5000
+        t = s[3:]
+        assert self.is_slice(t)
+        assert t.find("needle") == 14997
+        assert t.rfind("abc") == 14994
+        assert t.index("def") == 15003
+        assert t.rindex("abc", 0, 20) == 15
+        assert t.find("needle", 15000) == -1
+        assert t.find("def", 0, 15005) == -1
+        assert t.find("", len(t) + 1) == -1
+        assert "needle" in t
+        assert "abcabd" not in t
+        raises(ValueError, t.index, "xyz")
+        assert t.startswith("abc")
+        assert t.startswith("needle", 14997)
+        assert not t.startswith("abc", len(t) + 1)
+        assert t.endswith("def")
+        assert not t.endswith("de")
+        assert t.endswith("needle", 0, 15003)
+        assert self.is_slice(t)
+        # these make a copy
+        assert t.count("needle") == 1
+        assert t.find(u"needle") == 14997
+        assert t.startswith(("x", "a"))
+        assert not self.is_slice(t)
+
+    def test_other_operations(self):
+        s = "spam" * 10000
+        t = s[4:]
+        u = s[4:]
+        assert t == u
+        assert t == s[4:]
+        assert s[4:] == t
+        assert t != s
+        assert t < s
+        assert s > t
+        assert hash(t) == hash(s[:-4])
+        assert t.upper() == "SPAM" * 9999
+        assert t + "!" == s[4:] + "!"
+        assert t.split("m")[:2] == ["spa", "spa"]
+        assert {t: 1}[s[4:]] == 1
+        assert not self.is_slice(t)
+
+    def test_buffer(self):
+        s = "0123456789" * 1000
+        t = s[10:]
+        assert buffer(t)[:5] == "01234"
+        assert len(buffer(t)) == 9990
+        assert memoryview(t)[-1] == "9"
+        assert self.is_slice(t)
+        import marshal
+        assert marshal.loads(marshal.dumps(t)) == t
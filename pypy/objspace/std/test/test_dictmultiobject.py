@@ -1194,6 +1194,39 @@ class AppTestStrategies(object):
         assert "IntDictStrategy" in self.get_strategy(d)
         assert d[1L] == "hi"
 
+    def test_int_equal_keys(self):
+        d = {0: "a", 1: "b", 2: "c"}
+        assert d[1.0] == "b"
+        assert d[True] == "b"
+        assert d.get(2L) == "c"
+        assert 1.5 not in d
+        assert float("nan") not in d
+        assert 1e100 not in d
+        assert 2L ** 100 not in d
+        assert d.pop(0.0) == "a"
+        assert d.pop(0.5, "x") == "x"
+        raises(KeyError, d.pop, 0.5)
+        raises(KeyError, "del d[2.5]")
+        del d[2.0]
+        d[True] = "B"
+        assert d.setdefault(1.0, "x") == "B"
+        assert "IntDictStrategy" in self.get_strategy(d)
+        assert d.keys() == [1]
+        assert type(d.keys()[0]) is int
+        d[2.0] = "c"
+        assert "IntDictStrategy" not in self.get_strategy(d)
+        assert d == {1: "B", 2: "c"}
+        assert set([type(k) for k in d]) == set([int, float])
+
+    def test_fromkeys_ints(self):
+        d = dict.fromkeys(range(5))
+        assert "IntDictStrategy" in self.get_strategy(d)
+        assert d == {0: None, 1: None, 2: None, 3: None, 4: None}
+        d = dict.fromkeys([3, 1, 3, 2], "x")
+        assert sorted(d.keys()) == [1, 2, 3]
+        assert len(d) == 3
+        assert d[1] == "x"
+
     def test_iter_dict_length_change(self):
         d = {1: 2, 3: 4, 5: 6}
         it = d.iteritems()
@@ -1340,6 +1373,7 @@ class Config:
         class std:
             methodcachesizeexp = 11
             withmethodcachecounter = False
+            withsharedkeysdict = False
         honor__builtins__ = False
 
 FakeSpace.config = Config()
@@ -99,6 +99,29 @@ def test_view_as_kwargs():
     d = W_DictObject(space, strategy, storage)
     assert space.view_as_kwargs(d) == ([], [])
 
+def test_kwargs_view():
+    strategy = KwargsViewDictStrategy(space)
+    keys = ["a", "b"]
+    values = [1, 2]
+    d = W_DictObject(space, strategy, strategy.erase((keys, values)))
+    assert d.getitem_str("a") == 1
+    assert d.getitem_str("c") is None
+    assert d.length() == 2
+    k, v = space.view_as_kwargs(d)
+    assert k is keys and v is values
+    d2 = d.copy()
+    assert d2.get_strategy() is strategy
+    assert d.setdefault("a", 5) == 1
+    assert d.get_strategy() is strategy
+    d.setitem_str("a", 3)
+    assert isinstance(d.get_strategy(), KwargsDictStrategy)
+    assert d.getitem_str("a") == 3
+    assert values == [1, 2]
+    assert d2.getitem_str("a") == 1
+    d2.setitem_str("c", 3)
+    assert isinstance(d2.get_strategy(), KwargsDictStrategy)
+    assert keys == ["a", "b"]
+
 def test_from_empty_to_kwargs():
     strategy = EmptyKwargsDictStrategy(space)
     storage = strategy.get_empty_storage()
@@ -143,10 +166,31 @@ class AppTestKwargsDictStrategy(object):
         def f(**args):
             return args
         d = f(a=1)
+        assert "KwargsViewDictStrategy" in self.get_strategy(d)
+        d["b"] = 2
         assert "KwargsDictStrategy" in self.get_strategy(d)
         d = f()
         assert "EmptyKwargsDictStrategy" in self.get_strategy(d)
 
+    def test_forward(self):
+        def g(a=None, **kwargs):
+            return kwargs
+        def f(*args, **kwargs):
+            return g(*args, **kwargs)
+        def decorated(**kwargs):
+            return f(**kwargs)
+        d = decorated(x=1, y=2)
+        assert "KwargsViewDictStrategy" in self.get_strategy(d)
+        assert d == {"x": 1, "y": 2}
+        d = decorated(a=0, x=1, y=2)
+        assert "KwargsDictStrategy" in self.get_strategy(d)
+        assert d == {"x": 1, "y": 2}
+        kw = f(x=1)
+        d = f(**kw)
+        d["x"] = 5
+        assert kw == {"x": 1}
+        assert d == {"x": 5}
+
     def test_iterator(self):
         def f(**args):
             return args
@@ -1942,6 +1942,56 @@ class AppTestRangeListForcing:
         assert r == [1, 2, 3, 4, 5, 6, 7]
 
 
+class AppTestChunkedList:
+    spaceconfig = {"objspace.std.withchunkedlist": True}
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("__pypy__.strategy() cannot be used to see the "
+                         "strategy on top of pypy-c")
+
+    def test_queue(self):
+        from __pypy__ import strategy
+        l = [(i,) for i in range(10000)]
+        assert strategy(l) == "ObjectListStrategy"
+        l.insert(0, "a")
+        assert strategy(l) == "ChunkedListStrategy"
+        l.insert(5000, "b")
+        assert len(l) == 10002
+        assert l[0] == "a"
+        assert l[5000] == "b"
+        assert l[-1] == (9999,)
+        assert l.pop(0) == "a"
+        del l[4999]
+        assert l.index((4999,)) == 4999
+        assert "b" not in l
+        l.append("c")
+        assert l[-1] == "c"
+        assert l.pop() == "c"
+        assert strategy(l) == "ChunkedListStrategy"
+        assert l == [(i,) for i in range(10000)]
+        assert l[100:110:3] == [(100,), (103,), (106,), (109,)]
+        while len(l) > 100:
+            l.pop(0)
+        assert strategy(l) == "ObjectListStrategy"
+        assert l == [(i,) for i in range(9900, 10000)]
+
+    def test_back_to_objects(self):
+        from __pypy__ import strategy
+        l = [(i,) for i in range(10000)]
+        l.pop(1)
+        assert strategy(l) == "ChunkedListStrategy"
+        l.sort(reverse=True)
+        assert strategy(l) == "ObjectListStrategy"
+        assert l[0] == (9999,)
+        assert l[-1] == (0,)
+        l.pop(1)
+        assert strategy(l) == "ChunkedListStrategy"
+        l[5:10] = [1, 2]
+        assert strategy(l) == "ObjectListStrategy"
+        assert l[5:8] == [1, 2, (9988,)]
+
+
 class AppTestWithoutStrategies:
     spaceconfig = {"objspace.std.withliststrategies": False}
 
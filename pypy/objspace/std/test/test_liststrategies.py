@@ -4,7 +4,7 @@ from pypy.objspace.std.listobject import (
     W_ListObject, EmptyListStrategy, ObjectListStrategy, IntegerListStrategy,
     FloatListStrategy, BytesListStrategy, RangeListStrategy,
     SimpleRangeListStrategy, make_range_list, AsciiListStrategy,
-    IntOrFloatListStrategy)
+    IntOrFloatListStrategy, ChunkedListStrategy, ChunkedStorage)
 from pypy.objspace.std import listobject
 from pypy.objspace.std.test.test_listobject import TestW_ListObject
 
@@ -687,6 +687,81 @@ class TestW_ListStrategies(TestW_ListObject):
         w_res = w_l.descr_pop(space)
         assert space.unwrap(w_res) == 3
 
+    def test_chunked_storage(self, monkeypatch):
+        import random
+        monkeypatch.setattr(listobject, "CHUNK_SIZE", 8)
+        rnd = random.Random(42)
+        expected = range(50)
+        storage = ChunkedStorage.from_list(expected[:])
+        for i in range(2000):
+            assert storage.length == len(expected)
+            op = rnd.randrange(5)
+            if op == 0:
+                index = rnd.randrange(len(expected) + 1)
+                storage.insert(index, i)
+                expected.insert(index, i)
+            elif op == 1 and expected:
+                index = rnd.randrange(len(expected))
+                assert storage.pop(index) == expected.pop(index)
+            elif op == 2:
+                storage.append(i)
+                expected.append(i)
+            elif op == 3 and expected:
+                assert storage.pop_end() == expected.pop()
+            elif expected:
+                index = rnd.randrange(len(expected))
+                assert storage.getitem(index) == expected[index]
+                storage.setitem(index, -i)
+                expected[index] = -i
+            for chunk in storage.chunks:
+                assert 0 < len(chunk) <= 8
+            fresh = ChunkedStorage(storage.chunks)
+            assert storage.tree == fresh.tree
+        assert [x for chunk in storage.chunks for x in chunk] == expected
+
+    def test_chunked_list(self, monkeypatch):
+        monkeypatch.setattr(listobject, "CHUNKED_LIST_THRESHOLD", 100)
+        space = self.space
+        w = space.wrap
+        strategy = space.fromcache(ChunkedListStrategy)
+        w_l = W_ListObject(space, [w(i) for i in range(1000)] + [w('x')])
+        assert isinstance(w_l.strategy, ObjectListStrategy)
+        strategy.switch_from_object(w_l)
+        assert w_l.strategy is strategy
+        w_l.insert(0, w(-1))
+        w_l.insert(500, w(-2))
+        assert w_l.length() == 1003
+        assert space.unwrap(w_l.getitem(0)) == -1
+        assert space.unwrap(w_l.getitem(500)) == -2
+        assert space.unwrap(w_l.getitem(-1)) == 'x'
+        py.test.raises(IndexError, w_l.getitem, 1003)
+        assert space.unwrap(w_l.pop(0)) == -1
+        w_l.deleteslice(499, 1, 2)
+        assert space.unwrap(w_l.getitem(499)) == 500
+        w_l2 = w_l.clone()
+        assert w_l2.strategy is strategy
+        w_l2.setitem(0, w('y'))
+        assert space.unwrap(w_l.getitem(0)) == 0
+        assert space.unwrap(w_l.getslice(10, 20, 3, 4)) == [10, 13, 16, 19]
+        w_l.extend(w_l)
+        assert w_l.length() == 2000
+        assert w_l.strategy is strategy
+        # operations on the whole list go back to the flat representation
+        w_l.reverse()
+        assert isinstance(w_l.strategy, ObjectListStrategy)
+        assert space.unwrap(w_l.getitem(0)) == 'x'
+        assert space.unwrap(w_l.getitem(-1)) == 0
+
+    def test_chunked_list_not_enabled(self, monkeypatch):
+        space = self.space
+        assert not space.config.objspace.std.withchunkedlist
+        monkeypatch.setattr(listobject, "CHUNKED_LIST_THRESHOLD", 10)
+        w_l = W_ListObject(space, [space.wrap(i) for i in range(20)] +
+                                  [space.wrap('x')])
+        w_l.insert(0, space.wrap(-1))
+        w_l.pop(0)
+        assert isinstance(w_l.strategy, ObjectListStrategy)
+
     def test_create_list_from_set(self):
         from pypy.objspace.std.setobject import W_SetObject
         from pypy.objspace.std.setobject import _initialize_set
@@ -1667,7 +1667,10 @@ class AppTestWithMapDictAndCounters(object):
 
 
 class AppTestGlobalCaching(AppTestWithMapDict):
-    spaceconfig = {"objspace.std.withmethodcachecounter": True}
+    # the per-opcode caches must be monomorphic, otherwise they would hide
+    # most of the lookups in the global caches
+    spaceconfig = {"objspace.std.withmethodcachecounter": True,
+                   "objspace.std.inlinecachesize": 1}
 
     def test_mix_classes(self):
         import __pypy__
@@ -1723,6 +1726,76 @@ class AppTestGlobalCaching(AppTestWithMapDict):
         else:
             assert 0, "failed: got %r" % ([got[1] for got in seen],)
 
+class AppTestPolymorphicCaching(object):
+    spaceconfig = {"objspace.std.withmethodcachecounter": True}
+
+    def test_polymorphic_attribute(self):
+        import __pypy__
+        class A(object):
+            def __init__(self):
+                self.x = 42
+        class B(object):
+            def __init__(self):
+                self.x = 43
+        class C(object):
+            def __init__(self):
+                self.y = 0
+                self.x = 44
+        def f(l):
+            res = 0
+            for a in l:
+                res += a.x
+            return res
+        l = [A(), B(), C()] * 10
+        __pypy__.reset_method_cache_counter()
+        assert f(l) == 43 * 30
+        hits, polymorphic_hits, misses, evictions = (
+            __pypy__.inline_cache_counter())
+        assert misses == 3
+        assert hits + polymorphic_hits == 27
+        assert evictions == 0
+        l = [A(), A(), B(), B()] * 10
+        __pypy__.reset_method_cache_counter()
+        assert f(l) == 85 * 20
+        assert __pypy__.inline_cache_counter() == (20, 20, 0, 0)
+
+    def test_polymorphic_method(self):
+        import __pypy__
+        classes = []
+        for i in range(6):
+            class A(object):
+                def f(self, i=i):
+                    return i
+            classes.append(A)
+        # 'exec' to make sure that a.f() is compiled with CALL_METHOD
+        d = {}
+        exec """if 1:
+            def f(l):
+                res = 0
+                for a in l:
+                    res += a.f()
+                return res
+        """ in d
+        f = d['f']
+        l = [cls() for cls in classes[:4]] * 10
+        __pypy__.reset_method_cache_counter()
+        assert f(l) == 6 * 10
+        hits, polymorphic_hits, misses, evictions = (
+            __pypy__.inline_cache_counter())
+        assert misses == 4
+        assert hits + polymorphic_hits == 36
+        assert evictions == 0
+        # megamorphic: more classes than entries in the cache.  Only the
+        # first four lookups find the entries of the previous loop
+        l = [cls() for cls in classes] * 10
+        __pypy__.reset_method_cache_counter()
+        assert f(l) == 15 * 10
+        hits, polymorphic_hits, misses, evictions = (
+            __pypy__.inline_cache_counter())
+        assert hits + polymorphic_hits == 4
+        assert misses == evictions == 56
+
+
 class TestDictSubclassShortcutBug(object):
     spaceconfig = {"objspace.std.withmethodcachecounter": True}
 
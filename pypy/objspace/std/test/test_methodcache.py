@@ -3,7 +3,10 @@ from pypy.objspace.std.test import test_typeobject
 
 
 class AppTestMethodCaching(test_typeobject.AppTestTypeObject):
-    spaceconfig = {"objspace.std.withmethodcachecounter": True}
+    # the per-opcode caches must be monomorphic, otherwise they would hide
+    # most of the lookups in the method cache
+    spaceconfig = {"objspace.std.withmethodcachecounter": True,
+                   "objspace.std.inlinecachesize": 1}
 
     def setup_class(cls):
         # This is for the following tests, which are a bit fragile and
@@ -91,6 +91,18 @@ class BaseStringFormatTests:
         raises(ValueError, self.s("{{}:s}").format)
         raises(ValueError, self.s("{:{:{}}}").format, 1, 2, 3)
 
+    def test_same_format_string(self):
+        # the second time, the format string is not parsed again
+        fmt = self.s("{{{0}}} and {1:{2}}, {x}!")
+        for i in range(3):
+            res = fmt.format(i, "ab", ">4", x=self.s("y"))
+            assert res == self.s("{%d} and   ab, y!" % i)
+        raises(IndexError, fmt.format, 1)
+        raises(KeyError, fmt.format, 1, 2, "")
+        fmt = self.s("{0} {")
+        for i in range(2):
+            raises(ValueError, fmt.format, 1)
+
     def test_presentation(self):
         assert format(self.s("blah"), "s") == self.s("blah")
         assert format(self.s("blah")) == self.s("blah")
@@ -518,3 +530,27 @@ class AppTestInternalMethods:
 
     def test_format_unicode_nonutf8_bytestring(self):
         raises(UnicodeDecodeError, u'{0}'.format, '\xff')
+
+
+class TestTemplateCache:
+    def test_lookup_store(self):
+        from pypy.objspace.std.newformat import (
+            TEMPLATE_CACHE_SIZE, TemplateCache, TemplateChunk)
+        from rpython.rlib.objectmodel import compute_hash
+        cache = TemplateCache(None)
+        chunks = [TemplateChunk(0, 3)]
+        assert cache.lookup("abc") is None
+        cache.store("abc", chunks)
+        assert cache.lookup("abc") is chunks
+        # find a string that uses the same slot
+        i = 0
+        while True:
+            other = "x%d" % i
+            if ((compute_hash(other) - compute_hash("abc")) %
+                    TEMPLATE_CACHE_SIZE == 0):
+                break
+            i += 1
+        assert cache.lookup(other) is None
+        cache.store(other, [])
+        assert cache.lookup(other) == []
+        assert cache.lookup("abc") is None
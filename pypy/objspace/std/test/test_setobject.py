@@ -81,6 +81,7 @@ class TestW_SetObject:
     def test_create_set_from_list(self):
         from pypy.interpreter.baseobjspace import W_Root
         from pypy.objspace.std.setobject import BytesSetStrategy, ObjectSetStrategy
+        from pypy.objspace.std.setobject import FloatSetStrategy
         from pypy.objspace.std.floatobject import W_FloatObject
 
         w = self.space.wrap
@@ -116,6 +117,12 @@ class TestW_SetObject:
         w_list = W_ListObject(self.space, [w(1.0), w(2.0), w(3.0)])
         w_set = W_SetObject(self.space)
         _initialize_set(self.space, w_set, w_list)
+        assert w_set.strategy is self.space.fromcache(FloatSetStrategy)
+        assert w_set.strategy.unerase(w_set.sstorage) == {1.0:None, 2.0:None, 3.0:None}
+
+        w_list = W_ListObject(self.space, [w(1.0), w(float('nan')), w(3.0)])
+        w_set = W_SetObject(self.space)
+        _initialize_set(self.space, w_set, w_list)
         assert w_set.strategy is self.space.fromcache(ObjectSetStrategy)
         for item in w_set.strategy.unerase(w_set.sstorage):
             assert isinstance(item, W_FloatObject)
@@ -1076,6 +1083,62 @@ class AppTestAppSetTest:
            yield 1
         raises(ValueError, set, f())
 
+    def test_float_strategy(self):
+        from __pypy__ import strategy
+        s = set([1.5, 2.5, -0.0])
+        assert strategy(s) == "FloatSetStrategy"
+        assert 0.0 in s and 1.5 in s and 3.5 not in s
+        s.add(3.5)
+        assert strategy(s) == "FloatSetStrategy"
+        assert sorted(s) == [-0.0, 1.5, 2.5, 3.5]
+        assert s == set([1.5, 2.5, 0, 3.5])
+        assert s & set([1.5, 3]) == set([1.5])
+        assert 0 in s
+        nan = float('nan')
+        s.add(nan)
+        assert nan in s
+        assert strategy(s) == "ObjectSetStrategy"
+        assert strategy(set([1.5, nan])) == "ObjectSetStrategy"
+        assert hash(frozenset([1.0, 2.0])) == hash(frozenset([1, 2]))
+
+    def test_bitmap_strategy(self):
+        from __pypy__ import strategy
+        s = set(range(-5, 100))
+        assert strategy(s) == "IntegerBitmapSetStrategy"
+        assert list(s) == range(-5, 100)
+        assert 50 in s and 100 not in s
+        t = frozenset(range(50, 150, 2))
+        assert strategy(t) == "IntegerBitmapSetStrategy"
+        assert s | t == set(range(-5, 100)) | set(range(100, 150, 2))
+        assert s & t == set(range(50, 100, 2))
+        assert s - t == set(range(-5, 50)) | set(range(51, 100, 2))
+        assert s ^ t == (s - t) | (t - s)
+        assert type(t & s) is frozenset
+        assert not s.isdisjoint(t)
+        assert (s & t).issubset(t)
+        assert hash(t) == hash(frozenset(list(t)))
+        s |= set()
+        assert strategy(s) == "IntegerBitmapSetStrategy"
+        s.add(10 ** 10)
+        assert strategy(s) == "IntegerSetStrategy"
+        assert 10 ** 10 in s and 99 in s
+        # read-only operations with a hashed int set don't change t
+        assert s | t == t | s
+        assert not s == t and t.issubset(s | t)
+        assert strategy(t) == "IntegerBitmapSetStrategy"
+        assert 50.0 in s and "a" not in s
+        s = set(range(40))
+        s.add(2.5)
+        assert strategy(s) == "ObjectSetStrategy"
+        assert 2.5 in s and 39 in s
+
+    def test_bitmap_iter_changed_size(self):
+        s = set(range(100))
+        def f():
+            for x in s:
+                s.add(x + 100)
+        raises(RuntimeError, f)
+
     def test_frozenset_init_does_nothing(self):
         f = frozenset([1, 2, 3])
         f.__init__(4, 5, 6)
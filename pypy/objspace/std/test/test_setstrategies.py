@@ -2,7 +2,8 @@ from pypy.objspace.std.setobject import W_SetObject
 from pypy.objspace.std.setobject import (
     BytesIteratorImplementation, BytesSetStrategy, EmptySetStrategy,
     IntegerIteratorImplementation, IntegerSetStrategy, ObjectSetStrategy,
-    UnicodeIteratorImplementation, AsciiSetStrategy)
+    UnicodeIteratorImplementation, AsciiSetStrategy, FloatSetStrategy,
+    IntegerBitmapSetStrategy)
 from pypy.objspace.std.listobject import W_ListObject
 
 class TestW_SetStrategies:
@@ -144,3 +145,139 @@ class TestW_SetStrategies:
         #
         #s = W_SetObject(space, self.wrapped([u"a", u"b"]))
         #assert sorted(space.listview_unicode(s)) == [u"a", u"b"]
+
+    def test_float_strategy(self):
+        space = self.space
+        s = W_SetObject(space, self.wrapped([1.5, 2.5, 1.5]))
+        assert s.strategy is space.fromcache(FloatSetStrategy)
+        assert sorted(space.listview_float(s)) == [1.5, 2.5]
+        assert s.has_key(space.wrap(2.5))
+        assert s.strategy is space.fromcache(FloatSetStrategy)
+        s.add(space.wrap(float('nan')))
+        assert s.strategy is space.fromcache(ObjectSetStrategy)
+        #
+        s = W_SetObject(space)
+        s.add(space.wrap(0.5))
+        assert s.strategy is space.fromcache(FloatSetStrategy)
+        s.add(space.wrap(1))
+        assert s.strategy is space.fromcache(ObjectSetStrategy)
+
+    def test_bitmap_strategy(self):
+        space = self.space
+        bitmapstrategy = space.fromcache(IntegerBitmapSetStrategy)
+        s = W_SetObject(space, self.wrapped(range(-10, 100)))
+        assert s.strategy is bitmapstrategy
+        assert s.length() == 110
+        assert space.listview_int(s) == range(-10, 100)
+        assert s.has_key(space.wrap(-10))
+        assert not s.has_key(space.wrap(100))
+        s.add(space.wrap(200))
+        assert s.strategy is bitmapstrategy
+        assert s.length() == 111
+        assert s.remove(space.wrap(5))
+        assert not s.remove(space.wrap(5))
+        assert s.length() == 110
+        # becomes too sparse
+        s.add(space.wrap(10 ** 9))
+        assert s.strategy is space.fromcache(IntegerSetStrategy)
+        assert s.length() == 111
+        assert s.has_key(space.wrap(10 ** 9))
+        assert not s.has_key(space.wrap(5))
+
+    def test_bitmap_not_used(self):
+        space = self.space
+        s = W_SetObject(space, self.wrapped(range(10)))
+        assert s.strategy is space.fromcache(IntegerSetStrategy)
+        s = W_SetObject(space, self.wrapped(range(0, 100000, 1000)))
+        assert s.strategy is space.fromcache(IntegerSetStrategy)
+
+    def test_bitmap_operations(self):
+        space = self.space
+        bitmapstrategy = space.fromcache(IntegerBitmapSetStrategy)
+        l1 = range(0, 300, 2)
+        l2 = range(100, 400, 3)
+        s1 = W_SetObject(space, self.wrapped(l1))
+        s2 = W_SetObject(space, self.wrapped(l2))
+        assert s1.strategy is s2.strategy is bitmapstrategy
+        def check(w_set, expected):
+            assert sorted(space.listview_int(w_set)) == sorted(expected)
+        s3 = s1.intersect(s2)
+        assert s3.strategy is bitmapstrategy
+        check(s3, set(l1) & set(l2))
+        check(s1.difference(s2), set(l1) - set(l2))
+        check(s1.symmetric_difference(s2), set(l1) ^ set(l2))
+        assert not s1.issubset(s2)
+        assert s3.issubset(s1) and s3.issubset(s2)
+        assert not s1.isdisjoint(s2)
+        assert s1.equals(s1.copy_real())
+        assert not s1.equals(s2)
+        s4 = s1.copy_real()
+        s4.update(s2)
+        assert s4.strategy is bitmapstrategy
+        check(s4, set(l1) | set(l2))
+        # disjoint and far apart: the union is too sparse for a bitmap
+        s5 = W_SetObject(space, self.wrapped(range(10 ** 6, 10 ** 6 + 100)))
+        assert s1.isdisjoint(s5)
+        s5.update(s1)
+        assert s5.strategy is space.fromcache(IntegerSetStrategy)
+        check(s5, set(l1) | set(range(10 ** 6, 10 ** 6 + 100)))
+        # with a hashed int set, a temporary hashed copy of the bitmap is
+        # used, unless the bitmap set is the one that is updated
+        s6 = W_SetObject(space, self.wrapped([2, 4, 7]))
+        s7 = s1.intersect(s6)
+        assert s1.strategy is bitmapstrategy
+        check(s7, [2, 4])
+        assert not s1.issubset(s6) and not s1.equals(s6)
+        assert s1.strategy is bitmapstrategy
+        s6.update(s1)
+        assert s1.strategy is bitmapstrategy
+        check(s6, set(l1) | set([7]))
+        s1.difference_update(s6)
+        assert s1.strategy is space.fromcache(IntegerSetStrategy)
+        assert s1.length() == 0
+
+    def test_bitmap_remove_becomes_sparse(self):
+        space = self.space
+        s = W_SetObject(space, self.wrapped(range(1000)))
+        assert s.strategy is space.fromcache(IntegerBitmapSetStrategy)
+        for i in range(1, 999):
+            assert s.remove(space.wrap(i))
+        assert s.strategy is space.fromcache(IntegerSetStrategy)
+        assert sorted(space.listview_int(s)) == [0, 999]
+        s = W_SetObject(space, self.wrapped(range(100)))
+        for i in range(100):
+            s.popitem()
+        assert s.strategy is space.fromcache(EmptySetStrategy)
+
+    def test_bitmap_iter_and_pop(self):
+        space = self.space
+        l = [-1000] + range(-70, 70) + [-999]
+        s = W_SetObject(space, self.wrapped(l))
+        assert s.strategy is space.fromcache(IntegerBitmapSetStrategy)
+        it = s.iter()
+        result = []
+        while True:
+            w_item = it.next()
+            if w_item is None:
+                break
+            result.append(space.int_w(w_item))
+        assert result == sorted(l)
+        assert space.int_w(s.popitem()) == 69
+        assert space.int_w(s.popitem()) == 68
+        assert s.length() == len(l) - 2
+
+    def test_bitmap_with_empty_set(self):
+        space = self.space
+        bitmapstrategy = space.fromcache(IntegerBitmapSetStrategy)
+        s = W_SetObject(space, self.wrapped(range(50)))
+        empty = W_SetObject(space)
+        s.update(empty)
+        s.difference_update(empty)
+        assert s.strategy is bitmapstrategy
+        assert s.length() == 50
+        assert s.symmetric_difference(empty).length() == 50
+        assert s.intersect(empty).length() == 0
+        assert s.isdisjoint(empty)
+        assert not s.issubset(empty)
+        assert empty.issubset(s)
+        assert s.strategy is bitmapstrategy
@@ -0,0 +1,173 @@
+import py
+from pypy.objspace.std.test.test_dictmultiobject import FakeSpace, W_DictObject
+from pypy.objspace.std.dictmultiobject import (
+    BytesDictStrategy, ObjectDictStrategy)
+from pypy.objspace.std import sharedkeysdict
+from pypy.objspace.std.sharedkeysdict import (
+    SharedKeysCache, SharedKeysDictStrategy, get_empty_strategy)
+
+space = FakeSpace()
+cache = SharedKeysCache(space)
+space.fromcache = lambda cls: cls(space) if cls is not SharedKeysCache else cache
+
+def newdict():
+    strategy = get_empty_strategy(space)
+    return W_DictObject(space, strategy, strategy.get_empty_storage())
+
+def test_create():
+    d = newdict()
+    d.setitem_str("a", 1)
+    d.setitem_str("b", 2)
+    assert d.length() == 2
+    assert d.getitem_str("a") == 1
+    assert d.getitem_str("b") == 2
+    assert d.getitem_str("c") is None
+    assert d.get_strategy().keymap.keys == ["a", "b"]
+    assert space.unwrap(d.w_keys()) == ["a", "b"]
+    assert d.values() == [1, 2]
+
+def test_maps_are_shared():
+    d1 = newdict()
+    d2 = newdict()
+    for d in [d1, d2]:
+        d.setitem_str("a", 1)
+        d.setitem_str("b", 2)
+    assert d1.get_strategy() is d2.get_strategy()
+    d1.setitem_str("a", 5)
+    assert d1.get_strategy() is d2.get_strategy()
+    assert d1.getitem_str("a") == 5
+    assert d2.getitem_str("a") == 1
+    d3 = newdict()
+    d3.setitem_str("b", 2)
+    d3.setitem_str("a", 1)
+    assert d3.get_strategy() is not d1.get_strategy()
+
+def test_delitem_last():
+    d = newdict()
+    d.setitem_str("a", 1)
+    strategy = d.get_strategy()
+    d.setitem_str("b", 2)
+    d.delitem("b")
+    assert d.get_strategy() is strategy
+    assert d.length() == 1
+    py.test.raises(KeyError, d.delitem, "b")
+
+def test_delitem_devolves():
+    d = newdict()
+    d.setitem_str("a", 1)
+    d.setitem_str("b", 2)
+    d.delitem("a")
+    assert isinstance(d.get_strategy(), BytesDictStrategy)
+    assert d.length() == 1
+    assert d.getitem_str("b") == 2
+
+def test_popitem():
+    d = newdict()
+    d.setitem_str("a", 1)
+    d.setitem_str("b", 2)
+    assert d.popitem() == ("b", 2)
+    assert d.popitem() == ("a", 1)
+    py.test.raises(KeyError, d.popitem)
+    assert d.get_strategy() is get_empty_strategy(space)
+
+def test_copy():
+    d = newdict()
+    d.setitem_str("a", 1)
+    d2 = d.copy()
+    assert d2.get_strategy() is d.get_strategy()
+    d2.setitem_str("a", 2)
+    assert d.getitem_str("a") == 1
+
+def test_too_many_keys():
+    d = newdict()
+    for i in range(sharedkeysdict.MAX_KEYS):
+        d.setitem_str("k%d" % i, i)
+    assert isinstance(d.get_strategy(), SharedKeysDictStrategy)
+    d.setitem_str("last", 1)
+    assert isinstance(d.get_strategy(), BytesDictStrategy)
+    assert d.length() == sharedkeysdict.MAX_KEYS + 1
+    assert d.getitem_str("k0") == 0
+
+def test_too_many_transitions():
+    for i in range(sharedkeysdict.MAX_TRANSITIONS):
+        d = newdict()
+        d.setitem_str("x", 0)
+        d.setitem_str("t%d" % i, i)
+        assert isinstance(d.get_strategy(), SharedKeysDictStrategy)
+    d = newdict()
+    d.setitem_str("x", 0)
+    d.setitem_str("another", 1)
+    assert isinstance(d.get_strategy(), BytesDictStrategy)
+    assert d.getitem_str("x") == 0
+
+def test_non_string_key():
+    d = newdict()
+    d.setitem_str("a", 1)
+    d.setitem(1, 2)
+    assert isinstance(d.get_strategy(), ObjectDictStrategy)
+    assert d.getitem("a") == 1
+    assert d.getitem(1) == 2
+
+def test_limit_num_maps(monkeypatch):
+    monkeypatch.setattr(sharedkeysdict, "MAX_MAPS", cache.num_maps)
+    d = newdict()
+    d.setitem_str("brand new key", 1)
+    assert isinstance(d.get_strategy(), BytesDictStrategy)
+
+
+class AppTestSharedKeysDictStrategy(object):
+    spaceconfig = {"objspace.std.withsharedkeysdict": True}
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("__repr__ doesn't work on appdirect")
+
+    def w_get_strategy(self, obj):
+        import __pypy__
+        r = __pypy__.internal_repr(obj)
+        return r[r.find("(") + 1: r.find(")")]
+
+    def test_shared(self):
+        cols = ["id", "name", "value"]
+        d1 = dict(zip(cols, [1, "a", 2.5]))
+        d2 = dict(zip(cols, [2, "b", 3.5]))
+        assert "SharedKeysDictStrategy" in self.get_strategy(d1)
+        assert self.get_strategy(d1) == self.get_strategy(d2)
+        assert d1 == {"id": 1, "name": "a", "value": 2.5}
+        assert d2.keys() == cols
+        assert d2.items() == [("id", 2), ("name", "b"), ("value", 3.5)]
+        d3 = {"name": 1, "id": 2, "value": 3}
+        assert d3 == {"id": 2, "name": 1, "value": 3}
+
+    def test_devolve(self):
+        d = {"a": 1, "b": 2}
+        del d["a"]
+        assert "BytesDictStrategy" in self.get_strategy(d)
+        assert d == {"b": 2}
+        d = {"a": 1}
+        d[1] = 2
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+        assert d == {"a": 1, 1: 2}
+
+    def test_iteration(self):
+        d = {"a": 1, "b": 2}
+        assert list(d.iterkeys()) == ["a", "b"]
+        assert list(d.itervalues()) == [1, 2]
+        assert list(d.iteritems()) == [("a", 1), ("b", 2)]
+        it = d.iteritems()
+        d["c"] = 3
+        raises(RuntimeError, list, it)
+
+    def test_pop_setdefault(self):
+        d = {"a": 1, "b": 2}
+        assert d.setdefault("b", 5) == 2
+        assert d.setdefault("c", 3) == 3
+        assert "SharedKeysDictStrategy" in self.get_strategy(d)
+        assert d.pop("c") == 3
+        assert d.pop("x", 7) == 7
+        assert "SharedKeysDictStrategy" in self.get_strategy(d)
+        assert d.popitem() == ("b", 2)
+        d.clear()
+        assert d == {}
+        d["x"] = 1
+        assert d == {"x": 1}
@@ -48,7 +48,9 @@ class TestW_SpecialisedTupleObject():
         hash_test([1, (1, 2)])
         hash_test([1, ('a', 2)])
         hash_test([1, ()])
-        hash_test([1, 2, 3], must_be_specialized=False)
+        hash_test([1, 2, 3])
+        hash_test([1.5, -2.0, 3.25, 1e300])
+        hash_test([1, 2, 3.5], must_be_specialized=False)
         hash_test([1 << 62, 0])
 
     try:
@@ -100,9 +102,49 @@ class AppTestW_SpecialisedTupleObject:
         assert len(t) == 2
 
     def test_notspecialisedtuple(self):
-        assert not self.isspecialised((42, 43, 44, 45))
+        assert not self.isspecialised((42, 43, 44, 4.5))
+        assert not self.isspecialised((42, 43, 44, True))
         assert not self.isspecialised((1.5,))
 
+    def test_unboxed_arrays(self):
+        t = (42, 43, 44, 45)
+        assert self.isspecialised(t, '_intarray')
+        assert self.isspecialised(tuple([1.5, 2.5, 3.5]) + (4.5,),
+                                  '_floatarray')
+        assert t[0] == 42 and t[-1] == 45
+        raises(IndexError, "t[4]")
+        raises(IndexError, "t[-5]")
+        assert t[1:3] == (43, 44)
+        assert list(t) == [42, 43, 44, 45]
+        assert 44 in t
+        assert 44.0 in t
+        assert 46 not in t
+        assert t.index(45) == 3
+        assert t.count(43) == 1
+        assert repr((1.5, 2.5, 3.5)) == '(1.5, 2.5, 3.5)'
+
+    def test_unboxed_arrays_eq_hash(self):
+        a = (1, 2, 3, 4)
+        b = (1,) + (2, 3, 4)
+        assert a == b and not a != b
+        assert hash(a) == hash(b)
+        assert a != (1, 2, 3, 5)
+        assert a != (1, 2, 3)
+        assert a == (1.0, 2L, 3, 4.0)
+        assert hash(a) == hash((1.0, 2L, 3, 4.0)) == hash((1, 2, 3, 4L))
+        assert (1.5, 2.5, 3.0) == (1.5, 2.5, 3)
+        assert hash((1.5, 2.5, 3.0)) == hash((1.5, 2.5, 3))
+        assert a < (1, 2, 4, 0)
+        assert a > (1, 2, 3)
+        N = float('nan')
+        T = (N, N, N)
+        assert T == (N, N, N)
+        assert N in T
+        assert N in (N, 1.0, 2.0)
+        d = {(1, 2, 3): 'a', (1.5, 2.5, 3.5): 'b'}
+        assert d[(1, 2) + (3,)] == 'a'
+        assert d[(1.5,) + (2.5, 3.5)] == 'b'
+
     def test_slicing_to_specialised(self):
         t = (1, 2, 3)
         assert self.isspecialised(t[0:2])
@@ -225,10 +267,9 @@ class AppTestW_SpecialisedTupleObject:
         assert a == (2.2,) + b
         assert not a != (2.2,) + b
         #
-        if not self.isspecialised((1, 2, 3)):
-            skip("don't have specialization for 3-tuples")
         a = (1, 2.2, '333')
-        assert self.isspecialised(a)
+        if not self.isspecialised(a):
+            skip("don't have mixed specialization for 3-tuples")
         assert len(a) == 3
         assert a[0] == 1 and a[1] == 2.2 and a[2] == '333'
         b = ('333',)
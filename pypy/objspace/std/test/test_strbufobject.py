@@ -0,0 +1,85 @@
+import py
+
+from rpython.rlib.rstring import StringBuilder
+
+from pypy.objspace.std.bytesobject import W_BytesObject
+from pypy.objspace.std.strbufobject import (
+    STRBUF_MIN_LENGTH, W_StringBufferObject, concat)
+
+
+def test_concat():
+    assert isinstance(concat("abc", "def"), W_BytesObject)
+    w_s = concat("a" * STRBUF_MIN_LENGTH, "b")
+    assert isinstance(w_s, W_StringBufferObject)
+    assert w_s.length == STRBUF_MIN_LENGTH + 1
+    assert w_s.force()._value == "a" * STRBUF_MIN_LENGTH + "b"
+
+def test_shared_builder():
+    builder = StringBuilder()
+    builder.append("abc")
+    w_s1 = W_StringBufferObject(builder)
+    builder.append("def")
+    w_s2 = W_StringBufferObject(builder)
+    assert w_s1.force()._value == "abc"
+    assert w_s1.builder is None
+    assert w_s2.force()._value == "abcdef"
+    assert w_s2.builder is builder
+
+
+class AppTestStringBuffer(object):
+    spaceconfig = {"objspace.std.withstrbuf": True}
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("__repr__ doesn't work on appdirect")
+
+    def w_is_strbuf(self, s):
+        import __pypy__
+        return __pypy__.internal_repr(s).startswith("W_StringBufferObject(<")
+
+    def test_loop(self):
+        s = ""
+        for i in range(1000):
+            s += str(i)
+        assert self.is_strbuf(s)
+        assert type(s) is str
+        assert len(s) == len("".join([str(i) for i in range(1000)]))
+        assert s == "".join([str(i) for i in range(1000)])
+        assert not self.is_strbuf(s)
+
+    def test_small(self):
+        s = "abc"
+        s += "def"
+        assert not self.is_strbuf(s)
+        assert s == "abcdef"
+
+    def test_shared(self):
+        a = "x" * 2000
+        b = a + "1"
+        c = b + "2"
+        d = b + "3"
+        assert self.is_strbuf(c)
+        assert self.is_strbuf(d)
+        e = c + "4"
+        assert b == a + "1"
+        assert c == a + "12"
+        assert d == a + "13"
+        assert e == a + "124"
+        assert e[-3:] == "124"
+        f = e + e
+        assert f == (a + "124") * 2
+
+    def test_operations(self):
+        s = "spam" * 500
+        s += "eggs"
+        t = s + "!"
+        assert str(t) is t
+        assert t.endswith("eggs!")
+        assert t[-5:] == "eggs!"
+        assert hash(s) == hash("spam" * 500 + "eggs")
+        assert {s: 1}["spam" * 500 + "eggs"] == 1
+        assert s + u"x" == u"spam" * 500 + u"eggsx"
+        assert s + bytearray("x") == bytearray("spam" * 500 + "eggsx")
+        raises(TypeError, "s + 1")
+        assert buffer(t)[-1] == "!"
+        assert "%s" % (s,) == s
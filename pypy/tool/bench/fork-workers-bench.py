@@ -0,0 +1,129 @@
+"""Time-to-peak and memory of forked worker processes, as in a pre-fork
+server.  Run it with a translated pypy:
+
+    pypy fork-workers-bench.py [nworkers]
+
+For each mode, a master process forks 'nworkers' children that all run
+the same workload, and every child reports how long it took until its
+requests were as fast as at the end of the run ("time to peak"), and
+its RSS and PSS (proportional set size, the memory that is really its
+own) at the end.  The modes are:
+
+    cold      the master forks immediately
+    warm      the master runs the workload first, then forks
+    frozen    like 'warm', plus pypyjit.freeze_compiled_loops() before
+              forking, so the workers keep the inherited machine code
+"""
+
+import os, sys, time
+
+NREQUESTS = 400
+
+
+def request(n):
+    # a bit of everything: attribute access, dicts, strings, calls
+    class Point(object):
+        def __init__(self, x, y):
+            self.x = x
+            self.y = y
+    total = 0
+    d = {}
+    for i in xrange(n):
+        p = Point(i, i * 2)
+        d[str(i % 100)] = p
+        total += p.x + p.y + len(d)
+    return total
+
+def run_requests(nrequests):
+    times = []
+    for i in xrange(nrequests):
+        t0 = time.time()
+        request(2000)
+        times.append(time.time() - t0)
+    return times
+
+def time_to_peak(times):
+    # the time spent until the first request within 10% of the
+    # average of the last quarter of the requests
+    tail = times[len(times) * 3 // 4:]
+    peak = sum(tail) / len(tail)
+    elapsed = 0.0
+    for t in times:
+        if t <= peak * 1.1:
+            break
+        elapsed += t
+    return elapsed
+
+def memory_kb():
+    rss = pss = 0
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Rss:'):
+                    rss = int(line.split()[1])
+                elif line.startswith('Pss:'):
+                    pss = int(line.split()[1])
+    except IOError:
+        pass
+    return rss, pss
+
+def worker(wfd):
+    times = run_requests(NREQUESTS)
+    rss, pss = memory_kb()
+    os.write(wfd, '%f %f %d %d\n' % (time_to_peak(times), sum(times),
+                                     rss, pss))
+    os._exit(0)
+
+def run_mode(mode, nworkers):
+    if mode != 'cold':
+        run_requests(NREQUESTS)
+    if mode == 'frozen':
+        import pypyjit
+        pypyjit.freeze_compiled_loops()
+    pipes = []
+    for i in range(nworkers):
+        rfd, wfd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(rfd)
+            worker(wfd)
+        os.close(wfd)
+        pipes.append((pid, rfd))
+    results = []
+    for pid, rfd in pipes:
+        data = ''
+        while True:
+            chunk = os.read(rfd, 1024)
+            if not chunk:
+                break
+            data += chunk
+        os.close(rfd)
+        os.waitpid(pid, 0)
+        ttp, total, rss, pss = data.split()
+        results.append((float(ttp), float(total), int(rss), int(pss)))
+    return results
+
+def main(nworkers):
+    print '%-8s %15s %12s %10s %10s' % ('mode', 'time to peak', 'total time',
+                                        'RSS (KB)', 'PSS (KB)')
+    for mode in ['cold', 'warm', 'frozen']:
+        # run each mode in its own master process
+        pid = os.fork()
+        if pid == 0:
+            results = run_mode(mode, nworkers)
+            n = float(len(results))
+            print '%-8s %14.3fs %11.3fs %10d %10d' % (
+                mode,
+                sum([r[0] for r in results]) / n,
+                sum([r[1] for r in results]) / n,
+                sum([r[2] for r in results]) / n,
+                sum([r[3] for r in results]) / n)
+            sys.stdout.flush()
+            os._exit(0)
+        os.waitpid(pid, 0)
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main(4)
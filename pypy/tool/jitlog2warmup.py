@@ -0,0 +1,90 @@
+#! /usr/bin/env python
+"""
+Turns the PYPYLOG of a previous run into a warm-up cache file for
+pypyjit.enable_warmup_cache() or the PYPY_JIT_WARMUP_CACHE environment
+variable (see pypy/module/pypyjit/interp_warmup.py).  A process started
+with this cache begins tracing the loops listed in it as soon as their
+code objects are created, instead of after 'threshold' iterations.
+
+Syntax:  jitlog2warmup.py [--min-count=N] <logfile> <cachefile>
+
+Record the log with at least these sections:
+
+    PYPYLOG=jit-log-opt,jit-backend-counts:logfile pypy program.py
+
+With --min-count, only the loops that ran at least N iterations are
+kept (this needs 'jit-backend-counts' in the log).  If 'cachefile'
+already exists, the new entries are added to it.
+"""
+
+import sys, os
+
+from rpython.tool.jitlogparser.parser import (SimpleParser, split_trace,
+    parse_log_counts, parse_code_data)
+from rpython.tool.logparser import parse_log_file, extract_category
+from pypy.module.pypyjit.interp_warmup import HEADER, ANY_DIGEST
+
+
+def hot_loops(logname, min_count=0):
+    """Return a list of (location, next_instr, count) for the loops
+    (not the bridges) compiled in the log, hottest first.  'location' is
+    in the format of interp_warmup.code_location()."""
+    log = parse_log_file(logname, verbose=False)
+    loops = []
+    for entry in extract_category(log, 'jit-log-opt'):
+        parser = SimpleParser(entry, None, {}, 'lltype', None, nonstrict=True)
+        loops += split_trace(parser.parse())
+    parse_log_counts(extract_category(log, 'jit-backend-counts'), loops)
+    counts = {}
+    order = []
+    for loop in loops:
+        comment = loop.comment
+        if not comment.startswith('# Loop') or '(' not in comment:
+            continue
+        arg = comment[comment.find('(') + 1:comment.rfind(')')]
+        name, opname, filename, firstlineno, next_instr = parse_code_data(arg)
+        if name is None or next_instr < 0:
+            continue     # not a PyPy2 code object
+        key = ('%d %s %s' % (firstlineno, name, filename), next_instr)
+        if key not in counts:
+            counts[key] = 0
+            order.append(key)
+        counts[key] += getattr(loop, 'count', 0)
+    result = [(location, next_instr, counts[location, next_instr])
+              for location, next_instr in order
+              if counts[location, next_instr] >= min_count]
+    result.sort(key=lambda entry: -entry[2])
+    return result
+
+def write_cache(cachename, loops):
+    lines = []
+    if os.path.exists(cachename):
+        with open(cachename) as f:
+            data = f.read()
+        if data.startswith(HEADER):
+            lines = data[len(HEADER):].splitlines()
+    for location, next_instr, count in loops:
+        line = '%s %d %s' % (ANY_DIGEST, next_instr, location)
+        if line not in lines:
+            lines.append(line)
+    with open(cachename, 'w') as f:
+        f.write(HEADER)
+        for line in lines:
+            f.write(line + '\n')
+
+def main(argv):
+    min_count = 0
+    if argv and argv[0].startswith('--min-count='):
+        min_count = int(argv.pop(0)[len('--min-count='):])
+    if len(argv) != 2:
+        print __doc__
+        return 2
+    logname, cachename = argv
+    loops = hot_loops(logname, min_count)
+    write_cache(cachename, loops)
+    for location, next_instr, count in loops:
+        print '%10d  %s #%d' % (count, location, next_instr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,31 @@
+import py
+from rpython.tool.udir import udir
+from pypy.tool.jitlog2warmup import hot_loops, write_cache, main
+from pypy.module.pypyjit.interp_warmup import HEADER
+
+LOGTEST2 = py.path.local(__file__).join(
+    '..', '..', '..', '..', 'rpython', 'tool', 'jitlogparser', 'test',
+    'logtest2.log')
+
+def test_hot_loops():
+    loops = hot_loops(str(LOGTEST2))
+    assert loops == [('8 g x.py', 9, 6), ('14 h x.py', 13, 6)]
+    assert hot_loops(str(LOGTEST2), min_count=7) == []
+
+def test_write_cache():
+    cachefile = udir.join('test_jitlog2warmup_cache')
+    cachefile.write(HEADER + '%s 5 1 f y.py\n' % ('0' * 32,))
+    write_cache(str(cachefile), [('8 g x.py', 9, 6)])
+    write_cache(str(cachefile), [('8 g x.py', 9, 6), ('14 h x.py', 13, 6)])
+    assert cachefile.read() == HEADER + (
+        '%s 5 1 f y.py\n' % ('0' * 32,) +
+        '- 9 8 g x.py\n'
+        '- 13 14 h x.py\n')
+
+def test_main(capsys):
+    cachefile = udir.join('test_jitlog2warmup_main')
+    assert main(['--min-count=3', str(LOGTEST2), str(cachefile)]) == 0
+    assert cachefile.read() == HEADER + '- 9 8 g x.py\n- 13 14 h x.py\n'
+    out, err = capsys.readouterr()
+    assert out.splitlines() == ['         6  8 g x.py #9',
+                                '         6  14 h x.py #13']
@@ -752,10 +752,16 @@ class __extend__(pairtype(SomeIterator, SomeIterator)):
 
 class __extend__(pairtype(SomeBuiltinMethod, SomeBuiltinMethod)):
     def union((bltn1, bltn2)):
-        if (bltn1.analyser != bltn2.analyser or
-                bltn1.methodname != bltn2.methodname):
+        if bltn1.methodname != bltn2.methodname:
             raise UnionError(bltn1, bltn2)
         s_self = unionof(bltn1.s_self, bltn2.s_self)
+        if bltn1.analyser != bltn2.analyser:
+            # e.g. the same method of a SomeChar and of a SomeString, when
+            # the object was first seen as a char and is now generalized
+            s_method = s_self.find_method(bltn1.methodname)
+            if s_method is None:
+                raise UnionError(bltn1, bltn2)
+            return s_method
         return SomeBuiltinMethod(bltn1.analyser, s_self,
                 methodname=bltn1.methodname)
 
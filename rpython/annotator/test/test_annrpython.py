@@ -4723,6 +4723,20 @@ class TestAnnotateTestCase:
         s = a.build_types(f, [int])
         assert isinstance(listitem(s), annmodel.SomeChar)
 
+    def test_union_of_methods_of_char_and_string(self):
+        class A(object):
+            def __init__(self, s):
+                self.s = s
+        a1 = A('\n')
+        def g(a):
+            return a.s.lower()
+        def f(n):
+            x = g(a1)
+            return x + g(A('abc' * n))
+        a = self.RPythonAnnotator()
+        s = a.build_types(f, [int])
+        assert type(s) is annmodel.SomeString
+
     def test_union_of_methods_of_frozen(self):
         class A(Freezing):
             def foo(self):
@@ -101,6 +101,15 @@ translation_optiondescription = OptionDescription(
                  requires={
                      "shadowstack": [("translation.gctransformer", "framework")],
                     }),
+    BoolOption("gcmarkprefetch",
+               "Prefetch the gray objects a few steps before visiting them "
+               "in the marking phase of incminimark",
+               default=False, cmdline="--gc-mark-prefetch"),
+    BoolOption("gclazysweep",
+               "Let incminimark sweep the pages of a size class when "
+               "allocating from it, instead of waiting for the next "
+               "incremental sweeping step",
+               default=False, cmdline="--gc-lazy-sweep"),
 
     # other noticeable options
     BoolOption("thread", "enable use of threading primitives",
@@ -151,6 +160,13 @@ translation_optiondescription = OptionDescription(
                  ["annotate", "rtype", "backendopt", "database", "source",
                   "pyjitpl"],
                  default=None, cmdline="--fork-before"),
+    StrOption("incremental_dir",
+              "Write the C sources in this directory, keeping the object "
+              "files of the previous build and the files that did not "
+              "change, so that make only recompiles the changed files.  "
+              "Only the .c and .h files that a previous build recorded as "
+              "generated are removed from it",
+              cmdline="--incremental-dir", default=None),
     BoolOption("dont_write_c_files",
                "Make the C backend write everyting to /dev/null. " +
                "Useful for benchmarking, so you don't actually involve the disk",
@@ -174,6 +190,9 @@ translation_optiondescription = OptionDescription(
     IntOption("make_jobs", "Specify -j argument to make for compilation"
               " (C backend only)",
               cmdline="--make-jobs", default=detect_number_of_processors()),
+    IntOption("source_jobs", "Number of processes that write the C"
+              " source files in parallel (C backend only)",
+              cmdline="--source-jobs", default=1),
 
     # Flags of the TranslationContext:
     BoolOption("list_comprehension_operations",
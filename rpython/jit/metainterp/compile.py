@@ -176,7 +176,7 @@ def record_loop_or_bridge(metainterp_sd, loop):
     original_jitcell_token = loop.original_jitcell_token
     assert original_jitcell_token is not None
     if metainterp_sd.warmrunnerdesc is not None:    # for tests
-        assert original_jitcell_token.generation > 0  # has been registered with memmgr
+        assert original_jitcell_token.generation != 0  # has been registered with memmgr
     wref = weakref.ref(original_jitcell_token)
     clt = original_jitcell_token.compiled_loop_token
     clt.loop_token_wref = wref
@@ -33,7 +33,7 @@ class JitCounter:
     '_get_index(hash)', and then we look in all five entries for a
     matching '_get_subhash(hash)'.  The five entries are roughly kept
     sorted by decreasing recorded time.  The hash value itself should be
-    computed accordingly: we only use bits 21:32 for _get_index and
+    computed accordingly: we only use bits 19:32 for _get_index and
     bits 0:16 for _get_subhash.  (This organization is "probably good"
     to get not-too-random behavior; another motivation for it was for
     the STM branch, to avoid pointless conflicts between threads.)
@@ -47,10 +47,12 @@ class JitCounter:
     following APIs.
 
     'tick(hash, increment)' adds 'increment' to the time value stored
-    with the 'hash'.  Remember that only bits 0:16,21:32 of the hash
+    with the 'hash'.  Remember that only bits 0:16,19:32 of the hash
     are used; in case of collision between two hashes, they will grow
     twice as fast, because each tick() call will contribute to the
-    colliding time value.
+    colliding time value.  If a new hash arrives in an entry whose five
+    ways are all in use, the one with the smallest time value is
+    dropped; 'num_collisions' counts how often this occurs.
 
     'fetch_next_hash()' returns a "random" hash value suitable for
     using in tick() later.  Used when compiling guards; when the
@@ -64,10 +66,13 @@ class JitCounter:
     'set_decay(decay)', 'decay_all_counters()' is used to globally
     reduce all the stored time values.  They all get multiplied by
     a fraction close to (but smaller than) 1.0, computed from the
-    'decay' parameter.
+    'decay' parameter.  'decay_some_counters()' does the same on the
+    next 1/DECAY_STEPS of the table only; it is called after every
+    minor collection, so that the table is decayed progressively
+    instead of being walked all at once.
 
     'install_new_cell(hash, newcell)' adds the new JitCell to the
-    celltable, at the index given by 'hash' (bits 21:32).  Unlike
+    celltable, at the index given by 'hash' (bits 19:32).  Unlike
     the timetable, the celltable stores a linked list of JitCells
     for every entry, and so it is not lossy.
 
@@ -79,7 +84,8 @@ class JitCounter:
     cleans up the celltable at 'hash'.  It removes those JitCells
     for which 'cell.should_remove_jitcell()' returns True.
     """
-    DEFAULT_SIZE = 2048
+    DEFAULT_SIZE = 8192
+    DECAY_STEPS = 32
 
     def __init__(self, size=DEFAULT_SIZE, translator=None):
         "NOT_RPYTHON"
@@ -98,22 +104,24 @@ class JitCounter:
                                        flavor='raw', zero=True,
                                        track_allocation=False)
         self._nexthash = r_uint(0)
+        self.num_collisions = 0
+        #
+        # Progressive decay: the next index to decay, and how many
+        # entries to decay at once
+        self.decay_index = 0
+        self.decay_chunk = max(size // self.DECAY_STEPS, 1)
         #
         # The table of JitCell entries, recording already-compiled loops
         self.celltable = [None] * size
         #
         if translator is not None:
-            class Glob:
-                step = 0
-            glob = Glob()
             def invoke_after_minor_collection():
-                # After 32 minor collections, we call decay_all_counters().
-                # The "--jit decay=N" option measures the amount the
-                # counters are then reduced by.
-                glob.step += 1
-                if glob.step == 32:
-                    glob.step = 0
-                    self.decay_all_counters()
+                # After every minor collection, we decay the next part
+                # of the table, so that all counters are decayed once
+                # every DECAY_STEPS minor collections.  The "--jit decay=N"
+                # option measures the amount the counters are then
+                # reduced by.
+                self.decay_some_counters()
             if not hasattr(translator, '_jit2gc'):
                 translator._jit2gc = {}
             translator._jit2gc['invoke_after_minor_collection'] = (
@@ -178,6 +186,8 @@ class JitCounter:
             n = 4
             while n > 0 and float(p_entry.times[n - 1]) == 0.0:
                 n -= 1
+            if float(p_entry.times[n]) != 0.0:
+                self.num_collisions += 1    # dropping a live counter
             p_entry.subhashes[n] = rffi.cast(rffi.USHORT, subhash)
             p_entry.times[n] = r_singlefloat(0.0)
         return n
@@ -275,17 +285,25 @@ class JitCounter:
         # than one loop because all counters reach the bound at the same
         # time, but where compiling all but the first one is pointless.
         p = rffi.cast(rffi.CCHARP, self.timetable)
-        pypy__decay_jit_counters(p, self.decay_by_mult, self.size)
+        pypy__decay_jit_counters(p, self.decay_by_mult, 0, self.size)
+
+    def decay_some_counters(self):
+        index = self.decay_index
+        stop = index + self.decay_chunk
+        p = rffi.cast(rffi.CCHARP, self.timetable)
+        pypy__decay_jit_counters(p, self.decay_by_mult, index, stop)
+        self.decay_index = stop & (self.size - 1)
 
 
 # this function is written directly in C; gcc will optimize it using SSE
 eci = ExternalCompilationInfo(post_include_bits=["""
-static void pypy__decay_jit_counters(char *data, double f1, long size) {
+static void pypy__decay_jit_counters(char *data, double f1,
+                                     long start, long stop) {
     struct rpy_jitcnt { float times[5]; unsigned short subhashes[5]; };
-    struct rpy_jitcnt *p = (struct rpy_jitcnt *)data;
+    struct rpy_jitcnt *p = ((struct rpy_jitcnt *)data) + start;
     float f = (float)f1;
     long i;
-    for (i=0; i<size; i++) {
+    for (i=start; i<stop; i++) {
         p->times[0] *= f;
         p->times[1] *= f;
         p->times[2] *= f;
@@ -297,8 +315,9 @@ static void pypy__decay_jit_counters(char *data, double f1, long size) {
 """])
 
 pypy__decay_jit_counters = rffi.llexternal(
-    "pypy__decay_jit_counters", [rffi.CCHARP, lltype.Float, lltype.Signed],
-    lltype.Void, compilation_info=eci, _nowrapper=True, sandboxsafe=True)
+    "pypy__decay_jit_counters",
+    [rffi.CCHARP, lltype.Float, lltype.Signed, lltype.Signed], lltype.Void,
+    compilation_info=eci, _nowrapper=True, sandboxsafe=True)
 
 
 # ____________________________________________________________
@@ -323,6 +342,11 @@ class DeterministicJitCounter(JitCounter):
         "NOT_RPYTHON"
         pass
 
+    def decay_some_counters(self):
+        "NOT_RPYTHON"
+        pass
+
     def _clear_all(self):
         self.timetable.clear()
         self.celltable.clear()
+        self.num_collisions = 0
@@ -19,6 +19,13 @@ from rpython.rlib.objectmodel import we_are_translated
 # 'generation' field is much smaller than the current generation, and
 # removed from the set.
 #
+# freeze_alive_loops() sets the 'generation' of all loops alive so far
+# to -1.  Such loops are never considered old, and keep_loop_alive() no
+# longer writes to them.  This is meant for pre-fork servers: the master
+# process warms up and freezes its loops, and the forked children keep
+# using them instead of freeing and recompiling them, without touching
+# (and so copying) the memory of the inherited loop tokens.
+#
 
 class MemoryManager(object):
 
@@ -56,10 +63,18 @@ class MemoryManager(object):
             self.next_check = self.current_generation + self.check_frequency
 
     def keep_loop_alive(self, looptoken):
-        if looptoken.generation != self.current_generation:
+        if (looptoken.generation != self.current_generation and
+                looptoken.generation >= 0):     # not frozen
             looptoken.generation = self.current_generation
             self.alive_loops[looptoken] = None
 
+    def freeze_alive_loops(self):
+        debug_start("jit-mem-freeze")
+        debug_print("Loop tokens frozen:", len(self.alive_loops))
+        for looptoken in self.alive_loops:
+            looptoken.generation = r_int64(-1)
+        debug_stop("jit-mem-freeze")
+
     def _kill_old_loops_now(self):
         debug_start("jit-mem-collect")
         oldtotal = len(self.alive_loops)
@@ -128,3 +128,36 @@ def test_change_current_fraction():
     assert r is False
     r = jc.tick(index2hash(jc, 104), incr)
     assert r is True
+
+def test_num_collisions():
+    jc = JitCounter(size=4)     # 2 bits
+    incr = jc.compute_threshold(4)
+    for sk in range(100, 105):
+        jc.tick(index2hash(jc, 3, subhash=sk), incr)
+    assert jc.num_collisions == 0
+    jc.tick(index2hash(jc, 3, subhash=105), incr)
+    assert jc.num_collisions == 1
+    jc.tick(index2hash(jc, 2, subhash=105), incr)
+    assert jc.num_collisions == 1
+
+
+def test_decay_some_counters(monkeypatch):
+    from rpython.jit.metainterp import counter
+    seen = []
+    def fake_decay(p, f, start, stop):
+        seen.append((f, start, stop))
+    monkeypatch.setattr(counter, 'pypy__decay_jit_counters', fake_decay)
+    jc = JitCounter(size=64)
+    jc.set_decay(500)
+    for i in range(jc.DECAY_STEPS + 1):
+        jc.decay_some_counters()
+    chunk = 64 // jc.DECAY_STEPS
+    assert seen == [(0.5, i * chunk, (i + 1) * chunk)
+                    for i in range(jc.DECAY_STEPS)] + [(0.5, 0, chunk)]
+    #
+    del seen[:]
+    jc = JitCounter(size=8)
+    jc.set_decay(500)
+    for i in range(9):
+        jc.decay_some_counters()
+    assert seen == [(0.5, i, i + 1) for i in range(8)] + [(0.5, 0, 1)]
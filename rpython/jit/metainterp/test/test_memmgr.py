@@ -16,7 +16,7 @@ from rpython.jit.metainterp.test.support import LLJitMixin
 from rpython.rlib.jit import JitDriver, dont_look_inside
 from rpython.jit.metainterp.warmspot import get_stats
 from rpython.jit.metainterp.warmstate import BaseJitCell
-from rpython.rlib import rgc
+from rpython.rlib import rgc, jit_hooks
 
 class FakeLoopToken:
     generation = 0
@@ -251,6 +251,56 @@ class _TestIntegration(LLJitMixin):
         # Loop with number 1, h(), has not been freed
         assert 1 in [t.number for t in tokens if t]
 
+
+class TestFreeze(LLJitMixin):
+    # These tests are quick enough to run directly, unlike the ones of the
+    # two classes above
+
+    setup_class = _TestIntegration.__dict__['setup_class']
+    teardown_class = _TestIntegration.__dict__['teardown_class']
+
+    def test_freeze(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_age(4, 1)
+        tokens = [FakeLoopToken() for i in range(3)]
+        for token in tokens:
+            memmgr.keep_loop_alive(token)
+        memmgr.freeze_alive_loops()
+        newtoken = FakeLoopToken()
+        memmgr.keep_loop_alive(newtoken)
+        for i in range(10):
+            memmgr.next_generation()
+            memmgr.keep_loop_alive(tokens[0])
+        assert memmgr.alive_loops == dict.fromkeys(tokens)
+        assert [token.generation for token in tokens] == [-1, -1, -1]
+
+    def test_frozen_loops_kept_alive(self):
+        myjitdriver = JitDriver(greens=['m'], reds=['n'])
+        def g(m):
+            n = 10
+            while n > 0:
+                myjitdriver.can_enter_jit(n=n, m=m)
+                myjitdriver.jit_merge_point(n=n, m=m)
+                n = n - 1
+            return 21
+        def f(freeze):
+            g(2); g(2)   # a loop with an entry bridge for g(2)
+            if freeze:
+                jit_hooks.stats_memmgr_freeze_all(None)
+            for i in range(10):
+                g(1)
+                g(3)
+                g(4)
+                g(2)     # thrown away every iteration, unless frozen
+            return 42
+
+        res = self.meta_interp(f, [0], loop_longevity=3)
+        assert res == 42
+        self.check_enter_count(2 + 10*4)
+        res = self.meta_interp(f, [1], loop_longevity=3)
+        assert res == 42
+        self.check_enter_count(2 + 10*3)
+
 # ____________________________________________________________
 
 def test_all():
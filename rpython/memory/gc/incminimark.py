@@ -9,6 +9,12 @@ Environment variables can be used to fine-tune the following parameters:
  PYPY_GC_NURSERY_DEBUG   If set to non-zero, will fill nursery with garbage,
                          to help debugging.
 
+ PYPY_GC_NURSERY_MAX     If set, the nursery size is adapted between minor
+                         collections, between 1/4 of PYPY_GC_NURSERY and
+                         this value: it grows when a large fraction of the
+                         nursery survives, and shrinks when almost nothing
+                         survives or when minor collections get too slow.
+
  PYPY_GC_INCREMENT_STEP  The size of memory marked during the marking step.
                          Default is size of nursery * 2. If you mark it too high
                          your GC is not incremental at all. The minimum is set
@@ -188,6 +194,22 @@ STATE_FINALIZING = 3
 
 GC_STATES = ['SCANNING', 'MARKING', 'SWEEPING', 'FINALIZING']
 
+# With the translation option --gc-mark-prefetch, the marking phase
+# prefetches the header of each gray object popped from 'objects_to_trace'
+# and only visits it MARK_PREFETCH_DEPTH objects later, which hides most
+# of the cache misses when the heap is much larger than the caches.
+MARK_PREFETCH_DEPTH = 8     # must be a power of two
+
+# With PYPY_GC_NURSERY_MAX, the nursery doubles in size when the average
+# fraction of it that survives minor collections is above
+# NURSERY_GROW_SURVIVAL, as long as minor collections take less than
+# NURSERY_MAX_PAUSE seconds; and it halves when the average fraction is
+# below NURSERY_SHRINK_SURVIVAL, or when a minor collection takes more than
+# twice NURSERY_MAX_PAUSE.
+NURSERY_GROW_SURVIVAL = 0.10
+NURSERY_SHRINK_SURVIVAL = 0.01
+NURSERY_MAX_PAUSE = 0.005
+
 
 FORWARDSTUB = lltype.GcStruct('forwarding_stub',
                               ('forw', llmemory.Address))
@@ -290,11 +312,16 @@ class IncrementalMiniMarkGC(MovingGCBase):
                  card_page_indices=0,
                  large_object=8*WORD,
                  ArenaCollectionClass=None,
+                 mark_prefetch=False,   # for tests
+                 lazy_sweep=False,      # for tests
                  **kwds):
         "NOT_RPYTHON"
         MovingGCBase.__init__(self, config, **kwds)
         assert small_request_threshold % WORD == 0
         self.read_from_env = read_from_env
+        self.mark_prefetch = mark_prefetch or (config is not None and
+                                               config.gcmarkprefetch)
+        self.mark_prefetch_fifo = lltype.nullptr(self._ADDRARRAY)
         self.nursery_size = nursery_size
 
         self.small_request_threshold = small_request_threshold
@@ -306,6 +333,10 @@ class IncrementalMiniMarkGC(MovingGCBase):
         self.max_heap_size_already_raised = False
         self.max_delta = float(r_uint(-1))
         self.max_number_of_pinned_objects = 0      # computed later
+        # whether the two values below come from env vars, or else are
+        # computed from the nursery size and follow its changes
+        self.max_pinned_from_env = False
+        self.gc_increment_step_from_env = False
         #
         self.card_page_indices = card_page_indices
         if self.card_page_indices > 0:
@@ -322,6 +353,12 @@ class IncrementalMiniMarkGC(MovingGCBase):
         self.nursery_top  = llmemory.NULL
         self.debug_tiny_nursery = -1
         self.debug_rotating_nurseries = lltype.nullptr(NURSARRAY)
+        #
+        # Adaptive nursery size: disabled if 'nursery_size_max' is 0
+        self.nursery_size_min = 0
+        self.nursery_size_max = 0
+        self.nursery_max_pause = NURSERY_MAX_PAUSE
+        self.nursery_survival_ratio = 0.0
         self.extra_threshold = 0
         #
         # The ArenaCollection() handles the nonmovable objects allocation.
@@ -330,6 +367,10 @@ class IncrementalMiniMarkGC(MovingGCBase):
             ArenaCollectionClass = minimarkpage.ArenaCollection
         self.ac = ArenaCollectionClass(arena_size, page_size,
                                        small_request_threshold)
+        if lazy_sweep or (config is not None and config.gclazysweep):
+            # during STATE_SWEEPING, let the ArenaCollection sweep the
+            # old pages of a size class when it runs out of free blocks
+            self.ac.lazy_sweep_func = self._free_if_unvisited
         #
         # Used by minor collection: a list of (mostly non-young) objects that
         # (may) contain a pointer to a young object.  Populated by
@@ -399,6 +440,10 @@ class IncrementalMiniMarkGC(MovingGCBase):
         p = lltype.malloc(self._ADDRARRAY, 1, flavor='raw',
                           track_allocation=False)
         self.singleaddr = llmemory.cast_ptr_to_adr(p)
+        if self.mark_prefetch:
+            self.mark_prefetch_fifo = lltype.malloc(
+                self._ADDRARRAY, MARK_PREFETCH_DEPTH, flavor='raw',
+                track_allocation=False)
         #
         # Two lists of all objects with destructors.
         self.young_objects_with_destructors = self.AddressStack()
@@ -497,6 +542,7 @@ class IncrementalMiniMarkGC(MovingGCBase):
             gc_increment_step = env.read_uint_from_env('PYPY_GC_INCREMENT_STEP')
             if gc_increment_step > 0:
                 self.gc_increment_step = gc_increment_step
+                self.gc_increment_step_from_env = True
             else:
                 self.gc_increment_step = newsize * 4
             #
@@ -505,6 +551,11 @@ class IncrementalMiniMarkGC(MovingGCBase):
                 self.gc_nursery_debug = True
             else:
                 self.gc_nursery_debug = False
+            #
+            nursery_max = env.read_from_env('PYPY_GC_NURSERY_MAX')
+            if nursery_max > 0 and self.debug_tiny_nursery < 0:
+                self.set_nursery_size_limits(min(newsize, nursery_max) // 4,
+                                             max(newsize, nursery_max))
             self._minor_collection()    # to empty the nursery
             llarena.arena_free(self.nursery)
             self.nursery_size = newsize
@@ -519,10 +570,14 @@ class IncrementalMiniMarkGC(MovingGCBase):
             #
             if env_max_number_of_pinned_objects >= 0: # 0 allows to disable pinning completely
                 self.max_number_of_pinned_objects = env_max_number_of_pinned_objects
+                self.max_pinned_from_env = True
         else:
-            # Estimate this number conservatively
-            bigobj = self.nonlarge_max + 1
-            self.max_number_of_pinned_objects = self.nursery_size / (bigobj * 2)
+            self._set_max_number_of_pinned_objects()
+
+    def _set_max_number_of_pinned_objects(self):
+        # Estimate this number conservatively
+        bigobj = self.nonlarge_max + 1
+        self.max_number_of_pinned_objects = self.nursery_size / (bigobj * 2)
 
     def enable(self):
         self.enabled = True
@@ -533,6 +588,15 @@ class IncrementalMiniMarkGC(MovingGCBase):
     def isenabled(self):
         return self.enabled
 
+    def set_nursery_size_limits(self, minsize, maxsize,
+                                max_pause=NURSERY_MAX_PAUSE):
+        # Enable the adaptive nursery size, between 'minsize' and 'maxsize'.
+        # The nursery must not become smaller than what the mallocs just
+        # below 'large_object' need.
+        self.nursery_size_min = max(minsize, 2 * (self.nonlarge_max + 1))
+        self.nursery_size_max = max(maxsize, self.nursery_size_min)
+        self.nursery_max_pause = max_pause
+
     def _nursery_memory_size(self):
         extra = self.nonlarge_max + 1
         return self.nursery_size + extra
@@ -568,6 +632,45 @@ class IncrementalMiniMarkGC(MovingGCBase):
         ll_assert(self.extra_threshold == 0, "extra_threshold set too early")
         debug_stop("gc-set-nursery-size")
 
+    def _adapt_nursery_size(self, nursery_used, duration):
+        # Called at the end of a minor collection with the number of bytes
+        # that were allocated in the nursery, if the adaptive nursery size
+        # is enabled.  Ignore the minor collections done explicitly while
+        # the nursery was still mostly empty.
+        if nursery_used < self.nursery_size // 2:
+            return
+        ratio = float(self.nursery_surviving_size) / float(nursery_used)
+        self.nursery_survival_ratio = (self.nursery_survival_ratio * 0.75 +
+                                       ratio * 0.25)
+        newsize = self.nursery_size
+        if (self.nursery_survival_ratio < NURSERY_SHRINK_SURVIVAL or
+                duration > 2.0 * self.nursery_max_pause):
+            newsize = max(newsize // 2, self.nursery_size_min)
+        elif (self.nursery_survival_ratio > NURSERY_GROW_SURVIVAL and
+                duration < self.nursery_max_pause):
+            newsize = min(newsize * 2, self.nursery_size_max)
+        newsize &= ~(WORD-1)
+        #
+        # We can only move the nursery if it doesn't contain pinned
+        # objects, and not with the PYPY_GC_DEBUG rotating nurseries
+        if (newsize != self.nursery_size and
+                self.pinned_objects_in_nursery == 0 and
+                not self.debug_rotating_nurseries):
+            debug_start("gc-set-nursery-size")
+            debug_print("nursery size:", newsize,
+                        "survival ratio:", self.nursery_survival_ratio)
+            llarena.arena_free(self.nursery)
+            self.nursery_size = newsize
+            self.nursery = self._alloc_nursery()
+            self.nursery_free = self.nursery
+            self.nursery_top = self.nursery + self.nursery_size
+            # the values that were computed from the old size
+            if not self.max_pinned_from_env:
+                self._set_max_number_of_pinned_objects()
+            if not self.gc_increment_step_from_env:
+                self.gc_increment_step = newsize * 4
+            debug_stop("gc-set-nursery-size")
+
 
     def set_major_threshold_from(self, threshold, reserving_size=0):
         # Set the next_major_collection_threshold.
@@ -1711,6 +1814,10 @@ class IncrementalMiniMarkGC(MovingGCBase):
         #
         start = time.time()
         debug_start("gc-minor")
+        if self.nursery_free:
+            nursery_used = self.nursery_free - self.nursery
+        else:
+            nursery_used = self.nursery_size   # from collect_and_reserve()
         #
         # All nursery barriers are invalid from this point on.  They
         # are evaluated anew as part of the minor collection.
@@ -1911,10 +2018,13 @@ class IncrementalMiniMarkGC(MovingGCBase):
         self.total_gc_time += duration
         debug_print("time taken:", duration)
         debug_stop("gc-minor")
+        if self.nursery_size_max > 0:
+            self._adapt_nursery_size(nursery_used, duration)
         self.hooks.fire_gc_minor(
             duration=duration,
             total_memory_used=total_memory_used,
-            pinned_objects=self.pinned_objects_in_nursery)
+            pinned_objects=self.pinned_objects_in_nursery,
+            nursery_size=self.nursery_size)
 
     def _reset_flag_old_objects_pointing_to_pinned(self, obj, ignore):
         ll_assert(self.header(obj).tid & GCFLAG_PINNED_OBJECT_PARENT_KNOWN != 0,
@@ -2694,6 +2804,8 @@ class IncrementalMiniMarkGC(MovingGCBase):
     TEST_VISIT_SINGLE_STEP = False    # for tests
 
     def visit_all_objects_step(self, size_to_track):
+        if self.mark_prefetch:
+            return self._visit_all_objects_step_prefetch(size_to_track)
         # Objects can be added to pending by visit
         pending = self.objects_to_trace
         while pending.non_empty():
@@ -2703,6 +2815,45 @@ class IncrementalMiniMarkGC(MovingGCBase):
                 return 0
         return size_to_track
 
+    def _visit_all_objects_step_prefetch(self, size_to_track):
+        # Same as above, but the objects popped from 'pending' go through
+        # the FIFO 'mark_prefetch_fifo': we prefetch their header when
+        # they enter it and visit them when they leave it.  The FIFO
+        # holds the 'count' objects just before the position 'index'.
+        pending = self.objects_to_trace
+        fifo = self.mark_prefetch_fifo
+        size_gc_header = self.gcheaderbuilder.size_gc_header
+        mask = MARK_PREFETCH_DEPTH - 1
+        index = 0
+        count = 0
+        while True:
+            if pending.non_empty():
+                obj = pending.pop()
+                llop.raw_prefetch(lltype.Void, obj - size_gc_header)
+                if count < MARK_PREFETCH_DEPTH:
+                    fifo[index] = obj
+                    index = (index + 1) & mask
+                    count += 1
+                    continue
+                # the FIFO is full: its oldest entry is at 'index'
+                oldest = fifo[index]
+                fifo[index] = obj
+                index = (index + 1) & mask
+                obj = oldest
+            elif count > 0:
+                obj = fifo[(index - count) & mask]
+                count -= 1
+            else:
+                break
+            size_to_track -= self.visit(obj)
+            if size_to_track < 0 or self.TEST_VISIT_SINGLE_STEP:
+                # put the objects still in the FIFO back into 'pending'
+                while count > 0:
+                    pending.append(fifo[(index - count) & mask])
+                    count -= 1
+                return 0
+        return size_to_track
+
     def visit(self, obj):
         #
         # 'obj' is a live object.  Check GCFLAG_VISITED to know if we
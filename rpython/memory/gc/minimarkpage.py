@@ -57,6 +57,10 @@ ARENA_NULL = lltype.nullptr(ARENA)
 # one of three states: allocated, free, or uninitialized.  The uninitialized
 # blocks (initially all of them) are at the tail of the page.
 
+# Lazy sweeping (see ArenaCollection._lazy_sweep_page()) looks at no more
+# than this number of old pages for each page that it returns.
+LAZY_SWEEP_MAX_PAGES = 4
+
 PAGE_PTR = lltype.Ptr(lltype.ForwardReference())
 PAGE_HEADER = lltype.Struct('PageHeader',
     # -- The following pointer makes a chained list of pages.  For non-full
@@ -143,6 +147,10 @@ class ArenaCollection(object):
         self.peak_memory_used = r_uint(0)
         self.total_memory_alloced = r_uint(0)
         self.peak_memory_alloced = r_uint(0)
+        #
+        # if not None, malloc() sweeps old pages itself while
+        # mass_free_incremental() is in progress: see _lazy_sweep_page()
+        self.lazy_sweep_func = None
 
 
     def _new_page_ptr_list(self, length):
@@ -163,7 +171,10 @@ class ArenaCollection(object):
         size_class = nsize >> WORD_POWER_2
         page = self.page_for_size[size_class]
         if page == PAGE_NULL:
-            page = self.allocate_new_page(size_class)
+            if self.lazy_sweep_func is not None:
+                page = self._lazy_sweep_page(size_class)
+            if page == PAGE_NULL:
+                page = self.allocate_new_page(size_class)
         #
         # The result is simply 'page.freeblock'
         result = page.freeblock
@@ -246,6 +257,43 @@ class ArenaCollection(object):
         return page
 
 
+    def _lazy_sweep_page(self, size_class):
+        """Called by malloc() when there is no page with room for the
+        given size class.  If we are between mass_free_prepare() and the
+        end of mass_free_incremental(), sweep a few of the old pages of
+        this size class now, and return the first one that has free
+        blocks (or PAGE_NULL).  This leaves less work for the following
+        incremental steps, and reuses memory that is probably still in
+        the cache instead of a fresh page.
+        """
+        nblocks = self.nblocks_for_size[size_class]
+        block_size = size_class * WORD
+        max_pages = LAZY_SWEEP_MAX_PAGES
+        while max_pages > 0:
+            page = self.old_page_for_size[size_class]
+            if page != PAGE_NULL:
+                self.old_page_for_size[size_class] = page.nextpage
+            else:
+                page = self.old_full_page_for_size[size_class]
+                if page == PAGE_NULL:
+                    break
+                self.old_full_page_for_size[size_class] = page.nextpage
+            #
+            surviving = self.walk_page(page, block_size, self.lazy_sweep_func)
+            if surviving == nblocks:
+                page.nextpage = self.full_page_for_size[size_class]
+                self.full_page_for_size[size_class] = page
+            elif surviving > 0:
+                page.nextpage = PAGE_NULL
+                self.page_for_size[size_class] = page
+                return page
+            else:
+                self.free_page(page)
+            max_pages -= 1
+        return PAGE_NULL
+    _lazy_sweep_page._dont_inline_ = True
+
+
     def _all_arenas(self):
         """For testing.  Enumerates all arenas."""
         if self.current_arena:
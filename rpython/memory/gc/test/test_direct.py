@@ -695,6 +695,52 @@ class TestIncrementalMiniMarkGCSimple(TestMiniMarkGCSimple):
         assert obj3.x == 456     # it is populated now
 
 
+    def test_marked_objects(self):
+        import random
+        rnd = random.Random(42)
+        for single_step in [False, True]:
+            self.gc.TEST_VISIT_SINGLE_STEP = single_step
+            self.stackroots[:] = []
+            n = 40
+            for i in range(n):
+                p = self.malloc(S)
+                p.x = i
+                self.stackroots.append(p)
+            edges = {}
+            for i in range(n):
+                edges[i] = [rnd.randrange(n), rnd.randrange(n)]
+                self.write(self.stackroots[i], 'prev',
+                           self.stackroots[edges[i][0]])
+                self.write(self.stackroots[i], 'next',
+                           self.stackroots[edges[i][1]])
+            self.gc.collect()     # all objects are old now, and don't move
+            objs = self.stackroots[:]
+            roots = rnd.sample(range(n), 3)
+            self.stackroots[:] = [objs[i] for i in roots]
+            expected = set()
+            todo = list(roots)
+            while todo:
+                i = todo.pop()
+                if i not in expected:
+                    expected.add(i)
+                    todo.extend(edges[i])
+            assert len(expected) < n
+            #
+            self.gc.debug_gc_step_until(incminimark.STATE_SWEEPING)
+            marked = set()
+            for p in objs:
+                hdr = self.gc.header(llmemory.cast_ptr_to_adr(p))
+                if hdr.tid & incminimark.GCFLAG_VISITED:
+                    marked.add(p.x)
+            assert marked == expected
+            self.gc.debug_gc_step_until(incminimark.STATE_SCANNING)
+
+
+class TestIncrementalMiniMarkGCMarkPrefetch(TestIncrementalMiniMarkGCSimple):
+    GC_PARAMS = TestIncrementalMiniMarkGCSimple.GC_PARAMS.copy()
+    GC_PARAMS['mark_prefetch'] = True
+
+
 class TestIncrementalMiniMarkGCFull(DirectGCTest):
     from rpython.memory.gc.incminimark import IncrementalMiniMarkGC as GCClass
     def test_malloc_fixedsize_no_cleanup(self):
@@ -844,3 +890,96 @@ class TestIncrementalMiniMarkGCFull(DirectGCTest):
             (incminimark.STATE_SWEEPING, incminimark.STATE_FINALIZING),
             (incminimark.STATE_FINALIZING, incminimark.STATE_SCANNING)
             ]
+
+    def test_adaptive_nursery_size(self):
+        gc = self.gc
+        initial_size = gc.nursery_size
+        gc.set_nursery_size_limits(0, initial_size * 4, max_pause=1000.0)
+        assert gc.nursery_size_min < initial_size
+        # nothing survives: the nursery shrinks down to the minimum
+        for i in range(100):
+            self.malloc(S)
+        assert gc.nursery_size == gc.nursery_size_min
+        # all objects survive: the nursery grows up to the maximum
+        for i in range(300):
+            self.stackroots.append(self.malloc(S))
+        assert gc.nursery_size == initial_size * 4
+        # minor collections that are too slow shrink the nursery
+        gc.set_nursery_size_limits(0, initial_size * 4, max_pause=0.0)
+        for i in range(100):
+            self.stackroots.append(self.malloc(S))
+        assert gc.nursery_size == gc.nursery_size_min
+
+    def test_adaptive_nursery_size_pinning(self):
+        T = lltype.GcStruct('T', ('x', lltype.Signed))   # can be pinned
+        gc = self.gc
+        initial_size = gc.nursery_size
+        initial_max_pinned = gc.max_number_of_pinned_objects
+        gc.set_nursery_size_limits(0, initial_size * 4, max_pause=1000.0)
+        # the nursery can't move while it contains pinned objects
+        pinned = []
+        while len(pinned) < initial_max_pinned:
+            p = self.malloc(T)
+            assert gc.pin(llmemory.cast_ptr_to_adr(p))
+            self.stackroots.append(p)
+            pinned.append(p)
+        for i in range(100):
+            self.malloc(S)
+        assert gc.nursery_size == initial_size
+        # once unpinned, the nursery shrinks, and the values computed from
+        # its size follow
+        for p in pinned:
+            gc.unpin(llmemory.cast_ptr_to_adr(p))
+        for i in range(100):
+            self.malloc(S)
+        assert gc.nursery_size == gc.nursery_size_min
+        bigobj = gc.nonlarge_max + 1
+        assert gc.max_number_of_pinned_objects == (
+            gc.nursery_size // (bigobj * 2))
+        assert gc.max_number_of_pinned_objects < initial_max_pinned
+        assert gc.gc_increment_step == gc.nursery_size * 4
+        n = 0
+        while gc.pin(llmemory.cast_ptr_to_adr(self.malloc(T))):
+            n += 1
+        assert n == gc.max_number_of_pinned_objects
+
+class TestIncrementalMiniMarkGCLazySweep(TestIncrementalMiniMarkGCFull):
+    GC_PARAMS = {'lazy_sweep': True}
+
+    def test_lazy_sweep(self):
+        from rpython.memory.gc.minimarkpage import PAGE_NULL
+        ac = self.gc.ac
+        n = 60
+        for i in range(n):
+            p = self.malloc(S)
+            p.x = i
+            self.stackroots.append(p)
+        self.gc.collect()     # all objects are old now, and don't move
+        self.stackroots[:] = self.stackroots[::3]
+        self.gc.debug_gc_step_until(incminimark.STATE_SWEEPING)
+        size_classes = range(1, ac.small_request_threshold // WORD + 1)
+        old_pages = []
+        for size_class in size_classes:
+            for page in [ac.old_page_for_size[size_class],
+                         ac.old_full_page_for_size[size_class]]:
+                while page != PAGE_NULL:
+                    old_pages.append(page)
+                    page = page.nextpage
+        assert old_pages
+        #
+        # promoting a few new objects (not enough to fill the nursery)
+        # reuses the free blocks of old pages, which are swept on demand
+        for i in range(n, n + 3):
+            p = self.malloc(S)
+            p.x = i
+            self.stackroots.append(p)
+        self.gc._minor_collection()
+        assert self.gc.gc_state == incminimark.STATE_SWEEPING
+        current_pages = ([ac.page_for_size[i] for i in size_classes] +
+                         [ac.full_page_for_size[i] for i in size_classes])
+        assert [page for page in old_pages if page in current_pages]
+        #
+        self.gc.debug_gc_step_until(incminimark.STATE_SCANNING)
+        self.gc.collect()
+        xs = [p.x for p in self.stackroots]
+        assert xs == range(0, n, 3) + range(n, n + 3)
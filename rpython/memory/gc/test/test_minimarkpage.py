@@ -402,7 +402,7 @@ def test_mass_free_half_page_becomes_more_free():
 
 # ____________________________________________________________
 
-def test_random(incremental=False):
+def test_random(incremental=False, lazy_sweep=False):
     import random
     pagesize = hdrsize + 24*WORD
     num_pages = 3
@@ -435,6 +435,7 @@ def test_random(incremental=False):
         at = (obj.arena, obj.offset)
         assert at not in live_objects
         live_objects[at] = size_class * WORD
+        return size_class * WORD
 
     try:
         while True:
@@ -448,6 +449,8 @@ def test_random(incremental=False):
                                   multiarenas=True)
             live_objects_extra = {}
             fresh_extra = 0
+            if lazy_sweep:
+                ac.lazy_sweep_func = ok_to_free
             if not incremental:
                 ac.mass_free(ok_to_free)
             else:
@@ -455,9 +458,10 @@ def test_random(incremental=False):
                 while not ac.mass_free_incremental(ok_to_free,
                                                    random.randrange(1, 3)):
                     print '[]'
-                    prev = ac.total_memory_used
-                    allocate_object(live_objects_extra)
-                    fresh_extra += ac.total_memory_used - prev
+                    # allocate a few objects, which may sweep some pages
+                    # if 'lazy_sweep'
+                    for i in range(random.randrange(1, 5)):
+                        fresh_extra += allocate_object(live_objects_extra)
             #
             # Check that we have seen all objects
             assert sorted(ok_to_free.seen) == sorted(live_objects)
@@ -477,3 +481,6 @@ def test_random(incremental=False):
 
 def test_random_incremental():
     test_random(incremental=True)
+
+def test_random_lazy_sweep():
+    test_random(incremental=True, lazy_sweep=True)
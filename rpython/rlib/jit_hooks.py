@@ -128,10 +128,18 @@ def stats_asmmemmgr_allocated(warmrunnerdesc):
 def stats_asmmemmgr_used(warmrunnerdesc):
     return warmrunnerdesc.metainterp_sd.cpu.asmmemmgr.get_stats()[1]
 
+@register_helper(annmodel.SomeInteger())
+def stats_jitcounter_collisions(warmrunnerdesc):
+    return warmrunnerdesc.jitcounter.num_collisions
+
 @register_helper(None)
 def stats_memmgr_release_all(warmrunnerdesc):
     warmrunnerdesc.memory_manager.release_all_loops()
 
+@register_helper(None)
+def stats_memmgr_freeze_all(warmrunnerdesc):
+    warmrunnerdesc.memory_manager.freeze_alive_loops()
+
 # ---------------------- jitcell interface ----------------------
 
 def _new_hook(name, resulttype):
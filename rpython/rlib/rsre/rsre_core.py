@@ -6,6 +6,8 @@ from rpython.tool.sourcetools import func_with_new_name
 from rpython.rlib.objectmodel import we_are_translated, not_rpython
 from rpython.rlib import jit
 from rpython.rlib.rsre.rsre_jit import install_jitdriver, install_jitdriver_spec
+from rpython.rlib import rutf8
+from rpython.rlib.rarithmetic import r_uint
 
 _seen_specname = {}
 
@@ -51,12 +53,15 @@ class EndOfString(Exception):
     pass
 
 class CompiledPattern(object):
-    _immutable_fields_ = ['pattern[*]', 'flags']
+    _immutable_fields_ = ['pattern[*]', 'flags', 'literal_len',
+                          'literal_offset', 'literal_bytes', 'literal_utf8',
+                          'literal_is_bytes']
 
     def __init__(self, pattern, flags):
         self.pattern = pattern
         if not consts.V37:      # 'flags' is ignored in >=3.7 mode
             self.flags = flags
+        self._init_required_literal()
         # check we don't get the old value of MAXREPEAT
         # during the untranslated tests. 
         # On python3, MAXCODE can appear in patterns. It will be 65535
@@ -64,6 +69,30 @@ class CompiledPattern(object):
         if not we_are_translated() and rsre_char.CODESIZE != 2:
             assert 65535 not in pattern
 
+    def _init_required_literal(self):
+        """Find a literal string that every match must contain, to be
+        searched for before trying to match at every position (see
+        search_context()).  literal_offset is the number of characters
+        between the start of a match and the literal, or -1 if it varies."""
+        codes, offset = find_required_literal(self.pattern)
+        self.literal_len = len(codes)
+        self.literal_offset = offset
+        self.literal_is_bytes = True
+        bytes_builder = []
+        utf8_builder = []
+        for code in codes:
+            if code < 0 or code > 0x10ffff:
+                self.literal_len = 0
+                break
+            if code < 256:
+                bytes_builder.append(chr(code))
+            else:
+                self.literal_is_bytes = False
+            utf8_builder.append(rutf8.unichr_as_utf8(r_uint(code),
+                                                     allow_surrogates=True))
+        self.literal_bytes = ''.join(bytes_builder)
+        self.literal_utf8 = ''.join(utf8_builder)
+
     def lowa(self, char_ord):
         """Pre-3.7: uses getlower(flags).
            Post-3.7: this is always getlower_ascii().
@@ -98,6 +127,106 @@ class CompiledPattern(object):
         assert result >= 0
         return result
 
+def _pat_or_zero(pattern, index):
+    if 0 <= index < len(pattern):
+        return pattern[index]
+    return 0
+
+def find_required_literal(pattern):
+    """Look at the opcodes that follow each other at the top level of
+    'pattern', which must all match for the pattern to match, and return
+    the longest run of LITERALs among them, as (list of codes, offset).
+    The offset is the fixed number of characters before the run in any
+    match, or -1.  Stops at the first opcode that it does not know about."""
+    best = []
+    best_offset = -1
+    run = []
+    run_offset = -1
+    offset = 0      # or -1 if the width of what we've seen so far varies
+    ppos = 0
+    if _pat_or_zero(pattern, 0) == consts.OPCODE_INFO:
+        ppos = 1 + _pat_or_zero(pattern, 1)
+    while 0 <= ppos < len(pattern):
+        op = pattern[ppos]
+        arg = _pat_or_zero(pattern, ppos + 1)
+        if op == consts.OPCODE_LITERAL:
+            # <LITERAL> <code>
+            if ppos + 1 >= len(pattern):
+                break     # invalid pattern
+            if len(run) == 0:
+                run_offset = offset
+            run.append(arg)
+            if len(run) > len(best):
+                best = run
+                best_offset = run_offset
+            nextppos = ppos + 2
+            width = 1
+        elif op == consts.OPCODE_MARK or op == consts.OPCODE_AT:
+            # zero-width: a run of literals goes on after it
+            nextppos = ppos + 2
+            width = 0
+        else:
+            run = []
+            if op == consts.OPCODE_ANY or op == consts.OPCODE_ANY_ALL:
+                nextppos = ppos + 1
+                width = 1
+            elif (op == consts.OPCODE_NOT_LITERAL or
+                  op == consts.OPCODE_LITERAL_IGNORE or
+                  op == consts.OPCODE_NOT_LITERAL_IGNORE or
+                  op == consts.OPCODE_CATEGORY or
+                  consts.eq(op, consts.OPCODE37_LITERAL_UNI_IGNORE) or
+                  consts.eq(op, consts.OPCODE37_LITERAL_LOC_IGNORE) or
+                  consts.eq(op, consts.OPCODE37_NOT_LITERAL_UNI_IGNORE) or
+                  consts.eq(op, consts.OPCODE37_NOT_LITERAL_LOC_IGNORE)):
+                nextppos = ppos + 2
+                width = 1
+            elif (op == consts.OPCODE_IN or
+                  op == consts.OPCODE_IN_IGNORE or
+                  consts.eq(op, consts.OPCODE37_IN_UNI_IGNORE) or
+                  consts.eq(op, consts.OPCODE37_IN_LOC_IGNORE)):
+                # <IN> <skip> <set>
+                nextppos = ppos + 1 + arg
+                width = 1
+            elif (op == consts.OPCODE_REPEAT_ONE or
+                  op == consts.OPCODE_MIN_REPEAT_ONE):
+                # <REPEAT_ONE> <skip> <1=min> <2=max> item <SUCCESS> tail
+                nextppos = ppos + 1 + arg
+                width = _pat_or_zero(pattern, ppos + 2)
+                if width != _pat_or_zero(pattern, ppos + 3):
+                    width = -1
+            elif op == consts.OPCODE_REPEAT:
+                # <REPEAT> <skip> <1=min> <2=max> item <UNTIL> tail
+                nextppos = ppos + 2 + arg
+                width = -1
+            elif op == consts.OPCODE_BRANCH:
+                # <BRANCH> <0=skip> code <JUMP> ... <0> tail
+                nextppos = ppos + 1
+                while _pat_or_zero(pattern, nextppos) > 0:
+                    nextppos += pattern[nextppos]
+                nextppos += 1
+                width = -1
+            elif op == consts.OPCODE_ASSERT or op == consts.OPCODE_ASSERT_NOT:
+                # <ASSERT> <0=skip> <1=back> <pattern>
+                nextppos = ppos + 1 + arg
+                width = 0
+            elif (op == consts.OPCODE_GROUPREF or
+                  op == consts.OPCODE_GROUPREF_IGNORE or
+                  consts.eq(op, consts.OPCODE37_GROUPREF_UNI_IGNORE) or
+                  consts.eq(op, consts.OPCODE37_GROUPREF_LOC_IGNORE)):
+                nextppos = ppos + 2
+                width = -1
+            else:
+                # SUCCESS, or an opcode that we don't skip over
+                break
+        if nextppos <= ppos:
+            break     # invalid pattern
+        ppos = nextppos
+        if width < 0:
+            offset = -1
+        elif offset >= 0:
+            offset += width
+    return best, best_offset
+
 MODE_ANY = '\x00'         # an empty match is fine
 MODE_NONEMPTY = '\x01'    # must have a non-empty match
 MODE_FULL = '\x02'        # must match the whole string
@@ -151,6 +280,15 @@ class AbstractMatchContext(object):
     # calling the methods xxx_indirect() instead of xxx(), or if
     # applicable add the @specializectx decorator.
     ZERO = 0
+    CAN_FIND_LITERAL = False
+
+    def find_literal(self, pattern, start):
+        """Return the position of the first occurrence, at or after 'start'
+        and ending before 'end', of the literal string that every match of
+        'pattern' contains (see CompiledPattern); or -1 if there is none.
+        Only called if CAN_FIND_LITERAL is set."""
+        return -1
+
     @not_rpython
     def next(self, position):
         raise NotImplementedError
@@ -294,6 +432,13 @@ class StrMatchContext(FixedMatchContext):
         return StrMatchContext(self._string, start,
                                self.end)
 
+    CAN_FIND_LITERAL = True
+
+    def find_literal(self, pattern, start):
+        if not pattern.literal_is_bytes:
+            return -1      # a code >= 256 cannot be in the string
+        return self._string.find(pattern.literal_bytes, start, self.end)
+
     def get_single_byte(self, base_position, index):
         return self.str(base_position + index)
 
@@ -1301,6 +1446,15 @@ def search_context(ctx, pattern):
         else:
             charset = (flags & consts.SRE_INFO_CHARSET)
         base += 1 + pattern.pat(1)
+    if pattern.literal_len > 0 and ctx.CAN_FIND_LITERAL:
+        # quickly reject the strings that don't contain a literal string
+        # found in the pattern, or only try to match at the positions
+        # where it is if it is at a fixed offset in the pattern
+        found = ctx.find_literal(pattern, ctx.match_start)
+        if found < ctx.ZERO:
+            return False
+        if pattern.literal_offset >= 0:
+            return literal_prefilter_search(ctx, pattern, base, found)
     if pattern.pat(base) == consts.OPCODE_LITERAL:
         return literal_search(ctx, pattern, base)
     if charset:
@@ -1347,6 +1501,30 @@ def literal_search(ctx, pattern, base):
         start = start1
     return False
 
+install_jitdriver_spec("LiteralPrefilterSearch",
+                       greens=['base', 'pattern'],
+                       reds=['found', 'ctx'],
+                       debugprint=(1, 0))
+@specializectx
+def literal_prefilter_search(ctx, pattern, base, found):
+    # the literal string of the pattern is at a fixed offset from the start
+    # of any match: 'found' is its first position in the string, and we
+    # try to match only where it is
+    while True:
+        ctx.jitdriver_LiteralPrefilterSearch.jit_merge_point(ctx=ctx,
+                found=found, base=base, pattern=pattern)
+        try:
+            start = ctx.prev_n(found, pattern.literal_offset, ctx.match_start)
+        except EndOfString:
+            pass
+        else:
+            if sre_match(ctx, pattern, base, start, None) is not None:
+                ctx.match_start = start
+                return True
+        found = ctx.find_literal(pattern, ctx.next(found))
+        if found < ctx.ZERO:
+            return False
+
 install_jitdriver_spec("CharsetSearch",
                        greens=['base', 'pattern'],
                        reds=['start', 'ctx'],
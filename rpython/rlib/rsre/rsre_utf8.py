@@ -23,6 +23,11 @@ class Utf8MatchContext(AbstractMatchContext):
     def get_single_byte(self, base_position, index):
         return self._utf8[base_position + index]
 
+    CAN_FIND_LITERAL = True
+
+    def find_literal(self, pattern, start):
+        return self._utf8.find(pattern.literal_utf8, start, self.end)
+
     def next(self, position):
         return rutf8.next_codepoint_pos(self._utf8, position)
     next_indirect = next
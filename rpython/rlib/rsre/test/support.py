@@ -74,6 +74,16 @@ class MatchContextForTests(StrMatchContext):
         assert isinstance(position, Position)
         return ord(self._string[position._p])
 
+    def find_literal(self, pattern, start):
+        assert isinstance(start, Position)
+        if not pattern.literal_is_bytes:
+            return -1
+        found = self._string.find(pattern.literal_bytes, start._p,
+                                  self.end._p)
+        if found < 0:
+            return -1
+        return Position(found)
+
     def debug_check_pos(self, position):
         assert isinstance(position, Position)
 
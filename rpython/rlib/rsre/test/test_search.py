@@ -230,6 +230,27 @@ class BaseTestSearch:
                     #assert match is None # this is only true on cpy2 (but not on pypy2/3 and cpy3)
                     assert res is None
 
+    def test_required_literal(self):
+        P = self.P
+        for pattern in [r'\w+@example\.com', r'(\d+)-(\d+) items',
+                        r'..foo', r'\d\dfoo\b', r'(a|bc)de', r'x*yz?abc',
+                        r'(?=\w)ab\d', r'([ab]{3})c', r'(?:ab)+c', r'\bfoo',
+                        r'a.b.c']:
+            r_code, r = get_code_and_re(pattern)
+            for string in ['', 'abc', 'joe@example.com!', 'x@example.co',
+                           '12-34 items', '1234 items', 'afoo xyfoo',
+                           '12foo 34foo', 'xbcde', 'zxabc', 'yyab1', 'ab3',
+                           'bbbc aaac', 'ababc', 'foo', 'xxaxbxc', 'aabbcc']:
+                for start in range(len(string) + 1):
+                    match = r.search(string, start)
+                    res = self.search(r_code, string, start)
+                    if match is None:
+                        assert res is None, (pattern, string, start)
+                    else:
+                        assert res is not None, (pattern, string, start)
+                        assert res.span() == (P(match.start()),
+                                              P(match.end()))
+
 
 class TestSearchCustom(BaseTestSearch):
     search = staticmethod(support.search)
@@ -282,3 +303,19 @@ class TestSearchUtf8(BaseTestSearch):
         assert not self.match(r, 'bc')
         assert not self.match(r, 'b')
 
+
+def test_find_required_literal():
+    def find(pattern):
+        codes, offset = rsre_core.find_required_literal(
+            get_code(pattern).pattern)
+        return ''.join(map(chr, codes)), offset
+    assert find(r'abc') == ('abc', 0)
+    assert find(r'\w+@example\.com') == ('@example.com', -1)
+    assert find(r'..foo|x') == ('', -1)
+    assert find(r'(..)foo') == ('foo', 2)
+    assert find(r'\d{2}foo\b') == ('foo', 2)
+    assert find(r'x(?=y)a(b)c') == ('abc', 1)
+    assert find(r'ab[cd]efg') == ('efg', 3)
+    assert find(r'(?i)abc') == ('', -1)
+    assert find(r'(a|b)*cd(e)') == ('cde', -1)
+    assert find(r'(a)\1bc') == ('bc', -1)
@@ -417,6 +417,7 @@ LL_OPERATIONS = {
     'raw_memset':           LLOp(revdb_protect=True),
     'raw_memcopy':          LLOp(revdb_protect=True),
     'raw_memmove':          LLOp(revdb_protect=True),
+    'raw_prefetch':         LLOp(canrun=True),    # only a hint to the cpu
     'raw_load':             LLOp(revdb_protect=True, sideeffects=False,
                                                      canrun=True),
     'raw_store':            LLOp(revdb_protect=True, canrun=True),
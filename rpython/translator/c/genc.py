@@ -178,7 +178,14 @@ class CBuilder(object):
         if self.modulename is None:
             self.modulename = uniquemodulename('testing')
         modulename = self.modulename
-        targetdir = udir.ensure(modulename, dir=1)
+        previous_files = None
+        if self.config.translation.incremental_dir:
+            targetdir = py.path.local(
+                self.config.translation.incremental_dir).ensure(dir=1)
+            previous_files = forget_generated_files(targetdir)
+            other_files = set([fn.basename for fn in targetdir.listdir()])
+        else:
+            targetdir = udir.ensure(modulename, dir=1)
         if self.config.translation.dont_write_c_files:
             targetdir = NullPyPathLocal(targetdir)
 
@@ -209,18 +216,21 @@ class CBuilder(object):
                 defines['PYPY_MAIN_FUNCTION'] = "pypy_main_startup"
         self.eci, cfile, extra, headers_to_precompile = \
                 gen_source(db, modulename, targetdir,
-                           self.eci, defines=defines, split=self.split)
+                           self.eci, defines=defines, split=self.split,
+                           jobs=self.config.translation.source_jobs)
         self.c_source_filename = py.path.local(cfile)
         self.extrafiles = self.eventually_copy(extra)
         self.gen_makefile(targetdir, exe_name=exe_name,
                           headers_to_precompile=headers_to_precompile)
+        if previous_files is not None:
+            keep_unchanged_files(targetdir, previous_files, other_files)
         return cfile
 
     def eventually_copy(self, cfiles):
         extrafiles = []
         for fn in cfiles:
             fn = py.path.local(fn)
-            if not fn.relto(udir):
+            if not fn.relto(udir) and not fn.relto(self.targetdir):
                 newname = self.targetdir.join(fn.basename)
                 if newname.check(exists=True):
                     raise ValueError(
@@ -520,8 +530,9 @@ MARKER = '/*/*/' # provide an easy way to split after generating
 class SourceGenerator:
     one_source_file = True
 
-    def __init__(self, database):
+    def __init__(self, database, jobs=1):
         self.database = database
+        self.jobs = jobs
         self.extrafiles = []
         self.headers_to_precompile = []
         self.path = None
@@ -596,8 +607,7 @@ class SourceGenerator:
                 return "data_" + name
         return basecname
 
-    def splitnodesimpl(self, basecname, nodes, nextra, nbetween,
-                       split_criteria=SPLIT_CRITERIA):
+    def groupnodesbycfile(self, basecname, nodes):
         # Gather nodes by some criteria:
         nodes_by_base_cfile = {}
         for node in nodes:
@@ -606,28 +616,137 @@ class SourceGenerator:
                 nodes_by_base_cfile[c_filename].append(node)
             else:
                 nodes_by_base_cfile[c_filename] = [node]
+        return [(c_filename, nodes_by_base_cfile[c_filename])
+                for c_filename in sorted(nodes_by_base_cfile)]
 
+    def splitgroup(self, nodes, nextra, nbetween, split_criteria):
         # produce a sequence of nodes, grouped into files
         # which have no more than SPLIT_CRITERIA lines
-        for basecname in sorted(nodes_by_base_cfile):
-            iternodes = iter(nodes_by_base_cfile[basecname])
-            done = [False]
-            def subiter():
-                used = nextra
-                for node in iternodes:
-                    impl = '\n'.join(list(node.implementation())).split('\n')
-                    if not impl:
-                        continue
-                    cost = len(impl) + nbetween
-                    yield node, impl
-                    del impl
-                    if used + cost > split_criteria:
-                        # split if criteria met, unless we would produce nothing.
-                        raise StopIteration
-                    used += cost
-                done[0] = True
-            while not done[0]:
-                yield self.uniquecname(basecname), subiter()
+        iternodes = iter(nodes)
+        done = [False]
+        def subiter():
+            used = nextra
+            for node in iternodes:
+                impl = '\n'.join(list(node.implementation())).split('\n')
+                if not impl:
+                    continue
+                cost = len(impl) + nbetween
+                yield node, impl
+                del impl
+                if used + cost > split_criteria:
+                    # split if criteria met, unless we would produce nothing.
+                    raise StopIteration
+                used += cost
+            done[0] = True
+        while not done[0]:
+            yield subiter()
+
+    def splitnodesimpl(self, basecname, nodes, nextra, nbetween,
+                       split_criteria=SPLIT_CRITERIA):
+        for basecname, group in self.groupnodesbycfile(basecname, nodes):
+            for nodeiter in self.splitgroup(group, nextra, nbetween,
+                                            split_criteria):
+                yield self.uniquecname(basecname), nodeiter
+
+    def can_write_in_parallel(self):
+        # the nodes are written by forked processes, which can only
+        # report back the few pieces of state listed in
+        # _write_parts_of_groups()
+        return (self.jobs > 1 and not self.one_source_file and
+                hasattr(os, 'fork') and
+                not isinstance(self.path, NullPyPathLocal) and
+                not self.database.reverse_debugger)
+
+    def _write_parts_of_groups(self, partname, groups, indices, nextra,
+                               split_criteria):
+        # runs in a forked process: write the body of each file of the
+        # groups listed in 'indices' to a temporary file 'partname-G-N'
+        db = self.database
+        result = []
+        for g in indices:
+            basecname, nodes = groups[g]
+            start = len(db.late_initializations)
+            nfiles = 0
+            for nodeiter in self.splitgroup(nodes, nextra, 1,
+                                            split_criteria):
+                part = self.path.join('%s-%d-%d' % (partname, g, nfiles))
+                fc = part.open('w')
+                print >> fc, MARKER
+                for node, impl in nodeiter:
+                    print >> fc, '\n'.join(impl)
+                    print >> fc, MARKER
+                print >> fc, '/***********************************************************/'
+                fc.close()
+                nfiles += 1
+            result.append((g, nfiles, db.late_initializations[start:]))
+        field_names = None
+        if db.all_field_names is not None:
+            field_names = list(db.all_field_names)
+        return result, db.instrument_ncounter, field_names
+
+    def write_implementations(self, f, basecname, nodes, nextra,
+                              split_criteria, write_header):
+        if not self.can_write_in_parallel():
+            for name, nodeiter in self.splitnodesimpl(basecname, nodes,
+                                                       nextra, 1,
+                                                       split_criteria):
+                with self.write_on_maybe_separate_source(f, name) as fc:
+                    if fc is not f:
+                        write_header(fc, name)
+                    print >> fc, MARKER
+                    for node, impl in nodeiter:
+                        print >> fc, '\n'.join(impl)
+                        print >> fc, MARKER
+                    print >> fc, '/***********************************************************/'
+            return
+        #
+        # Parallel version: the groups of nodes are distributed over
+        # 'self.jobs' forked processes, biggest groups first, each to the
+        # process that has the fewest nodes so far.  Each process writes
+        # the body of the files; then we write the files in the same
+        # order and with the same names as the sequential version.
+        groups = self.groupnodesbycfile(basecname, nodes)
+        partname = basecname[:-2] + '.part'
+        jobs = min(self.jobs, len(groups))
+        assigned = [[] for i in range(jobs)]
+        sizes = [0] * jobs
+        order = range(len(groups))
+        order.sort(key=lambda g: -len(groups[g][1]))
+        for g in order:
+            k = sizes.index(min(sizes))
+            assigned[k].append(g)
+            sizes[k] += len(groups[g][1])
+        log.writing('%s: %d groups in %d processes' % (basecname,
+                                                       len(groups), jobs))
+        forks = [py.process.ForkedFunc(self._write_parts_of_groups,
+                                       [partname, groups, indices, nextra,
+                                        split_criteria])
+                 for indices in assigned]
+        nfiles = [0] * len(groups)
+        late_initializations = [None] * len(groups)
+        db = self.database
+        for ff in forks:
+            res = ff.waitfinish()
+            if res.exitstatus != 0 or res.signal:
+                raise Exception("writing %s in a subprocess failed:\n%s" % (
+                    basecname, res.err))
+            result, instrument_ncounter, field_names = res.retval
+            for g, n, inits in result:
+                nfiles[g] = n
+                late_initializations[g] = inits
+            db.instrument_ncounter = max(db.instrument_ncounter,
+                                         instrument_ncounter)
+            if field_names is not None:
+                db.all_field_names.update(field_names)
+        for g in range(len(groups)):
+            db.late_initializations.extend(late_initializations[g])
+            for i in range(nfiles[g]):
+                name = self.uniquecname(groups[g][0])
+                part = self.path.join('%s-%d-%d' % (partname, g, i))
+                with self.write_on_maybe_separate_source(f, name) as fc:
+                    write_header(fc, name)
+                    fc.write(part.read())
+                part.remove()
 
     @contextlib.contextmanager
     def write_on_included_file(self, f, name):
@@ -678,45 +797,32 @@ class SourceGenerator:
             print >> f, '#include "revdb_def.h"'
         print >> f
 
+        def write_nonfunc_header(fc, name):
+            print >> fc, '/***********************************************************/'
+            print >> fc, '/***  Non-function Implementations                       ***/'
+            print >> fc
+            print >> fc, '#include "singleheader.h"'
+            print >> fc, '#include "src/g_include.h"'
+            print >> fc
         nextralines = 11 + 1
-        for name, nodeiter in self.splitnodesimpl('nonfuncnodes.c',
-                                                   self.othernodes,
-                                                   nextralines, 1):
-            with self.write_on_maybe_separate_source(f, name) as fc:
-                if fc is not f:
-                    print >> fc, '/***********************************************************/'
-                    print >> fc, '/***  Non-function Implementations                       ***/'
-                    print >> fc
-                    print >> fc, '#include "singleheader.h"'
-                    print >> fc, '#include "src/g_include.h"'
-                    print >> fc
-                print >> fc, MARKER
-                for node, impl in nodeiter:
-                    print >> fc, '\n'.join(impl)
-                    print >> fc, MARKER
-                print >> fc, '/***********************************************************/'
-
+        self.write_implementations(f, 'nonfuncnodes.c', self.othernodes,
+                                   nextralines, SPLIT_CRITERIA,
+                                   write_nonfunc_header)
+
+        def write_func_header(fc, name):
+            print >> fc, '/***********************************************************/'
+            print >> fc, '/***  Implementations                                    ***/'
+            print >> fc
+            print >> fc, '#include "singleheader.h"'
+            print >> fc, '#define PYPY_FILE_NAME "%s"' % name
+            print >> fc, '#include "src/g_include.h"'
+            if self.database.reverse_debugger:
+                print >> fc, '#include "revdb_def.h"'
+            print >> fc
         nextralines = 12
-        for name, nodeiter in self.splitnodesimpl('implement.c',
-                                                   self.funcnodes,
-                                                   nextralines, 1,
-                                                   split_criteria_big):
-            with self.write_on_maybe_separate_source(f, name) as fc:
-                if fc is not f:
-                    print >> fc, '/***********************************************************/'
-                    print >> fc, '/***  Implementations                                    ***/'
-                    print >> fc
-                    print >> fc, '#include "singleheader.h"'
-                    print >> fc, '#define PYPY_FILE_NAME "%s"' % name
-                    print >> fc, '#include "src/g_include.h"'
-                    if self.database.reverse_debugger:
-                        print >> fc, '#include "revdb_def.h"'
-                    print >> fc
-                print >> fc, MARKER
-                for node, impl in nodeiter:
-                    print >> fc, '\n'.join(impl)
-                    print >> fc, MARKER
-                print >> fc, '/***********************************************************/'
+        self.write_implementations(f, 'implement.c', self.funcnodes,
+                                   nextralines, split_criteria_big,
+                                   write_func_header)
         print >> f
         if self.database.all_field_names is not None:
             gen_fieldstats(f, self)
@@ -842,7 +948,7 @@ def add_extra_files(database, eci):
 
 
 def gen_source(database, modulename, targetdir,
-               eci, defines={}, split=False):
+               eci, defines={}, split=False, jobs=1):
     if isinstance(targetdir, str):
         targetdir = py.path.local(targetdir)
 
@@ -871,7 +977,7 @@ def gen_source(database, modulename, targetdir,
     # 1) All declarations
     # 2) Implementation of functions and global structures and arrays
     #
-    sg = SourceGenerator(database)
+    sg = SourceGenerator(database, jobs)
     sg.set_strategy(targetdir, split)
     sg.gen_readable_parts_of_source(f)
     headers_to_precompile = sg.headers_to_precompile[:]
@@ -905,6 +1011,44 @@ def gen_source(database, modulename, targetdir,
 
     return eci, filename, sg.getextrafiles(), headers_to_precompile
 
+GENERATED_FILES = 'generated_files.txt'
+
+def forget_generated_files(targetdir):
+    """Remove the .c and .h files that a previous build listed in the
+    GENERATED_FILES of 'targetdir', and return a dict
+    {basename: (md5, mtime)} describing them.  The other files, like the
+    object files, are kept."""
+    previous_files = {}
+    listfile = targetdir.join(GENERATED_FILES)
+    if listfile.check(file=1):
+        for name in listfile.read().splitlines():
+            fn = targetdir.join(name)
+            if fn.check(file=1):
+                previous_files[name] = (fn.computehash('md5'), fn.mtime())
+                fn.remove()
+    return previous_files
+
+def keep_unchanged_files(targetdir, previous_files, other_files):
+    """Record in GENERATED_FILES the .c and .h files that this build wrote,
+    i.e. those that are not in 'other_files', and give back their old
+    modification time to the ones that were generated again with the same
+    content, so that make does not recompile them."""
+    generated = []
+    unchanged = 0
+    for fn in targetdir.listdir():
+        if fn.ext not in ('.c', '.h') or fn.basename in other_files:
+            continue
+        generated.append(fn.basename)
+        if fn.basename in previous_files:
+            md5, mtime = previous_files[fn.basename]
+            if fn.computehash('md5') == md5:
+                os.utime(str(fn), (mtime, mtime))
+                unchanged += 1
+    generated.sort()
+    targetdir.join(GENERATED_FILES).write(''.join(
+        [name + '\n' for name in generated]))
+    log.writing('%s: %d unchanged source files' % (targetdir, unchanged))
+
 def gen_fieldstats(f, sg):
     with sg.write_on_maybe_separate_source(f, 'fieldstats.c') as fc:
         print >> fc, '#include "singleheader.h"'
@@ -14,6 +14,7 @@ from rpython.rtyper.lltypesystem import lltype
 from rpython.rtyper.lltypesystem.lltype import *
 from rpython.rtyper.lltypesystem.rstr import STR
 from rpython.tool.nullpath import NullPyPathLocal
+from rpython.tool.udir import udir
 from rpython.translator.c import genc
 from rpython.translator.backendopt.merge_if_blocks import merge_if_blocks
 from rpython.translator.interactive import Translation
@@ -639,3 +640,30 @@ def test_generated_c_source_no_gotos():
     c_src = get_generated_c_source(main, [int])
     assert 'goto' not in c_src
     assert not re.search(r'block\w*:(?! \(inlined\))', c_src)
+
+def test_keep_unchanged_files():
+    targetdir = udir.ensure('test_keep_unchanged_files', dir=1)
+    for name in ['same.c', 'changed.c', 'removed.h', 'same.o', 'mine.c']:
+        targetdir.join(name).write('old content of %s\n' % name)
+        targetdir.join(name).setmtime(1000000000)
+    targetdir.join(genc.GENERATED_FILES).write(
+        'same.c\nchanged.c\nremoved.h\n')
+    previous_files = genc.forget_generated_files(targetdir)
+    assert sorted(previous_files) == ['changed.c', 'removed.h', 'same.c']
+    other_files = set([fn.basename for fn in targetdir.listdir()])
+    assert other_files == set(['same.o', 'mine.c', genc.GENERATED_FILES])
+    #
+    targetdir.join('same.c').write('old content of same.c\n')
+    targetdir.join('changed.c').write('new content\n')
+    targetdir.join('new.h').write('new content\n')
+    genc.keep_unchanged_files(targetdir, previous_files, other_files)
+    assert targetdir.join('same.c').mtime() == 1000000000
+    assert targetdir.join('same.o').mtime() == 1000000000
+    assert targetdir.join('changed.c').mtime() > 1000000000
+    assert targetdir.join('new.h').mtime() > 1000000000
+    assert targetdir.join(genc.GENERATED_FILES).read().splitlines() == [
+        'changed.c', 'new.h', 'same.c']
+    # a file that the user put there is never removed
+    previous_files = genc.forget_generated_files(targetdir)
+    assert sorted(previous_files) == ['changed.c', 'new.h', 'same.c']
+    assert targetdir.join('mine.c').check()
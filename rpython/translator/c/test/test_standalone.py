@@ -353,6 +353,43 @@ class TestStandalone(StandaloneTests):
         assert "  ll_strtod.c" in makefile
         assert "  ll_strtod.o" in makefile
 
+    def test_source_jobs(self):
+        INF = float("inf")
+        class A(object):
+            def __init__(self, x):
+                self.x = x
+        prebuilt = [A(1.5), A(INF), A(-INF)]
+        def entry_point(argv):
+            a = prebuilt[len(argv) % 3]
+            print a.x, prebuilt[1].x
+            return 0
+
+        def generate(jobs):
+            t = TranslationContext(self.config)
+            t.buildannotator().build_types(entry_point, [s_list_of_strings])
+            t.buildrtyper().specialize()
+            t.config.translation.source_jobs = jobs
+            cbuilder = CStandaloneBuilder(t, entry_point, t.config)
+            cbuilder.generate_source()
+            files = {}
+            for fn in cbuilder.targetdir.listdir('*.c'):
+                if fn != cbuilder.c_source_filename:
+                    # the names of variables differ, so only compare
+                    # the number of top-level lines
+                    lines = fn.read().splitlines()
+                    files[fn.basename] = len([line for line in lines
+                                              if not line[:1].isspace()])
+            return cbuilder, files
+
+        cbuilder1, files1 = generate(1)
+        cbuilder3, files3 = generate(3)
+        assert len(files1) > 3
+        assert files3 == files1
+        assert not cbuilder3.targetdir.listdir('*.part-*')
+        cbuilder3.compile()
+        data = cbuilder3.cmdexec('')
+        assert data == 'inf inf\n'
+
     def test_debug_print_start_stop(self):
         import sys
         from rpython.rtyper.lltypesystem import rffi
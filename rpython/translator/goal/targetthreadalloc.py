@@ -0,0 +1,84 @@
+"""
+A benchmark for allocating small objects from several threads
+
+    targetthreadalloc-c [nthreads [iterations [release_every]]]
+
+Every thread builds and drops short linked lists of small objects, and
+every 'release_every' lists it makes a call that releases the GIL, like
+a C call or I/O would.  Prints the total number of objects allocated per
+second.  Compare the results for 1 and N threads to see how much of the
+time goes to switching the GIL and to the minor collections triggered by
+the shared nursery.
+"""
+
+import os, time
+from rpython.rlib import rthread
+
+# __________  Entry point  __________
+
+class Node(object):
+    def __init__(self, value, next):
+        self.value = value
+        self.next = next
+
+class State(object):
+    pass
+state = State()
+
+LIST_LENGTH = 16
+
+def allocate_lists(iterations, release_every):
+    total = 0
+    for i in range(iterations):
+        node = None
+        for j in range(LIST_LENGTH):
+            node = Node(j, node)
+        while node is not None:
+            total += node.value
+            node = node.next
+        if release_every > 0 and i % release_every == 0:
+            time.sleep(0.0)        # releases the GIL around the C call
+    return total
+
+def bootstrap():
+    rthread.gc_thread_start()
+    result = allocate_lists(state.iterations, state.release_every)
+    state.results.append(result)
+    rthread.gc_thread_die()
+
+def entry_point(argv):
+    nthreads = 4
+    iterations = 1000000
+    release_every = 100
+    if len(argv) > 1:
+        nthreads = int(argv[1])
+    if len(argv) > 2:
+        iterations = int(argv[2])
+    if len(argv) > 3:
+        release_every = int(argv[3])
+    state.iterations = iterations
+    state.release_every = release_every
+    state.results = []
+    #
+    start = time.time()
+    for i in range(nthreads):
+        rthread.start_new_thread(bootstrap, ())
+    while len(state.results) < nthreads:
+        time.sleep(0.001)
+    elapsed = time.time() - start
+    #
+    expected = iterations * (LIST_LENGTH * (LIST_LENGTH - 1) // 2)
+    for result in state.results:
+        assert result == expected
+    nobjects = float(nthreads) * iterations * LIST_LENGTH
+    os.write(1, "%d threads: %d objects in %f seconds, %f objects/sec\n" % (
+        nthreads, int(nobjects), elapsed, nobjects / elapsed))
+    return 0
+
+# _____ Define and setup target ___
+
+def handle_config(config, translateconfig):
+    config.translation.thread = True
+
+def target(*args):
+    return entry_point, None